@@ -1,12 +1,18 @@
 """
 Django admin settings for booking app
 """
+import json
+
 from django.contrib import admin
 from django.contrib.admin import ModelAdmin
 from django.contrib.auth.admin import UserAdmin
+from django.db import transaction
+from django.utils.html import format_html
 
 from booking.forms import CustomUserCreationForm, CustomUserChangeForm
+from booking.layout import hall_layout
 from booking import models
+from booking import tickets
 
 
 class CustomUserAdmin(UserAdmin):
@@ -15,7 +21,9 @@ class CustomUserAdmin(UserAdmin):
     form = CustomUserChangeForm
     model = models.CustomUser
     list_display = ('id', 'email', 'is_staff', 'is_active',)
-    list_filter = ('id', 'email', 'is_staff', 'is_active',)
+    # Fixed date ranges: date hierarchy would read distinct dates of the whole table
+    list_filter = ('is_staff', 'is_active', ('date_joined', admin.DateFieldListFilter))
+    show_full_result_count = False
     fieldsets = (
         (None, {'fields': ('email', 'password')}),
         ('Permissions', {'fields': ('is_staff', 'is_active')}),
@@ -33,26 +41,155 @@ class CustomUserAdmin(UserAdmin):
 
 class HallAdmin(ModelAdmin):
     """Admin class for Hall model"""
-    list_display = ('id', 'name', 'rows_count', 'rows_size')
-    readonly_fields = ('id', )
+    list_display = ('id', 'name', 'rows_count', 'rows_size', 'seats_count')
+    search_fields = ('name',)
+    fields = ('id', 'name', 'rows_count', 'rows_size', 'layout', 'seats_count', 'layout_preview')
+    readonly_fields = ('id', 'seats_count', 'layout_preview')
+
+    @staticmethod
+    def layout_preview(obj):
+        """Returns hall places row by row"""
+        if obj.pk is None:
+            return '-'
+        try:
+            rows = hall_layout(obj).rows()
+        except ValueError:
+            return '-'
+        return format_html('<pre>{}</pre>', '\n'.join(rows))
 
 
 class MovieAdmin(ModelAdmin):
     """Admin class for Movie model"""
     list_display = ('id', 'name', 'duration', 'premiere_year')
+    search_fields = ('name',)
     readonly_fields = ('id', )
 
 
 class ShowingAdmin(ModelAdmin):
     """Admin class for Showing model"""
     list_display = ('id', 'hall', 'movie', 'date_time', 'price')
+    list_filter = ('hall',)
+    date_hierarchy = 'date_time'
+    search_fields = ('movie__name',)
+    autocomplete_fields = ('hall', 'movie')
     readonly_fields = ('id', )
+    show_full_result_count = False
+
+    def get_queryset(self, request):
+        # Showing.__str__ shows its movie and hall, also in autocomplete results
+        return super(ShowingAdmin, self).get_queryset(request).select_related('hall', 'movie')
+
+
+class PaidFilter(admin.SimpleListFilter):
+    """Filters tickets by payment"""
+    title = 'paid'
+    parameter_name = 'paid'
+
+    def lookups(self, request, model_admin):
+        return (('yes', 'Yes'), ('no', 'No'))
+
+    def queryset(self, request, queryset):
+        if self.value() == 'yes':
+            return queryset.exclude(receipt='')
+        if self.value() == 'no':
+            return queryset.filter(receipt='')
+        return queryset
 
 
 class TicketAdmin(ModelAdmin):
     """Admin class for Ticket model"""
     list_display = ('id', 'user', 'showing', 'date_time', 'row_number', 'seat_number', 'receipt')
+    list_select_related = ('user', 'showing__hall', 'showing__movie')
+    list_filter = (PaidFilter, ('date_time', admin.DateFieldListFilter))
+    autocomplete_fields = ('showing',)
     readonly_fields = ('id', 'user', 'date_time', 'receipt')
+    show_full_result_count = False
+
+    def save_model(self, request, obj, form, change):
+        # Seats and prices are booked and moved as by the API (see booking.tickets)
+        with transaction.atomic():
+            if not change:
+                super(TicketAdmin, self).save_model(request, obj, form, change)
+                tickets.record_booked(obj)
+                return
+            before = tickets.seat(models.Ticket.objects.select_for_update().get(pk=obj.pk))
+            if tickets.seat(obj) != before:
+                obj.price = tickets.moved_price(obj, obj.showing, obj.row_number)
+            super(TicketAdmin, self).save_model(request, obj, form, change)
+            if tickets.seat(obj) != before:
+                tickets.record_moved(obj, before, obj.price)
+
+    def delete_model(self, request, obj):
+        with transaction.atomic():
+            super(TicketAdmin, self).delete_model(request, obj)
+            tickets.record_released([tickets.released(obj)])
+
+    def delete_queryset(self, request, queryset):
+        with transaction.atomic():
+            released = list(queryset.select_for_update().order_by()
+                            .values_list('showing_id', 'date_time', 'row_number', 'seat_number'))
+            super(TicketAdmin, self).delete_queryset(request, queryset)
+            tickets.record_released(released)
+
+
+class DailyShowingStatsAdmin(ModelAdmin):
+    """Admin class for DailyShowingStats model"""
+    list_display = ('id', 'date', 'showing', 'booked', 'paid', 'released', 'revenue')
+    list_select_related = ('showing__hall', 'showing__movie')
+    readonly_fields = ('id', 'showing', 'date', 'booked', 'paid', 'released', 'revenue')
+    date_hierarchy = 'date'
+    show_full_result_count = False
+
+    def has_add_permission(self, request):
+        return False
+
+
+class ProfileReportAdmin(ModelAdmin):
+    """Admin class for ProfileReport model"""
+    list_display = ('id', 'created', 'method', 'path', 'status_code', 'duration_ms',
+                    'query_count', 'user')
+    fields = ('created', 'method', 'path', 'status_code', 'duration_ms', 'query_count', 'user',
+              'formatted_report')
+    readonly_fields = fields
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    @staticmethod
+    def formatted_report(obj):
+        """Returns indented report"""
+        return format_html('<pre>{}</pre>', json.dumps(json.loads(obj.report), indent=2))
+
+
+class OutboxEventAdmin(ModelAdmin):
+    """Admin class for OutboxEvent model, the events are waiting for relay_outbox"""
+    list_display = ('id', 'created', 'topic', 'payload')
+    list_filter = ('topic',)
+    readonly_fields = ('id', 'created', 'topic', 'payload')
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+class SlowTaskRunAdmin(ModelAdmin):
+    """Admin class for SlowTaskRun model"""
+    list_display = ('id', 'created', 'task', 'queue', 'state', 'wait_ms', 'duration_ms',
+                    'retries', 'rows_written', 'query_count', 'query_ms')
+    list_filter = ('task', 'state')
+    readonly_fields = ('id', 'created', 'task', 'task_id', 'queue', 'state', 'wait_ms',
+                       'duration_ms', 'retries', 'rows_written', 'query_count', 'query_ms')
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
 
 
 admin.site.register(models.CustomUser, CustomUserAdmin)
@@ -60,3 +197,7 @@ admin.site.register(models.Hall, HallAdmin)
 admin.site.register(models.Movie, MovieAdmin)
 admin.site.register(models.Showing, ShowingAdmin)
 admin.site.register(models.Ticket, TicketAdmin)
+admin.site.register(models.DailyShowingStats, DailyShowingStatsAdmin)
+admin.site.register(models.ProfileReport, ProfileReportAdmin)
+admin.site.register(models.OutboxEvent, OutboxEventAdmin)
+admin.site.register(models.SlowTaskRun, SlowTaskRunAdmin)
@@ -2,8 +2,32 @@
 Booking app config
 """
 from django.apps import AppConfig
+from django.contrib.admin.apps import SimpleAdminConfig
+from django.core import checks
 
 
 class BookingConfig(AppConfig):
     """Booking app config"""
     name = 'booking'
+
+    def ready(self):
+        # pylint: disable=import-outside-toplevel,unused-import
+        from booking import checks as booking_checks  # noqa: F401
+        from booking import schedule
+        from booking import search
+        schedule.install()
+        search.install()
+
+
+class AdminConfig(SimpleAdminConfig):
+    """
+    Admin app config: admin modules are imported by the admin url conf (cinema/admin_urls.py)
+    on the first admin request instead of on start of every process
+    """
+
+    def ready(self):
+        # pylint: disable=import-outside-toplevel
+        from django.contrib.admin.checks import check_dependencies
+        from booking.checks import admin_check
+        checks.register(check_dependencies, checks.Tags.admin)
+        checks.register(admin_check, checks.Tags.admin)
@@ -0,0 +1,98 @@
+"""
+Booking app native async handlers, see tools.asgi
+"""
+import asyncio
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+
+from booking import seats
+from booking.models import Showing
+from tools import db_pool
+from tools.asgi import send_json
+from tools.pubsub import HUB
+
+
+def _seat_map(showing_id):
+    db_pool.acquire_connections()
+    try:
+        return 200, seats.seat_map(showing_id)
+    except Showing.DoesNotExist:
+        return 404, {'detail': 'Not found.'}
+    finally:
+        db_pool.release_connections()
+
+
+async def showing_seats(scope, receive, send, pk):  # pylint: disable=unused-argument
+    """Sends seat map of the showing, the only blocking part is the database query"""
+    status, data = await sync_to_async(_seat_map)(int(pk))
+    await send_json(send, status, data, head=scope['method'] == 'HEAD')
+
+
+async def _snapshot(showing_id):
+    status, data = await sync_to_async(_seat_map)(showing_id)
+    if status != 200:
+        return None
+    return seats.snapshot_event(data)
+
+
+async def _wait_disconnect(receive):
+    while (await receive())['type'] != 'http.disconnect':
+        pass
+
+
+async def showing_seats_stream(scope, receive, send, pk):
+    """
+    Streams seats of the showing as Server-Sent Events
+
+    The stream starts with 'snapshot' event (seat map as /showings/<pk>/seats/), then every
+    'seats' event is a list of [row_number, seat_number, state] changes, state is one of
+    booked, paid, free. Snapshot is sent again when changes were lost by a slow client.
+    """
+    showing_id = int(pk)
+    with HUB.subscribe(seats.channel(showing_id)) as queue:
+        snapshot = await _snapshot(showing_id)
+        if snapshot is None:
+            await send_json(send, 404, {'detail': 'Not found.'})
+            return
+        await send({
+            'type': 'http.response.start',
+            'status': 200,
+            'headers': [(b'content-type', b'text/event-stream'),
+                        (b'cache-control', b'no-cache'),
+                        (b'x-accel-buffering', b'no')],
+        })
+        if scope['method'] == 'HEAD':
+            await send({'type': 'http.response.body', 'body': b''})
+            return
+        retry = f'retry: {seats.STREAM_RETRY}\n\n'.encode()
+        await send({'type': 'http.response.body', 'body': retry + snapshot, 'more_body': True})
+
+        disconnect = asyncio.ensure_future(_wait_disconnect(receive))
+        try:
+            while True:
+                message = asyncio.ensure_future(queue.get())
+                done, _ = await asyncio.wait([message, disconnect],
+                                             timeout=settings.CINEMA_SSE_HEARTBEAT_SECONDS,
+                                             return_when=asyncio.FIRST_COMPLETED)
+                if disconnect in done:
+                    message.cancel()
+                    return
+                if message in done:
+                    changes = message.result()
+                    body = seats.stream_event('seats', changes) if changes is not None \
+                        else await _snapshot(showing_id) or b''
+                else:
+                    message.cancel()
+                    body = b': ping\n\n'
+                await send({'type': 'http.response.body', 'body': body, 'more_body': True})
+        finally:
+            disconnect.cancel()
+
+
+# Public routes, see tools.asgi for the middleware they pass, names are url names of the views
+# serving them by WSGI
+ROUTES = [
+    (r'/showings/(?P<pk>[0-9]+)/seats/', showing_seats, 'showing-seats'),
+    (r'/showings/(?P<pk>[0-9]+)/seats/stream', showing_seats_stream, 'showing-seats-stream'),
+]
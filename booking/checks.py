@@ -0,0 +1,40 @@
+"""
+Booking app system checks
+"""
+from django.conf import settings
+from django.contrib import admin
+from django.contrib.admin.checks import check_admin_app
+from django.core.checks import Error, Warning, register  # pylint: disable=redefined-builtin
+
+# Cache backends keeping entries in the memory of every process
+LOCAL_CACHES = ('django.core.cache.backends.locmem.LocMemCache',
+                'django.core.cache.backends.dummy.DummyCache')
+
+
+@register(deploy=True)
+def celery_routes_check(app_configs, **kwargs):  # pylint: disable=unused-argument
+    """
+    Checks that every booking task is routed to its queue of CINEMA_CELERY_QUEUES
+
+    The check imports Celery, so web processes run it by `check --deploy` only, Celery workers
+    check routes on start (cinema.celery.check_routes).
+    """
+    from cinema.celery import misrouted_tasks  # pylint: disable=import-outside-toplevel
+    return [Error(problem, hint='Fix CINEMA_CELERY_QUEUES setting', id='booking.E001')
+            for problem in misrouted_tasks()]
+
+
+def admin_check(app_configs, **kwargs):
+    """Checks model admins of admin modules, they are imported first (see apps.AdminConfig)"""
+    admin.autodiscover()
+    return check_admin_app(app_configs, **kwargs)
+
+
+@register(deploy=True)
+def shared_cache_check(app_configs, **kwargs):  # pylint: disable=unused-argument
+    """Checks that the default cache is shared by all processes"""
+    if settings.CACHES['default']['BACKEND'] not in LOCAL_CACHES:
+        return []
+    return [Warning('Cache is not shared by processes: cached schedules are not invalidated by '
+                    'changes of other processes and reads after writes may go to replicas',
+                    hint='Set CINEMA_CACHE_URL', id='booking.W001')]
@@ -0,0 +1,145 @@
+"""
+Booking app compiled serializers
+
+Read-only representation of the booking serializers for list pages. Fields of a serializer
+(and its requested shape, see serializers.SparseFieldsMixin) are compiled once into a Python
+function building the response objects from values_list() rows, so pages skip model instances
+and per-field to_representation() calls. Compiled objects are the same as the serializer
+data, so the rendered responses are byte-identical.
+
+Serializers with fields having no compiled equivalent are not compiled and are used as usual.
+"""
+from collections import OrderedDict
+
+from django.utils import timezone
+from rest_framework import serializers
+from rest_framework.settings import api_settings
+
+from booking.export import format_datetime
+
+# Strftime format format_datetime() is equal to
+FAST_DATETIME_FORMAT = '%Y-%m-%dT%H:%M:%S.%f%z'
+
+_IDENTITY_FIELDS = (serializers.IntegerField, serializers.CharField,
+                    serializers.PrimaryKeyRelatedField)
+
+
+class NotCompiled(Exception):
+    """Serializer field has no compiled equivalent"""
+
+
+class CompiledSerializer:
+    """
+    Compiled representation of a serializer: rows of 'columns' values are represented by
+    'represent' function
+    """
+
+    def __init__(self, columns, source, namespace):
+        self.columns = columns
+        self.source = source
+        # pylint: disable=exec-used
+        exec(compile(source, '<compiled serializer>', 'exec'), namespace)
+        self._represent = namespace['represent']
+
+    def represent(self, rows):
+        """Returns list of represented rows"""
+        return self._represent(rows, timezone.get_current_timezone())
+
+
+def _decimal(field):
+    if not getattr(field, 'coerce_to_string', api_settings.COERCE_DECIMAL_TO_STRING) or \
+            field.localize:
+        raise NotCompiled(field.field_name)
+    places = field.decimal_places
+
+    def represent(value):
+        text = format(value, 'f')
+        point = text.find('.')
+        # Database values have the field decimal places already
+        if point >= 0 and len(text) - point - 1 == places:
+            return text
+        return field.to_representation(value)
+    return represent
+
+
+def _datetime(field):
+    if getattr(field, 'format', api_settings.DATETIME_FORMAT) != FAST_DATETIME_FORMAT:
+        return lambda value, tzinfo: field.to_representation(value)
+    field_timezone = getattr(field, 'timezone', None)
+    if field_timezone is not None:
+        return lambda value, tzinfo: format_datetime(value, field_timezone) if value else None
+    return lambda value, tzinfo: format_datetime(value, tzinfo) if value else None
+
+
+class _Compiler:
+    def __init__(self):
+        self.columns = []
+        self.namespace = {}
+
+    def column(self, name):
+        self.columns.append(name)
+        return f'row[{len(self.columns) - 1}]'
+
+    def function(self, function):
+        name = f'f{len(self.namespace)}'
+        self.namespace[name] = function
+        return name
+
+    def field(self, serializer, name, field, prefix):
+        """Returns expression of the field representation"""
+        model = serializer.Meta.model
+        compiled_fields = getattr(serializer, 'compiled_fields', {})
+        if name in compiled_fields:
+            columns = serializer.field_columns[name]
+            arguments = ', '.join(self.column(prefix + column) for column in columns)
+            return f'{self.function(compiled_fields[name])}({arguments})'
+        if field.source == '*' or '.' in field.source:
+            raise NotCompiled(name)
+        model_field = model._meta.get_field(field.source)
+        if not model_field.concrete:
+            raise NotCompiled(name)
+        if isinstance(field, serializers.BaseSerializer):
+            if model_field.null:
+                raise NotCompiled(name)
+            return self.serializer(field, f'{prefix}{field.source}__')
+        value = self.column(prefix + field.source)
+        field_type = type(field)
+        if field_type in _IDENTITY_FIELDS:
+            # Database values are already ints and strings
+            return value
+        if field_type is serializers.DateTimeField:
+            return f'{self.function(_datetime(field))}({value}, tzinfo)'
+        if field_type is serializers.DecimalField:
+            return f'(None if {value} is None else {self.function(_decimal(field))}({value}))'
+        raise NotCompiled(name)
+
+    def serializer(self, serializer, prefix=''):
+        """Returns expression of the serializer representation"""
+        items = [f'{name!r}: {self.field(serializer, name, field, prefix)}'
+                 for name, field in serializer.fields.items()]
+        return '{' + ', '.join(items) + '}'
+
+
+# Compiled serializers by serializer class and requested shape, least recently used first
+_compiled = OrderedDict()
+_COMPILED_LIMIT = 256
+
+
+def compile_serializer(serializer):
+    """Returns CompiledSerializer of the serializer instance or None"""
+    key = (type(serializer), repr(getattr(serializer, 'get_shape', lambda: None)()))
+    if key in _compiled:
+        _compiled.move_to_end(key)
+        return _compiled[key]
+    compiler = _Compiler()
+    try:
+        expression = compiler.serializer(serializer)
+    except NotCompiled:
+        compiled = None
+    else:
+        source = f'def represent(rows, tzinfo):\n    return [{expression} for row in rows]\n'
+        compiled = CompiledSerializer(compiler.columns, source, compiler.namespace)
+    _compiled[key] = compiled
+    if len(_compiled) > _COMPILED_LIMIT:
+        _compiled.popitem(last=False)
+    return compiled
@@ -0,0 +1,71 @@
+"""
+Booking app streaming export
+
+Rows are read as flat value tuples through a server-side cursor and written in chunks, so
+memory stays constant regardless of the number of exported rows.
+"""
+import csv
+
+from django.utils import timezone
+
+EXPORT_CHUNK_SIZE = 2000
+
+TICKET_COLUMNS = ('id', 'showing', 'row_number', 'seat_number', 'price', 'user', 'date_time',
+                  'paid', 'receipt')
+TICKET_VALUES = ('id', 'showing_id', 'row_number', 'seat_number', 'price', 'showing__price',
+                 'user_id', 'date_time', 'receipt')
+
+SHOWING_VALUES = ('id', 'hall_id', 'movie_id', 'date_time', 'price')
+
+
+class _Echo:  # pylint: disable=too-few-public-methods
+    """File-like object returns written value instead of storing it"""
+
+    @staticmethod
+    def write(value):
+        """Returns written value"""
+        return value
+
+
+def format_datetime(value, tzinfo):
+    # Same as REST_FRAMEWORK['DATETIME_FORMAT'] (%Y-%m-%dT%H:%M:%S.%f%z) but several times
+    # faster than strftime()
+    value = value.astimezone(tzinfo).isoformat(timespec='microseconds')
+    return value[:-3] + value[-2:]
+
+
+def _chunked(lines):
+    buffer = []
+    for line in lines:
+        buffer.append(line)
+        if len(buffer) >= EXPORT_CHUNK_SIZE:
+            yield ''.join(buffer)
+            buffer = []
+    if buffer:
+        yield ''.join(buffer)
+
+
+def tickets_csv(queryset):
+    """Yields tickets CSV chunks, the columns are the same as in TicketSerializer"""
+    writer = csv.writer(_Echo())
+    tzinfo = timezone.get_current_timezone()
+    rows = queryset.values_list(*TICKET_VALUES).iterator(chunk_size=EXPORT_CHUNK_SIZE)
+    yield writer.writerow(TICKET_COLUMNS)
+    yield from _chunked(
+        writer.writerow((pk, showing, row_number, seat_number,
+                         price if price is not None else showing_price, user,
+                         format_datetime(date_time, tzinfo), bool(receipt), receipt))
+        for pk, showing, row_number, seat_number, price, showing_price, user, date_time, receipt
+        in rows
+    )
+
+
+def showings_ndjson(queryset):
+    """Yields showings NDJSON chunks, every line is the same object as in ShowingSerializer"""
+    tzinfo = timezone.get_current_timezone()
+    rows = queryset.values_list(*SHOWING_VALUES).iterator(chunk_size=EXPORT_CHUNK_SIZE)
+    yield from _chunked(
+        f'{{"id":{pk},"hall":{hall},"movie":{movie},'
+        f'"date_time":"{format_datetime(date_time, tzinfo)}","price":"{price}"}}\n'
+        for pk, hall, movie, date_time, price in rows
+    )
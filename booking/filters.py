@@ -0,0 +1,80 @@
+"""
+Booking app filter sets
+"""
+import coreapi
+import coreschema
+import django_filters
+from rest_framework.filters import BaseFilterBackend
+from rest_framework.permissions import SAFE_METHODS
+
+from booking import search
+from booking import serializers
+from booking.models import Showing, Ticket
+
+
+class TicketDateRangeFilter(django_filters.FilterSet):
+    """
+    Tickets filter by booking time range:
+    ?date_time_after=...&date_time_before=...&showing=...&user=...
+    """
+    date_time = django_filters.DateTimeFromToRangeFilter()
+
+    class Meta:
+        model = Ticket
+        fields = ['date_time', 'showing', 'user']
+
+
+class ShowingDateRangeFilter(django_filters.FilterSet):
+    """
+    Showings filter by showing time range:
+    ?date_time_after=...&date_time_before=...&hall=...&movie=...
+    """
+    date_time = django_filters.DateTimeFromToRangeFilter()
+
+    class Meta:
+        model = Showing
+        fields = ['date_time', 'hall', 'movie']
+
+
+class MovieSearchFilter(BaseFilterBackend):
+    """
+    Movies search by name, best matches first: ?q=...
+    """
+    search_param = 'q'
+
+    def filter_queryset(self, request, queryset, view):
+        text = request.query_params.get(self.search_param, '').strip()
+        if not text:
+            return queryset
+        return search.search(queryset, text)
+
+    def get_schema_fields(self, view):
+        return [coreapi.Field(name=self.search_param, required=False, location='query',
+                              schema=coreschema.String(
+                                  description='Movie name or its part, best matches first'))]
+
+
+class SparseFieldsFilter(BaseFilterBackend):
+    """
+    Loads only columns and related objects of the fields requested by ?fields=... and
+    ?expand=... (see serializers.SparseFieldsMixin)
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        if request.method not in SAFE_METHODS:
+            return queryset
+        return serializers.shape_queryset(queryset, view.get_serializer())
+
+    def get_schema_fields(self, view):
+        fields = [coreapi.Field(name='fields', required=False, location='query',
+                                schema=coreschema.String(
+                                    description='Comma separated fields of the response, nested '
+                                                'fields are separated by ".": id,showing.price'))]
+        expandable = getattr(view.get_serializer_class(), 'expandable_fields', {})
+        if expandable:
+            fields.append(coreapi.Field(name='expand', required=False, location='query',
+                                        schema=coreschema.String(
+                                            description='Comma separated related objects '
+                                                        'embedded instead of their ids: '
+                                                        f'{", ".join(expandable)}')))
+        return fields
@@ -0,0 +1,98 @@
+"""
+Booking app hall layouts
+
+Hall.layout describes every place of the rows_count x rows_size grid with one character:
+ - 's' standard seat, 'v' VIP seat, 'w' wheelchair space
+ - '.' no seat (aisle, missing seat)
+Rows are separated by '/' and repeated places are run-length encoded, e.g. '3s2.3s/8v' is
+a row of 3 seats, an aisle and 3 seats and a row of 8 VIP seats. Empty layout means that all
+places are standard seats.
+
+Layouts are decoded once per process into immutable HallLayout tuples with one byte per place,
+so seat lookups are a single index.
+"""
+import re
+from collections import namedtuple
+from functools import lru_cache
+from itertools import groupby
+
+STANDARD = 's'
+VIP = 'v'
+WHEELCHAIR = 'w'
+NO_SEAT = '.'
+
+ZONES = {
+    STANDARD: 'standard',
+    VIP: 'vip',
+    WHEELCHAIR: 'wheelchair',
+}
+
+_RUN = re.compile(r'(\d+)([svw.])')
+_LAYOUT = re.compile(r'(?:\d*[svw.])+(?:/(?:\d*[svw.])+)*')
+
+
+class HallLayout(namedtuple('HallLayout', ['rows_count', 'rows_size', 'places'])):
+    """
+    Decoded hall layout, places is bytes of place codes row by row
+    """
+    __slots__ = ()
+
+    @property
+    def seats_count(self):
+        """Returns number of seats"""
+        return len(self.places) - self.places.count(NO_SEAT.encode())
+
+    def place(self, row_number, seat_number):
+        """Returns code of the place, NO_SEAT for places out of the hall"""
+        if not (1 <= row_number <= self.rows_count and 1 <= seat_number <= self.rows_size):
+            return NO_SEAT
+        return chr(self.places[(row_number - 1) * self.rows_size + seat_number - 1])
+
+    def is_seat(self, row_number, seat_number):
+        """Returns True if there is a seat at the place"""
+        return self.place(row_number, seat_number) != NO_SEAT
+
+    def zone(self, row_number, seat_number):
+        """Returns zone name of the seat or None"""
+        return ZONES.get(self.place(row_number, seat_number))
+
+    def rows(self):
+        """Returns place codes of every row as strings"""
+        text = self.places.decode()
+        return [text[start:start + self.rows_size]
+                for start in range(0, len(text), self.rows_size)]
+
+    def encode(self):
+        """Returns run-length encoded layout"""
+        rows = []
+        for row in self.rows():
+            runs = []
+            for code, group in groupby(row):
+                count = len(list(group))
+                runs.append(f'{count}{code}' if count > 1 else code)
+            rows.append(''.join(runs))
+        return '/'.join(rows)
+
+
+@lru_cache(maxsize=1024)
+def decode(text, rows_count, rows_size):
+    """
+    Returns HallLayout of encoded text, raises ValueError when the layout is malformed or
+    does not match the hall size
+    """
+    if not text:
+        return HallLayout(rows_count, rows_size, STANDARD.encode() * (rows_count * rows_size))
+    if not _LAYOUT.fullmatch(text):
+        raise ValueError('Layout should be rows of s, v, w or . places separated by /')
+    rows = _RUN.sub(lambda run: run.group(2) * int(run.group(1)), text).split('/')
+    if len(rows) != rows_count:
+        raise ValueError(f'Layout has {len(rows)} rows instead of {rows_count}')
+    for row_number, row in enumerate(rows, 1):
+        if len(row) != rows_size:
+            raise ValueError(f'Row {row_number} has {len(row)} places instead of {rows_size}')
+    return HallLayout(rows_count, rows_size, ''.join(rows).encode())
+
+
+def hall_layout(hall):
+    """Returns HallLayout of the hall"""
+    return decode(hall.layout, hall.rows_count, hall.rows_size)
@@ -0,0 +1,77 @@
+"""
+benchmark_renderers command compares rendering of /tickets/ pages by REST framework's JSON
+renderer and by tools.fastjson renderer
+"""
+import datetime
+import time
+from collections import OrderedDict
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from rest_framework.renderers import JSONRenderer
+
+from booking.models import Hall, Movie, Showing, Ticket
+from booking.serializers import TicketSerializer
+from tools import fastjson
+
+
+def _page(size):
+    """Returns data of a /tickets/ page of unsaved tickets, half of them paid"""
+    date_time = datetime.datetime(2020, 1, 1, 10, tzinfo=datetime.timezone.utc)
+    showing = Showing(pk=1, hall=Hall(pk=1), movie=Movie(pk=1), date_time=date_time,
+                      price=Decimal('19.99'))
+    tickets = [Ticket(pk=number, showing=showing, user_id=1, row_number=number // 20 + 1,
+                      seat_number=number % 20 + 1, date_time=date_time,
+                      price=Decimal('21.99') if number % 3 else None,
+                      receipt='5b6d0be2-0c4a-4d5e-9c4e-0a1f3b7c8d9e' if number % 2 else '')
+               for number in range(size)]
+    return OrderedDict([
+        ('links', {'next': 'http://testserver/tickets/?page=3',
+                   'previous': 'http://testserver/tickets/'}),
+        ('count', size * 10),
+        ('total_pages', 10),
+        ('page_size', size),
+        ('results', TicketSerializer(tickets, many=True).data),
+    ])
+
+
+def _best_time(function, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        duration = time.perf_counter() - start
+        best = duration if best is None else min(best, duration)
+    return best
+
+
+class Command(BaseCommand):
+    """JSON renderers micro-benchmark"""
+    help = 'Compares rendering throughput of /tickets/ pages by JSON renderers'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--page-size', type=int, default=100, help='Tickets per page')
+        parser.add_argument('--pages', type=int, default=100, help='Pages rendered per run')
+        parser.add_argument('--repeat', type=int, default=5,
+                            help='Runs of every benchmark, the best one is reported')
+
+    def handle(self, *args, **options):
+        data = _page(options['page_size'])
+        pages = options['pages']
+        results = []
+        for name, renderer in (('rest_framework', JSONRenderer()),
+                               ('fastjson', fastjson.JSONRenderer())):
+            content = renderer.render(data)
+            if results and content != results[0][1]:
+                raise AssertionError(f'{name} output differs from {results[0][0]} output')
+
+            def render(renderer=renderer):
+                for _ in range(pages):
+                    renderer.render(data)
+
+            duration = _best_time(render, options['repeat'])
+            results.append((name, content, duration))
+            self.stdout.write(f'{name}: {pages / duration:.0f} pages/s, '
+                              f'{len(content) * pages / duration / 2 ** 20:.1f} MB/s')
+        self.stdout.write(f'fastjson backend: {"orjson" if fastjson.orjson else "json"}, '
+                          f'{results[0][2] / results[1][2]:.1f}x faster')
@@ -0,0 +1,86 @@
+"""
+benchmark_serializers command compares list representation by serializers and by compiled
+serializers (booking.compiled)
+"""
+import datetime
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from rest_framework.renderers import JSONRenderer
+
+from booking import compiled
+from booking.models import CustomUser, Hall, Movie, Showing, Ticket
+from booking.serializers import ShowingSerializer, TicketSerializer
+
+
+class _Rollback(Exception):
+    pass
+
+
+def _best_time(function, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        duration = time.perf_counter() - start
+        best = duration if best is None else min(best, duration)
+    return best
+
+
+class Command(BaseCommand):
+    """Serializers micro-benchmark"""
+    help = 'Compares representation time of ticket and showing pages by serializers and by ' \
+           'compiled serializers on temporary rows, which are rolled back'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=1000, help='Rows per page')
+        parser.add_argument('--repeat', type=int, default=5,
+                            help='Runs of every benchmark, the best one is reported')
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                self._benchmark(options['rows'], options['repeat'])
+                raise _Rollback()
+        except _Rollback:
+            pass
+
+    def _benchmark(self, rows, repeat):
+        user = CustomUser.objects.create_user(email='benchmark@benchmark.test', password=None)
+        movie = Movie.objects.create(name='Benchmark movie', duration=120)
+        date_time = datetime.datetime(2020, 1, 1, 10, tzinfo=datetime.timezone.utc)
+        # Primary keys of bulk created rows are not set by every database, so rows are read back
+        Hall.objects.bulk_create(
+            Hall(name=f'Benchmark hall {number}', rows_count=1, rows_size=rows, seats_count=rows)
+            for number in range(rows))
+        Showing.objects.bulk_create(
+            Showing(hall=hall, movie=movie, date_time=date_time, price='19.99')
+            for hall in Hall.objects.filter(name__startswith='Benchmark hall '))
+        showing = Showing.objects.filter(movie=movie).first()
+        Ticket.objects.bulk_create(
+            Ticket(showing=showing, user=user, date_time=date_time, row_number=1,
+                   seat_number=number, price='21.99' if number % 2 else None)
+            for number in range(1, rows + 1))
+
+        renderer = JSONRenderer()
+        for name, serializer_class, queryset in (
+                ('tickets', TicketSerializer,
+                 Ticket.objects.filter(user=user).select_related('showing')),
+                ('showings', ShowingSerializer, Showing.objects.filter(movie=movie))):
+            compiled_serializer = compiled.compile_serializer(serializer_class())
+
+            def serialized(serializer_class=serializer_class, queryset=queryset):
+                return renderer.render(serializer_class(list(queryset), many=True).data)
+
+            def represented(compiled_serializer=compiled_serializer, queryset=queryset):
+                return renderer.render(compiled_serializer.represent(
+                    list(queryset.values_list(*compiled_serializer.columns))))
+
+            if serialized() != represented():
+                raise AssertionError(f'Compiled {name} differ from serialized {name}')
+            serializer_time = _best_time(serialized, repeat)
+            compiled_time = _best_time(represented, repeat)
+            self.stdout.write(f'{name}: {rows} rows, serializer {serializer_time * 1000:.1f} ms, '
+                              f'compiled {compiled_time * 1000:.1f} ms, '
+                              f'{serializer_time / compiled_time:.1f}x faster')
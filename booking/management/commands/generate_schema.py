@@ -0,0 +1,16 @@
+"""
+generate_schema command renders OpenAPI schema documents served by /swagger.json,
+/swagger.yaml and the web UI pages
+"""
+from django.core.management.base import BaseCommand
+
+from cinema.schema import schema_documents
+
+
+class Command(BaseCommand):
+    """Schema documents generation"""
+    help = 'Renders OpenAPI schema documents into CINEMA_SCHEMA_DIR, run it on build or deploy'
+
+    def handle(self, *args, **options):
+        for path in schema_documents.write():
+            self.stdout.write(f'Schema document {path} was written')
@@ -0,0 +1,31 @@
+"""
+profile_imports command reports modules imported on cold start of web or Celery processes
+by their import time
+"""
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from tools import importprofile
+
+
+class Command(BaseCommand):
+    """Import time profile"""
+    help = 'Reports import time of modules imported on start of a process by a new interpreter'
+
+    def add_arguments(self, parser):
+        parser.add_argument('target', nargs='?', default='web',
+                            help=f'One of {", ".join(importprofile.TARGETS)} or a module name')
+        parser.add_argument('--limit', type=int, default=30, help='Modules reported')
+        parser.add_argument('--sort', choices=('self', 'cumulative'), default='cumulative',
+                            help='Time modules are sorted by')
+
+    def handle(self, *args, **options):
+        result = importprofile.run(options['target'], settings.SETTINGS_MODULE)
+        column = 1 if options['sort'] == 'self' else 2
+        modules = sorted(result['modules'], key=lambda module: module[column], reverse=True)
+        self.stdout.write(f'{"self ms":>9} {"cumulative ms":>14}  module (imported by)')
+        for name, self_time, cumulative, parent in modules[:options['limit']]:
+            self.stdout.write(f'{self_time * 1000:9.1f} {cumulative * 1000:14.1f}  {name}'
+                              + (f' ({parent})' if parent else ''))
+        self.stdout.write(f'{options["target"]}: {len(result["modules"])} modules imported in '
+                          f'{result["total"] * 1000:.0f} ms')
@@ -0,0 +1,40 @@
+"""
+relay_outbox command sends transactional outbox events to the broker
+"""
+import logging
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from booking import outbox
+from tools import db_pool
+
+
+class Command(BaseCommand):
+    """Outbox relay worker"""
+    help = 'Sends transactional outbox events to the broker in batches'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=settings.CINEMA_OUTBOX_BATCH_SIZE,
+                            help='Events sent per transaction')
+        parser.add_argument('--interval', type=float, default=settings.CINEMA_OUTBOX_POLL_SECONDS,
+                            help='Seconds to wait when the outbox is empty or sending failed')
+        parser.add_argument('--once', action='store_true',
+                            help='Exit when the outbox is empty')
+
+    def handle(self, *args, **options):
+        logger = logging.getLogger(__name__)
+        while True:
+            db_pool.acquire_connections()
+            try:
+                sent = outbox.relay(options['batch_size'])
+            except Exception:  # pylint: disable=broad-except
+                logger.exception('Outbox events were not sent, retrying')
+                sent = None
+            finally:
+                db_pool.release_connections()
+            if sent == 0 and options['once']:
+                return
+            if not sent:
+                time.sleep(options['interval'])
@@ -0,0 +1,60 @@
+"""
+Booking app metrics
+"""
+from tools.metrics import REGISTRY
+
+SEAT_BOOKINGS = REGISTRY.counter(
+    'cinema_seat_bookings',
+    'Ticket booking attempts by result (success/conflict)',
+    labels=('result',),
+)
+
+PAY_TICKET_QUEUE_DEPTH = REGISTRY.gauge(
+    'cinema_pay_ticket_queue_depth',
+    'Payments requested and not yet saved by a worker',
+)
+
+DISABLE_BOOKINGS_DELETED = REGISTRY.histogram(
+    'cinema_disable_bookings_deleted_rows',
+    'Unpaid tickets deleted per disable_bookings run',
+    buckets=(0, 1, 10, 100, 1000, 10000),
+)
+
+OUTBOX_RELAYED = REGISTRY.counter(
+    'cinema_outbox_relayed_events',
+    'Outbox events sent to the broker by topic',
+    labels=('topic',),
+)
+
+OUTBOX_LAG = REGISTRY.histogram(
+    'cinema_outbox_lag_seconds',
+    'Time from saving outbox event to sending it',
+    buckets=(0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 60.0),
+)
+
+TASK_QUEUE_WAIT = REGISTRY.histogram(
+    'cinema_task_queue_wait_seconds',
+    'Time from sending Celery task to the broker to its start by a worker',
+    labels=('task',),
+    buckets=(0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 30.0, 60.0, 300.0),
+)
+
+TASK_DURATION = REGISTRY.histogram(
+    'cinema_task_duration_seconds',
+    'Celery task run time by final state (SUCCESS/FAILURE/RETRY)',
+    labels=('task', 'state'),
+    buckets=(0.01, 0.1, 0.5, 1.0, 5.0, 10.0, 15.0, 20.0, 30.0, 60.0, 300.0),
+)
+
+TASK_RETRIES = REGISTRY.counter(
+    'cinema_task_retries',
+    'Celery task retries',
+    labels=('task',),
+)
+
+TASK_ROWS_WRITTEN = REGISTRY.histogram(
+    'cinema_task_rows_written',
+    'Rows inserted, updated or deleted per Celery task run',
+    labels=('task',),
+    buckets=(0, 1, 10, 100, 1000, 10000),
+)
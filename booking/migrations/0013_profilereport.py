@@ -0,0 +1,32 @@
+# Generated by Django 2.2.10 on 2026-10-19 10:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('booking', '0012_ticket_receipt'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProfileReport',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created', models.DateTimeField(auto_now_add=True)),
+                ('method', models.CharField(max_length=8)),
+                ('path', models.CharField(max_length=255)),
+                ('status_code', models.IntegerField()),
+                ('duration_ms', models.FloatField(verbose_name='Duration, ms')),
+                ('query_count', models.IntegerField(verbose_name='SQL queries')),
+                ('user', models.CharField(blank=True, max_length=254)),
+                ('report', models.TextField()),
+            ],
+            options={
+                'verbose_name': 'Profile report',
+                'verbose_name_plural': 'Profile reports',
+                'ordering': ['-id'],
+            },
+        ),
+    ]
@@ -0,0 +1,55 @@
+# Generated by Django 2.2.10 on 2026-10-19 10:41
+
+from django.db import migrations, models
+from django.db.models import Count, Q, Sum
+from django.db.models.functions import TruncDate
+import django.db.models.deletion
+
+
+def fill_daily_showing_stats(apps, schema_editor):
+    Ticket = apps.get_model('booking', 'Ticket')
+    DailyShowingStats = apps.get_model('booking', 'DailyShowingStats')
+    paid = ~Q(receipt='')
+    rows = Ticket.objects \
+        .annotate(date=TruncDate('date_time')) \
+        .values('showing', 'date') \
+        .annotate(booked=Count('id'),
+                  paid=Count('id', filter=paid),
+                  revenue=Sum('showing__price', filter=paid)) \
+        .order_by()
+    DailyShowingStats.objects.bulk_create(
+        (DailyShowingStats(showing_id=row['showing'],
+                           date=row['date'],
+                           booked=row['booked'],
+                           paid=row['paid'],
+                           revenue=row['revenue'] or 0) for row in rows.iterator()),
+        batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('booking', '0013_profilereport'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyShowingStats',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(verbose_name='Booking date')),
+                ('booked', models.IntegerField(default=0)),
+                ('paid', models.IntegerField(default=0)),
+                ('released', models.IntegerField(default=0)),
+                ('revenue', models.DecimalField(decimal_places=2, default=0, max_digits=32)),
+                ('showing', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='booking.Showing')),
+            ],
+            options={
+                'verbose_name': 'Daily showing stats',
+                'verbose_name_plural': 'Daily showing stats',
+                'ordering': ['-date', '-id'],
+                'unique_together': {('showing', 'date')},
+            },
+        ),
+        migrations.RunPython(fill_daily_showing_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 2.2.10 on 2026-10-19 10:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('booking', '0014_dailyshowingstats'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='showing',
+            index=models.Index(fields=['hall', 'date_time'], name='showing_hall_date_time_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='showing',
+            index=models.Index(fields=['date_time'], name='showing_date_time_idx'),
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 2.2.10 on 2026-10-19 10:45
+
+from django.db import migrations, models
+
+
+class AddIndexConcurrently(migrations.AddIndex):
+    """
+    Creates index without locking writes to the table on PostgreSQL
+    """
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor != 'postgresql':
+            return super().database_forwards(app_label, schema_editor, from_state, to_state)
+        model = to_state.apps.get_model(app_label, self.model_name)
+        if self.allow_migrate_model(schema_editor.connection.alias, model):
+            sql = str(self.index.create_sql(model, schema_editor))
+            schema_editor.execute(sql.replace('CREATE INDEX', 'CREATE INDEX CONCURRENTLY', 1))
+
+
+class Migration(migrations.Migration):
+    # booking_ticket is the largest table: CREATE INDEX CONCURRENTLY cannot run in transaction
+    atomic = False
+
+    dependencies = [
+        ('booking', '0015_hot_query_indexes'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='ticket',
+            index=models.Index(fields=['user', '-id'], name='ticket_user_id_desc_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='ticket',
+            index=models.Index(condition=models.Q(receipt=''), fields=['showing'], name='ticket_unpaid_showing_idx'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 2.2.10 on 2026-10-19 10:48
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('booking', '0016_ticket_hot_query_indexes'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='showing',
+            options={'ordering': ['-date_time', 'id'], 'verbose_name': 'Showing', 'verbose_name_plural': 'Showings'},
+        ),
+    ]
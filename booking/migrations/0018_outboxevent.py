@@ -0,0 +1,27 @@
+# Generated by Django 2.2.10 on 2026-10-19 11:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('booking', '0017_ordering_by_id_for_equal_Showing_date_time'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OutboxEvent',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created', models.DateTimeField(auto_now_add=True)),
+                ('topic', models.CharField(choices=[('task', 'Celery task'), ('pubsub', 'Pub/sub message')], max_length=16)),
+                ('payload', models.TextField()),
+            ],
+            options={
+                'verbose_name': 'Outbox event',
+                'verbose_name_plural': 'Outbox events',
+                'ordering': ['id'],
+            },
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 2.2.10 on 2026-10-19 11:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('booking', '0018_outboxevent'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SlowTaskRun',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created', models.DateTimeField(auto_now_add=True)),
+                ('task', models.CharField(max_length=255)),
+                ('task_id', models.CharField(max_length=36)),
+                ('queue', models.CharField(blank=True, max_length=64)),
+                ('state', models.CharField(max_length=16)),
+                ('wait_ms', models.FloatField(null=True, verbose_name='Queue wait, ms')),
+                ('duration_ms', models.FloatField(verbose_name='Run time, ms')),
+                ('retries', models.IntegerField(default=0)),
+                ('rows_written', models.IntegerField(default=0)),
+                ('query_count', models.IntegerField(verbose_name='SQL queries')),
+                ('query_ms', models.FloatField(verbose_name='SQL time, ms')),
+            ],
+            options={
+                'verbose_name': 'Slow task run',
+                'verbose_name_plural': 'Slow task runs',
+                'ordering': ['-id'],
+            },
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 2.2.10 on 2026-10-19 11:32
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('booking', '0019_slowtaskrun'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ShowingPrices',
+            fields=[
+                ('showing', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='prices', serialize=False, to='booking.Showing')),
+                ('base_price', models.DecimalField(decimal_places=2, max_digits=32)),
+                ('capacity', models.IntegerField()),
+                ('booked', models.IntegerField(default=0)),
+                ('occupancy_bucket', models.IntegerField()),
+                ('valid_until', models.DateTimeField(null=True)),
+                ('row_prices', models.TextField()),
+            ],
+            options={
+                'verbose_name': 'Showing prices',
+                'verbose_name_plural': 'Showing prices',
+            },
+        ),
+        migrations.AddField(
+            model_name='ticket',
+            name='price',
+            field=models.DecimalField(blank=True, decimal_places=2, max_digits=32, null=True),
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 2.2.10 on 2026-10-19 12:05
+
+from django.db import migrations, models
+from django.db.models import F
+
+
+def count_seats(apps, schema_editor):
+    """Halls without layout have seats at all places"""
+    hall_model = apps.get_model('booking', 'Hall')
+    hall_model.objects.update(seats_count=F('rows_count') * F('rows_size'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('booking', '0020_dynamic_pricing'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='hall',
+            name='layout',
+            field=models.TextField(blank=True, default='', help_text='Rows of places separated by "/": s - seat, v - VIP seat, w - wheelchair space, . - no seat, repeated places as count and place, e.g. 2.16s2./20v. Empty layout means all seats are standard'),
+        ),
+        migrations.AddField(
+            model_name='hall',
+            name='seats_count',
+            field=models.IntegerField(default=0, editable=False, verbose_name='Seats count'),
+            preserve_default=False,
+        ),
+        migrations.RunPython(count_seats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 2.2.10 on 2026-10-19 16:20
+
+import django.contrib.postgres.indexes
+from django.db import migrations
+
+
+class RunPostgresSQL(migrations.RunSQL):
+    """
+    Runs SQL on PostgreSQL only, django.contrib.postgres.operations would require psycopg2
+    on other databases too
+    """
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == 'postgresql':
+            super().database_forwards(app_label, schema_editor, from_state, to_state)
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == 'postgresql':
+            super().database_backwards(app_label, schema_editor, from_state, to_state)
+
+
+class AddPostgresIndex(migrations.AddIndex):
+    """
+    Creates index on PostgreSQL only, other databases search movies without it
+    """
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == 'postgresql':
+            super().database_forwards(app_label, schema_editor, from_state, to_state)
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == 'postgresql':
+            super().database_backwards(app_label, schema_editor, from_state, to_state)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('booking', '0021_hall_layout'),
+    ]
+
+    operations = [
+        RunPostgresSQL('CREATE EXTENSION IF NOT EXISTS pg_trgm',
+                       'DROP EXTENSION IF EXISTS pg_trgm'),
+        AddPostgresIndex(
+            model_name='movie',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['name'], name='movie_name_trgm_idx', opclasses=['gin_trgm_ops']),
+        ),
+    ]
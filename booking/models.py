@@ -1,11 +1,14 @@
 """
 Booking app models
 """
+from django.core.exceptions import ValidationError
 from django.core.validators import MinValueValidator
 from django.db import models
 from django.contrib.auth.models import AbstractUser
+from django.contrib.postgres.indexes import GinIndex
 from django.utils.translation import ugettext_lazy as _
 
+from .layout import hall_layout
 from .managers import CustomUserManager
 
 
@@ -40,6 +43,13 @@ class Hall(models.Model):
                                             validators=[MinValueValidator(1)])
     rows_size = models.fields.IntegerField(verbose_name='Rows size (seats count)',
                                            validators=[MinValueValidator(1)])
+    # Seats, aisles and zones of the rows_count x rows_size grid, see booking.layout
+    layout = models.TextField(blank=True, default='',
+                              help_text='Rows of places separated by "/": s - seat, v - VIP '
+                                        'seat, w - wheelchair space, . - no seat, repeated '
+                                        'places as count and place, e.g. 2.16s2./20v. '
+                                        'Empty layout means all seats are standard')
+    seats_count = models.fields.IntegerField(verbose_name='Seats count', editable=False)
 
     class Meta:
         verbose_name = 'Cinema hall'
@@ -49,6 +59,16 @@ class Hall(models.Model):
     def __str__(self):
         return str(self.name) + ' (' + str(self.rows_count) + 'x' + str(self.rows_size) + ')'
 
+    def clean(self):
+        try:
+            hall_layout(self)
+        except ValueError as ex:
+            raise ValidationError({'layout': str(ex)})
+
+    def save(self, *args, **kwargs):  # pylint: disable=arguments-differ
+        self.seats_count = hall_layout(self).seats_count
+        super(Hall, self).save(*args, **kwargs)
+
 
 class Movie(models.Model):
     """Movie model"""
@@ -67,6 +87,10 @@ class Movie(models.Model):
         verbose_name_plural = 'Movies'
         ordering = ['-id']
         unique_together = ['name', 'premiere_year']
+        indexes = [
+            # Name search by pg_trgm (booking.search), not created on other databases
+            GinIndex(fields=['name'], name='movie_name_trgm_idx', opclasses=['gin_trgm_ops']),
+        ]
 
     def __str__(self):
         return str(self.name) + (" (" + str(self.premiere_year) + ")") or ''
@@ -84,8 +108,14 @@ class Showing(models.Model):
     class Meta:
         verbose_name = 'Showing'
         verbose_name_plural = 'Showings'
-        ordering = ['-date_time']
+        ordering = ['-date_time', 'id']
         unique_together = ['hall', 'movie', 'date_time']
+        indexes = [
+            # Latest showing in the hall before given time (ShowingSerializer.validate)
+            models.Index(fields=['hall', 'date_time'], name='showing_hall_date_time_idx'),
+            # Showings coming up before deadline (disable_bookings)
+            models.Index(fields=['date_time'], name='showing_date_time_idx'),
+        ]
 
     def __str__(self):
         return str(self.movie) + ', ' + str(self.date_time) + ', ' + str(self.hall) + ', $' + \
@@ -102,13 +132,141 @@ class Ticket(models.Model):
     seat_number = models.IntegerField(verbose_name='Seat number in row',
                                       validators=[MinValueValidator(1)])
     receipt = models.CharField(max_length=36, blank=True)
+    # Price quoted at booking (see booking.pricing), tickets booked earlier cost showing price
+    price = models.DecimalField(max_digits=32, decimal_places=2, null=True, blank=True)
 
     class Meta:
         verbose_name = 'Ticket'
         verbose_name_plural = 'Tickets'
         ordering = ['-id']
+        # Also serves seat lookups by (showing, row_number, seat_number)
         unique_together = ['showing', 'row_number', 'seat_number']
+        indexes = [
+            # User's tickets list ordered by -id
+            models.Index(fields=['user', '-id'], name='ticket_user_id_desc_idx'),
+            # Unpaid tickets of showings (disable_bookings), paid tickets are not indexed
+            models.Index(fields=['showing'], name='ticket_unpaid_showing_idx',
+                         condition=models.Q(receipt='')),
+        ]
 
     def __str__(self):
         return 'Ticket for ' + str(self.showing) + ', user ' + str(self.user) + ', ' + \
                str(self.date_time)
+
+
+class ProfileReport(models.Model):
+    """Request profiling report, only CINEMA_PROFILE_REPORTS_LIMIT latest reports are kept"""
+    created = models.DateTimeField(auto_now_add=True)
+    method = models.CharField(max_length=8)
+    path = models.CharField(max_length=255)
+    status_code = models.IntegerField()
+    duration_ms = models.FloatField(verbose_name='Duration, ms')
+    query_count = models.IntegerField(verbose_name='SQL queries')
+    user = models.CharField(max_length=254, blank=True)
+    report = models.TextField()
+
+    class Meta:
+        verbose_name = 'Profile report'
+        verbose_name_plural = 'Profile reports'
+        ordering = ['-id']
+
+    def __str__(self):
+        return self.method + ' ' + self.path + ', ' + str(round(self.duration_ms)) + ' ms'
+
+
+class ShowingPrices(models.Model):
+    """
+    Precomputed seat prices of the showing by row (see booking.pricing), rebuilt when
+    occupancy or time to the showing crosses a bucket boundary
+    """
+    showing = models.OneToOneField(to=Showing, on_delete=models.CASCADE, primary_key=True,
+                                   related_name='prices')
+    base_price = models.DecimalField(max_digits=32, decimal_places=2)
+    capacity = models.IntegerField()
+    booked = models.IntegerField(default=0)
+    occupancy_bucket = models.IntegerField()
+    # The time bucket ends, None for the last bucket
+    valid_until = models.DateTimeField(null=True)
+    # JSON list of decimal strings, price of the first row goes first
+    row_prices = models.TextField()
+
+    class Meta:
+        verbose_name = 'Showing prices'
+        verbose_name_plural = 'Showing prices'
+
+    def __str__(self):
+        return 'Showing ' + str(self.showing_id) + ': ' + self.row_prices
+
+
+class DailyShowingStats(models.Model):
+    """
+    Daily sales rollup: tickets of the showing booked on the date, paid and released (unpaid
+    and removed) ones among them and revenue of the paid ones
+    """
+    showing = models.ForeignKey(to=Showing, on_delete=models.CASCADE)
+    date = models.DateField(verbose_name='Booking date')
+    booked = models.IntegerField(default=0)
+    paid = models.IntegerField(default=0)
+    released = models.IntegerField(default=0)
+    revenue = models.DecimalField(max_digits=32, decimal_places=2, default=0)
+
+    class Meta:
+        verbose_name = 'Daily showing stats'
+        verbose_name_plural = 'Daily showing stats'
+        ordering = ['-date', '-id']
+        unique_together = ['showing', 'date']
+
+    def __str__(self):
+        return str(self.date) + ', showing ' + str(self.showing_id) + ': ' + \
+               str(self.booked) + ' booked, ' + str(self.paid) + ' paid, ' + \
+               str(self.released) + ' released, $' + str(self.revenue)
+
+
+class OutboxEvent(models.Model):
+    """
+    Event saved in the transaction of the change it describes and sent to the broker
+    by relay_outbox command (see booking.outbox)
+    """
+    TASK = 'task'
+    PUBSUB = 'pubsub'
+    TOPICS = [
+        (TASK, 'Celery task'),
+        (PUBSUB, 'Pub/sub message'),
+    ]
+    created = models.DateTimeField(auto_now_add=True)
+    topic = models.CharField(max_length=16, choices=TOPICS)
+    payload = models.TextField()
+
+    class Meta:
+        verbose_name = 'Outbox event'
+        verbose_name_plural = 'Outbox events'
+        ordering = ['id']
+
+    def __str__(self):
+        return self.topic + ' ' + self.payload
+
+
+class SlowTaskRun(models.Model):
+    """
+    Celery task run that waited in the queue and ran longer than CINEMA_SLOW_TASK_SECONDS,
+    only CINEMA_SLOW_TASK_RUNS_LIMIT latest runs are kept
+    """
+    created = models.DateTimeField(auto_now_add=True)
+    task = models.CharField(max_length=255)
+    task_id = models.CharField(max_length=36)
+    queue = models.CharField(max_length=64, blank=True)
+    state = models.CharField(max_length=16)
+    wait_ms = models.FloatField(null=True, verbose_name='Queue wait, ms')
+    duration_ms = models.FloatField(verbose_name='Run time, ms')
+    retries = models.IntegerField(default=0)
+    rows_written = models.IntegerField(default=0)
+    query_count = models.IntegerField(verbose_name='SQL queries')
+    query_ms = models.FloatField(verbose_name='SQL time, ms')
+
+    class Meta:
+        verbose_name = 'Slow task run'
+        verbose_name_plural = 'Slow task runs'
+        ordering = ['-id']
+
+    def __str__(self):
+        return self.task + ' ' + self.state + ', ' + str(round(self.duration_ms)) + ' ms'
@@ -0,0 +1,71 @@
+"""
+Booking app transactional outbox
+
+Celery tasks and pub/sub messages are not sent from the request: they are saved as
+OutboxEvent rows in the transaction of the change, so they are sent if and only if the change
+is committed, and the request never waits for the broker. relay_outbox command sends events
+in batches over one broker connection and deletes them in the same transaction. An event may
+be sent twice if the relay dies after sending, so consumers have to be idempotent.
+"""
+import json
+import time
+
+from django.db import transaction
+
+from booking.metrics import OUTBOX_RELAYED, OUTBOX_LAG
+from booking.models import OutboxEvent
+from tools import pubsub
+from tools.metrics import REGISTRY
+
+
+def send_task(task, **kwargs):
+    """
+    Saves Celery task call with JSON serializable keyword arguments, task is a task or its name
+    """
+    name = getattr(task, 'name', task)
+    OutboxEvent.objects.create(topic=OutboxEvent.TASK,
+                               payload=json.dumps({'task': name, 'kwargs': kwargs}))
+
+
+def publish(channel, message):
+    """Saves pub/sub message"""
+    OutboxEvent.objects.create(topic=OutboxEvent.PUBSUB,
+                               payload=json.dumps({'channel': channel, 'message': message}))
+
+
+def _send(events):
+    tasks = []
+    messages = []
+    for event in events:
+        payload = json.loads(event.payload)
+        if event.topic == OutboxEvent.TASK:
+            tasks.append((payload['task'], payload['kwargs']))
+        else:
+            messages.append((payload['channel'], payload['message']))
+    if tasks:
+        from cinema.celery import app  # pylint: disable=import-outside-toplevel
+        with app.producer_or_acquire() as producer:
+            for name, kwargs in tasks:
+                app.send_task(name, kwargs=kwargs, producer=producer)
+    if messages:
+        pubsub.publish_many(messages)
+
+
+def relay(batch_size):
+    """
+    Sends the oldest events, returns number of sent events
+
+    Rows locked by another relay are skipped, so relays can run in parallel.
+    """
+    with transaction.atomic():
+        events = list(OutboxEvent.objects.select_for_update(skip_locked=True)[:batch_size])
+        if not events:
+            return 0
+        _send(events)
+        OutboxEvent.objects.filter(pk__in=[event.pk for event in events]).delete()
+    now = time.time()
+    for event in events:
+        OUTBOX_RELAYED.inc(topic=event.topic)
+        OUTBOX_LAG.observe(now - event.created.timestamp())
+    REGISTRY.flush()
+    return len(events)
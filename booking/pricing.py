@@ -0,0 +1,129 @@
+"""
+Booking app dynamic pricing
+
+Seat price is the showing price multiplied by the markups of settings.CINEMA_PRICING:
+ - row zone: rows near the centre of the hall cost more
+ - time to the showing
+ - occupancy of the hall
+Rules are not evaluated per seat: ShowingPrices keeps the price of every row and is rebuilt
+only when occupancy or time to the showing crosses a bucket boundary (or the showing price is
+changed), so a seat price is one list lookup. Tickets keep the price quoted at booking.
+"""
+import bisect
+import datetime
+import json
+from decimal import Decimal
+
+from django.conf import settings
+from django.db.models import F
+from django.utils import timezone
+
+from booking.models import Showing, ShowingPrices, Ticket
+
+CENTS = Decimal('0.01')
+
+
+def _rules():
+    rules = settings.CINEMA_PRICING
+    return {name: [(bound, Decimal(markup)) for bound, markup in rules[name]]
+            for name in ('row_zones', 'hours_before_showing', 'occupancy')}
+
+
+def row_markups(rows_count, zones):
+    """
+    Returns markup of every row: zones are (distance, markup) pairs sorted by distance, which
+    is 0 for the middle of the hall and 1 for its front and back
+    """
+    middle = (rows_count + 1) / 2
+    bounds = [bound for bound, _ in zones]
+    markups = []
+    for row_number in range(1, rows_count + 1):
+        distance = abs(row_number - middle) / (rows_count / 2)
+        markups.append(zones[min(bisect.bisect_left(bounds, distance), len(zones) - 1)][1])
+    return markups
+
+
+def occupancy_bucket(booked, capacity, buckets=None):
+    """Returns index of the occupancy bucket, buckets are (occupancy, markup) pairs"""
+    buckets = buckets or _rules()['occupancy']
+    occupancy = booked / capacity if capacity else 1
+    return max(bisect.bisect_right([bound for bound, _ in buckets], occupancy) - 1, 0)
+
+
+def time_bucket(date_time, now, buckets):
+    """
+    Returns index of the time bucket and the time it ends (None for the last bucket),
+    buckets are (hours before the showing, markup) pairs sorted by hours descending
+    """
+    for index, (hours, _) in enumerate(buckets):
+        ends = date_time - datetime.timedelta(hours=hours)
+        if now < ends:
+            return index, ends
+    return len(buckets) - 1, None
+
+
+def rebuild(showing, now=None):
+    """Computes and saves prices of the showing rows, returns ShowingPrices"""
+    rules = _rules()
+    now = now or timezone.now()
+    hall = showing.hall
+    capacity = hall.seats_count
+    booked = Ticket.objects.filter(showing=showing).count()
+    occupancy = occupancy_bucket(booked, capacity, rules['occupancy'])
+    period, valid_until = time_bucket(showing.date_time, now, rules['hours_before_showing'])
+    markup = rules['occupancy'][occupancy][1] * rules['hours_before_showing'][period][1]
+    base_price = Decimal(showing.price)
+    row_prices = [str((base_price * markup * row_markup).quantize(CENTS))
+                  for row_markup in row_markups(hall.rows_count, rules['row_zones'])]
+    prices, _ = ShowingPrices.objects.update_or_create(showing=showing, defaults={
+        'base_price': base_price,
+        'capacity': capacity,
+        'booked': booked,
+        'occupancy_bucket': occupancy,
+        'valid_until': valid_until,
+        'row_prices': json.dumps(row_prices),
+    })
+    return prices
+
+
+def showing_prices(showing, now=None):
+    """Returns up to date ShowingPrices of the showing"""
+    now = now or timezone.now()
+    prices = ShowingPrices.objects.filter(showing=showing).first()
+    if prices is None or prices.base_price != Decimal(showing.price) or \
+            (prices.valid_until is not None and prices.valid_until <= now):
+        prices = rebuild(showing, now)
+    return prices
+
+
+def quote(showing, row_number):
+    """Returns current price of the seat in the row"""
+    return Decimal(json.loads(showing_prices(showing).row_prices)[row_number - 1])
+
+
+def ticket_price(ticket):
+    """Returns price of the ticket"""
+    return ticket.price if ticket.price is not None else ticket.showing.price
+
+
+def price_of_ticket(price, showing_price):
+    """Returns price of the ticket by its price and its showing price"""
+    return price if price is not None else showing_price
+
+
+def record_booked(showing_id, count=1):
+    """
+    Counts booked (or released if count is negative) seats of the showing, rebuilds its
+    prices when occupancy crosses a bucket boundary
+    """
+    prices = ShowingPrices.objects.filter(showing_id=showing_id)
+    if not prices.update(booked=F('booked') + count):
+        return
+    prices = prices.get()
+    if occupancy_bucket(prices.booked, prices.capacity) != prices.occupancy_bucket:
+        rebuild(Showing.objects.select_related('hall').get(pk=showing_id))
+
+
+def record_released(showing_id, count=1):
+    """Counts released seats of the showing"""
+    record_booked(showing_id, -count)
@@ -0,0 +1,217 @@
+"""
+Booking app on-demand request profiling
+
+Staff users add ``?_profile=1`` to any request to get the profiling report instead of the
+response, or send ``X-Profile: 1`` header to get the regular response with ``X-Profile-Id``
+header. Reports are stored in ProfileReport ring buffer and are viewable from the admin.
+
+Queries are recorded on every configured database, so requests routed to replicas (see
+tools.db_router) are profiled as they run, and explained on the database that ran them.
+"""
+import cProfile
+import json
+import pstats
+import threading
+import time
+from collections import OrderedDict
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections, DatabaseError
+from django.http import JsonResponse
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.fields import SkipField
+from rest_framework.relations import PKOnlyObject
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+
+from booking.models import ProfileReport
+
+TOP_FUNCTIONS_COUNT = 30
+EXPLAINED_QUERIES_COUNT = 10
+
+_state = threading.local()
+
+
+class RequestProfile:
+    """
+    Collects profiler stats, SQL queries and serializer fields timings of one request
+    """
+
+    def __init__(self):
+        self.profiler = cProfile.Profile()
+        self.queries = []
+        self.serializers = OrderedDict()
+
+    def execute_wrapper(self, execute, sql, params, many, context):
+        """Database execute wrapper measures every SQL statement"""
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append({
+                'database': context['connection'].alias,
+                'sql': sql,
+                'params': params if not many else None,
+                'duration_ms': (time.perf_counter() - start) * 1000,
+            })
+
+    def add_field_timing(self, serializer, field_name, duration):
+        """Accumulates serializer field representation time"""
+        fields = self.serializers.setdefault(serializer, OrderedDict())
+        timing = fields.setdefault(field_name, {'calls': 0, 'total_ms': 0.0})
+        timing['calls'] += 1
+        timing['total_ms'] += duration * 1000
+
+    def top_functions(self):
+        """Returns functions sorted by cumulative time"""
+        stats = pstats.Stats(self.profiler).stats
+        functions = sorted(stats.items(), key=lambda item: item[1][3], reverse=True)
+        return [
+            {
+                'function': f'{file_name}:{line}({name})',
+                'calls': calls,
+                'tottime_ms': total_time * 1000,
+                'cumtime_ms': cumulative_time * 1000,
+            }
+            for (file_name, line, name), (_, calls, total_time, cumulative_time, _)
+            in functions[:TOP_FUNCTIONS_COUNT]
+        ]
+
+    def explained_queries(self):
+        """Returns SQL statements with EXPLAIN plans for the slowest SELECT statements"""
+        slowest = sorted((query for query in self.queries
+                          if query['params'] is not None and
+                          query['sql'].lstrip().upper().startswith('SELECT')),
+                         key=lambda query: query['duration_ms'],
+                         reverse=True)[:EXPLAINED_QUERIES_COUNT]
+        for query in slowest:
+            connection = connections[query['database']]
+            try:
+                with connection.cursor() as cursor:
+                    cursor.execute(f'{connection.ops.explain_query_prefix()} {query["sql"]}',
+                                   query['params'])
+                    query['explain'] = [' '.join(str(column) for column in row)
+                                        for row in cursor.fetchall()]
+            except DatabaseError as ex:
+                query['explain'] = [f'EXPLAIN failed: {ex}']
+        return [{'database': query['database'],
+                 'sql': query['sql'],
+                 'duration_ms': query['duration_ms'],
+                 'explain': query.get('explain')} for query in self.queries]
+
+    def report(self, request, response, duration):
+        """Returns report dictionary"""
+        return OrderedDict([
+            ('method', request.method),
+            ('path', request.get_full_path()),
+            ('status_code', response.status_code),
+            ('duration_ms', duration * 1000),
+            ('functions', self.top_functions()),
+            ('queries', self.explained_queries()),
+            ('serializers', self.serializers),
+        ])
+
+
+def current_profile():
+    """Returns profile of the current request or None"""
+    return getattr(_state, 'profile', None)
+
+
+class ProfiledSerializerMixin:
+    """
+    Serializer mixin measures every field representation time while request is profiled
+    """
+
+    def to_representation(self, instance):
+        """Overrides to_representation() method: records time spent on every field"""
+        profile = current_profile()
+        if profile is None:
+            return super().to_representation(instance)
+
+        name = type(self).__name__
+        ret = OrderedDict()
+        for field in self._readable_fields:  # pylint: disable=no-member
+            start = time.perf_counter()
+            try:
+                attribute = field.get_attribute(instance)
+            except SkipField:
+                continue
+            check_for_none = attribute.pk if isinstance(attribute, PKOnlyObject) else attribute
+            if check_for_none is None:
+                ret[field.field_name] = None
+            else:
+                ret[field.field_name] = field.to_representation(attribute)
+            profile.add_field_timing(name, field.field_name, time.perf_counter() - start)
+        return ret
+
+
+def _get_staff_user(request):
+    """Returns staff user authenticated by session or JWT token or None"""
+    user = getattr(request, 'user', None)
+    if user is not None and user.is_staff:
+        return user
+    try:
+        authenticated = JWTAuthentication().authenticate(request)
+    except (AuthenticationFailed, InvalidToken):
+        return None
+    if authenticated and authenticated[0].is_staff:
+        return authenticated[0]
+    return None
+
+
+def save_report(user, report):
+    """Saves report keeping only CINEMA_PROFILE_REPORTS_LIMIT latest reports"""
+    instance = ProfileReport.objects.create(
+        method=report['method'],
+        path=report['path'][:255],
+        status_code=report['status_code'],
+        duration_ms=report['duration_ms'],
+        query_count=len(report['queries']),
+        user=str(user),
+        report=json.dumps(report),
+    )
+    limit = settings.CINEMA_PROFILE_REPORTS_LIMIT
+    ProfileReport.objects.filter(pk__lte=instance.pk - limit).delete()
+    return instance
+
+
+class ProfilingMiddleware:  # pylint: disable=too-few-public-methods
+    """
+    Middleware profiles requests of staff users on demand
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        as_report = request.GET.get('_profile') == '1'
+        as_header = request.META.get('HTTP_X_PROFILE') == '1'
+        user = _get_staff_user(request) if as_report or as_header else None
+        if user is None:
+            return self.get_response(request)
+
+        profile = RequestProfile()
+        _state.profile = profile
+        start = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for database in connections:
+                    stack.enter_context(
+                        connections[database].execute_wrapper(profile.execute_wrapper))
+                profile.profiler.enable()
+                try:
+                    response = self.get_response(request)
+                finally:
+                    profile.profiler.disable()
+        finally:
+            _state.profile = None
+        duration = time.perf_counter() - start
+
+        report = profile.report(request, response, duration)
+        instance = save_report(user, report)
+        report['id'] = instance.pk
+        if as_report:
+            return JsonResponse(report)
+        response['X-Profile-Id'] = str(instance.pk)
+        return response
@@ -0,0 +1,52 @@
+"""
+Booking app reports
+
+Reports are read from DailyShowingStats rollup instead of scanning tickets, every report is
+a single aggregate query.
+"""
+from django.db.models import DateField, F, Sum, Value
+from django.db.models.functions import Coalesce, Trunc
+
+from booking.models import DailyShowingStats
+
+REVENUE_GROUPS = ('movie', 'hall', 'day', 'week', 'month')
+
+
+def occupancy(showings):
+    """
+    Annotates showings queryset with capacity, sold (paid), held (booked, not paid) and free
+    seats counts
+    """
+    stats = 'dailyshowingstats__'
+    return showings \
+        .annotate(capacity=F('hall__seats_count'),
+                  sold=Coalesce(Sum(f'{stats}paid'), Value(0)),
+                  held=Coalesce(Sum(F(f'{stats}booked') - F(f'{stats}paid') -
+                                    F(f'{stats}released')), Value(0))) \
+        .annotate(free=F('capacity') - F('sold') - F('held')) \
+        .values('id', 'hall', 'movie', 'date_time', 'capacity', 'sold', 'held', 'free')
+
+
+def revenue(showings, group_by):
+    """
+    Returns paid tickets count and revenue (sum of paid tickets prices) of given showings
+    grouped by movie, hall or showing date truncated to day, week or month
+    """
+    if group_by not in REVENUE_GROUPS:
+        raise ValueError(f'group_by should be one of {REVENUE_GROUPS}')
+
+    stats = DailyShowingStats.objects.filter(showing__in=showings.values('pk'))
+    if group_by in ('movie', 'hall'):
+        stats = stats \
+            .annotate(key=F(f'showing__{group_by}'), name=F(f'showing__{group_by}__name')) \
+            .values('key', 'name')
+        ordering = ['-revenue', 'key']
+    else:
+        stats = stats \
+            .annotate(key=Trunc('showing__date_time', group_by, output_field=DateField())) \
+            .values('key')
+        ordering = ['key']
+    return stats \
+        .annotate(tickets=Sum('paid'), revenue=Sum('revenue')) \
+        .filter(tickets__gt=0) \
+        .order_by(*ordering)
@@ -0,0 +1,101 @@
+"""
+Booking app daily sales rollup
+
+DailyShowingStats rows are keyed by showing and ticket booking date and are updated
+incrementally by the booking path, pay_ticket and disable_bookings. Since every booked
+ticket either still exists or was released, booked = existing tickets + released, so
+reconcile() can rebuild booked, paid and revenue from tickets.
+"""
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import Coalesce, TruncDate
+from django.utils import timezone
+
+from booking.models import DailyShowingStats, Ticket
+
+PAID = ~Q(receipt='')
+
+
+def add(showing_id, date, **changes):
+    """
+    Adds given booked, paid, released and revenue values to the showing's row of the date
+    """
+    changes = {field: value for field, value in changes.items() if value}
+    if not changes:
+        return
+    rows = DailyShowingStats.objects.filter(showing_id=showing_id, date=date)
+    increments = {field: F(field) + value for field, value in changes.items()}
+    if rows.update(**increments):
+        return
+    try:
+        with transaction.atomic():
+            DailyShowingStats.objects.create(showing_id=showing_id, date=date, **changes)
+    except IntegrityError:
+        rows.update(**increments)
+
+
+def record_booked(ticket):
+    """Counts booked ticket"""
+    add(ticket.showing_id, timezone.localdate(ticket.date_time), booked=1)
+
+
+def record_paid(ticket, price):
+    """Counts paid ticket and its price"""
+    add(ticket.showing_id, timezone.localdate(ticket.date_time), paid=1, revenue=price)
+
+
+def record_moved(ticket, showing_id, price):
+    """Counts ticket of the given price moved from the showing to its current showing"""
+    date = timezone.localdate(ticket.date_time)
+    paid = 1 if ticket.receipt else 0
+    add(showing_id, date, released=1, paid=-paid, revenue=-price * paid)
+    add(ticket.showing_id, date, booked=1, paid=paid, revenue=price * paid)
+
+
+def record_released(tickets):
+    """Counts released tickets given as (showing_id, date_time) pairs"""
+    released = defaultdict(int)
+    for showing_id, date_time in tickets:
+        released[(showing_id, timezone.localdate(date_time))] += 1
+    for (showing_id, date), count in released.items():
+        add(showing_id, date, released=count)
+
+
+def reconcile(showings):
+    """
+    Rebuilds booked, paid and revenue of given showings rollup rows from tickets, released
+    counts are kept as is. Returns count of created and fixed rows
+    """
+    with transaction.atomic():
+        stored = DailyShowingStats.objects \
+            .select_for_update() \
+            .filter(showing__in=showings.values('pk'))
+        stored = {(row.showing_id, row.date): row for row in stored}
+        # Tickets are counted after the rows are locked: increments of bookings committed
+        # meanwhile are counted, later ones wait for the lock and are added to the result
+        actual = Ticket.objects \
+            .filter(showing__in=showings.values('pk')) \
+            .annotate(date=TruncDate('date_time')) \
+            .values('showing', 'date') \
+            .annotate(total=Count('id'),
+                      paid=Count('id', filter=PAID),
+                      revenue=Sum(Coalesce('price', 'showing__price'), filter=PAID)) \
+            .order_by()
+        actual = {(row['showing'], row['date']): row for row in actual}
+        created, changed = [], []
+        for key in set(actual) | set(stored):
+            row = stored.get(key) or DailyShowingStats(showing_id=key[0], date=key[1])
+            tickets = actual.get(key, {})
+            expected = (tickets.get('total', 0) + row.released,
+                        tickets.get('paid', 0),
+                        tickets.get('revenue') or Decimal(0))
+            if (row.booked, row.paid, row.revenue) == expected:
+                continue
+            row.booked, row.paid, row.revenue = expected
+            (changed if row.pk else created).append(row)
+        DailyShowingStats.objects.bulk_create(created)
+        DailyShowingStats.objects.bulk_update(changed, ['booked', 'paid', 'revenue'])
+    return len(created) + len(changed)
@@ -0,0 +1,97 @@
+"""
+Booking app schedule
+
+Schedule of a day lists showings of the day grouped by movie with movie and hall summaries and
+seats left, so clients draw the "what's on" screen with a single request. It is built by one
+query and cached per day until showings or tickets are changed.
+
+Cached schedules are dropped by bumping a version key, which has to be kept in the cache shared
+by all processes (CINEMA_CACHE_URL, see booking.W001 check): a process with its own cache would
+serve schedules changed by other processes until they expire. Ticket deletions are not
+signalled, so tickets are still deleted by single queries: code deleting them calls
+invalidate() once per deletion.
+"""
+import datetime
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, F
+from django.db.models.signals import post_delete, post_save
+from django.utils import timezone
+
+from booking.models import Showing, Ticket
+from booking.serializers import ScheduleSerializer
+
+VERSION_KEY = 'booking:schedule_version'
+
+
+def day_showings(day):
+    """
+    Returns showings of the day (in the current time zone) ordered by movie and time, with
+    movies, halls and seats_left
+    """
+    start = timezone.make_aware(datetime.datetime.combine(day, datetime.time.min))
+    end = timezone.make_aware(datetime.datetime.combine(day + datetime.timedelta(1),
+                                                        datetime.time.min))
+    return Showing.objects \
+        .filter(date_time__gte=start, date_time__lt=end) \
+        .select_related('movie', 'hall') \
+        .annotate(seats_left=F('hall__seats_count') - Count('ticket')) \
+        .order_by('movie__name', 'movie_id', 'date_time', 'id')
+
+
+def build(day):
+    """Returns serialized schedule of the day"""
+    movies = []
+    for showing in day_showings(day):
+        if not movies or movies[-1]['movie'] != showing.movie:
+            movies.append({'movie': showing.movie, 'showings': []})
+        movies[-1]['showings'].append(showing)
+    return ScheduleSerializer({'date': day, 'movies': movies}).data
+
+
+def cache_key(day):
+    """Returns cache key of the schedule of the day, it is changed with showings and tickets"""
+    return f'booking:schedule:{cache.get(VERSION_KEY, 0)}:{day.isoformat()}'
+
+
+def schedule(day, key=None):
+    """
+    Returns serialized schedule of the day, cached until showings or tickets are changed,
+    key is cache_key() of the day when it is known already
+    """
+    key = key or cache_key(day)
+    data = cache.get(key)
+    if data is None:
+        data = build(day)
+        cache.set(key, data, settings.CINEMA_SCHEDULE_CACHE_SECONDS)
+    return data
+
+
+def _bump_version():
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        cache.set(VERSION_KEY, 1, None)
+
+
+def invalidate():
+    """Drops cached schedules after the current transaction is committed"""
+    # Schedule read before the commit would be cached again with changes not committed yet
+    transaction.on_commit(_bump_version)
+
+
+def _invalidate(**kwargs):  # pylint: disable=unused-argument
+    invalidate()
+
+
+def install():
+    """
+    Connects handlers dropping cached schedules after showings are changed and tickets are
+    saved, a delete receiver of tickets would make bulk deletes fetch and delete them one by one
+    """
+    post_save.connect(_invalidate, sender=Showing, dispatch_uid='cinema_schedule_Showing_save')
+    post_delete.connect(_invalidate, sender=Showing,
+                        dispatch_uid='cinema_schedule_Showing_delete')
+    post_save.connect(_invalidate, sender=Ticket, dispatch_uid='cinema_schedule_Ticket_save')
@@ -0,0 +1,227 @@
+"""
+Booking app movie search
+
+Movies are ranked by name: names starting with the query first, then names containing it,
+then names similar to it by trigrams, e.g. 'matrx' finds 'The Matrix'. Names are compared
+case-insensitively and in-memory index ignores punctuation.
+
+On PostgreSQL the search is done by pg_trgm and the movie_name_trgm_idx GIN index: names are
+matched by ILIKE and % operators the index serves, not by UPPER(name) LIKE of icontains. Other
+databases are searched with an in-memory trigram index of movie names built once per process
+and rebuilt after movies are changed.
+"""
+import bisect
+import math
+import re
+import threading
+from array import array
+from collections import Counter
+
+from django.conf import settings
+from django.contrib.postgres.lookups import TrigramSimilar
+from django.contrib.postgres.search import TrigramSimilarity
+from django.core.cache import cache
+from django.db import connections
+from django.db.models import Case, CharField, IntegerField, Lookup, Q, When
+from django.db.models.signals import post_delete, post_save
+
+from booking.models import Movie
+
+# Minimal trigram similarity of names, default pg_trgm.similarity_threshold
+SIMILARITY = 0.3
+
+PREFIX = 2
+CONTAINS = 1
+SIMILAR = 0
+
+VERSION_KEY = 'booking:movie_search_version'
+
+_NON_WORD = re.compile(r'\W+')
+
+
+def normalize(text):
+    """Returns lowercase words of the text separated by single spaces"""
+    return _NON_WORD.sub(' ', text.casefold()).strip()
+
+
+def trigrams(text):
+    """Returns trigrams of normalized text words padded as pg_trgm does"""
+    grams = set()
+    for word in text.split():
+        padded = f'  {word} '
+        grams.update(padded[index:index + 3] for index in range(len(padded) - 2))
+    return grams
+
+
+class ILikeContains(Lookup):
+    """Case-insensitive containment by ILIKE, which pg_trgm indexes serve"""
+    lookup_name = 'ilike_contains'
+    pattern = '%{}%'
+    prepare_rhs = False
+
+    def get_db_prep_lookup(self, value, connection):
+        return '%s', [self.pattern.format(connection.ops.prep_for_like_query(value))]
+
+    def as_sql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        return f'{lhs} ILIKE {rhs}', lhs_params + rhs_params
+
+
+class ILikeStartsWith(ILikeContains):
+    """Case-insensitive prefix match by ILIKE"""
+    lookup_name = 'ilike_startswith'
+    pattern = '{}%'
+
+
+def _contains(posting, movie_id):
+    position = bisect.bisect_left(posting, movie_id)
+    return position < len(posting) and posting[position] == movie_id
+
+
+class MovieIndex:
+    """
+    Trigram index of movie names
+
+    Sorted names and sorted word suffixes of names answer prefix queries with a binary search,
+    sorted posting lists of movie ids by trigram give names containing or similar to a query.
+    Ranks having more than limit names are cut in alphabetical order of the names.
+    """
+
+    def __init__(self, movies):
+        self.names = {}
+        self.sizes = {}
+        postings = {}
+        self.starts = []
+        self.words = []
+        for movie_id, name in movies:
+            name = normalize(name)
+            self.names[movie_id] = name
+            grams = trigrams(name)
+            self.sizes[movie_id] = len(grams)
+            for gram in grams:
+                postings.setdefault(gram, []).append(movie_id)
+            self.starts.append((name, movie_id))
+            self.words.extend((name[match.end():], movie_id) for match in re.finditer(' ', name))
+        self.postings = {gram: array('l', sorted(ids)) for gram, ids in postings.items()}
+        self.starts.sort()
+        self.words.sort()
+
+    @staticmethod
+    def _prefixed(suffixes, query, found, rank, limit):
+        """Adds ids of suffixes starting with the query to found until it has limit ids"""
+        position = bisect.bisect_left(suffixes, (query,))
+        while position < len(suffixes) and len(found) < limit and \
+                suffixes[position][0].startswith(query):
+            found.setdefault(suffixes[position][1], rank)
+            position += 1
+
+    def _containing(self, query, found, limit):
+        """Adds ids of names containing the query to found until it has limit ids"""
+        inner = {word[index:index + 3] for word in query.split() for index in range(len(word) - 2)}
+        if inner:
+            # Every name containing the query has all its trigrams inside words
+            candidates = min((self.postings.get(gram, ()) for gram in inner), key=len)
+        else:
+            candidates = self.names
+        for movie_id in candidates:
+            if len(found) >= limit:
+                break
+            if movie_id not in found and query in self.names[movie_id]:
+                found[movie_id] = CONTAINS
+
+    def _similar(self, postings, found):
+        """
+        Adds ids of names similar to the query to found, returns similarity of the names
+        sharing trigrams with the query
+        """
+        postings = sorted(postings, key=len)
+        # Names sharing fewer trigrams are not similar even if they have no other trigrams,
+        # so similar names are in one of the shortest posting lists
+        split = len(postings) - math.ceil(SIMILARITY * len(postings)) + 1
+        shortest, others = postings[:split], postings[split:]
+        hits = Counter()
+        for posting in shortest:
+            hits.update(posting)
+        similarity = {}
+        for movie_id, count in hits.items():
+            count += sum(1 for posting in others if _contains(posting, movie_id))
+            similarity[movie_id] = count / (len(postings) + self.sizes[movie_id] - count)
+            if similarity[movie_id] >= SIMILARITY:
+                found.setdefault(movie_id, SIMILAR)
+        return similarity
+
+    def _similarity(self, movie_id, postings):
+        count = sum(1 for posting in postings if _contains(posting, movie_id))
+        return count / (len(postings) + self.sizes[movie_id] - count)
+
+    def search(self, text, limit):
+        """Returns ids of up to limit best matching movies, best first"""
+        query = normalize(text)
+        if not query:
+            return []
+        ranks = {}
+        self._prefixed(self.starts, query, ranks, PREFIX, limit)
+        self._prefixed(self.words, query, ranks, CONTAINS, limit)
+        self._containing(query, ranks, limit)
+        postings = [self.postings.get(gram, ()) for gram in trigrams(query)]
+        similarity = self._similar(postings, ranks) if len(ranks) < limit else {}
+        for movie_id in ranks.keys() - similarity.keys():
+            similarity[movie_id] = self._similarity(movie_id, postings)
+        best = sorted(ranks, key=lambda movie_id: (-ranks[movie_id], -similarity[movie_id],
+                                                   self.names[movie_id], movie_id))
+        return best[:limit]
+
+
+_index = None
+_index_version = None
+_lock = threading.Lock()
+
+
+def movie_index():
+    """Returns up to date MovieIndex of the process"""
+    global _index, _index_version  # pylint: disable=global-statement
+    version = cache.get(VERSION_KEY, 0)
+    if _index is None or _index_version != version:
+        with _lock:
+            if _index is None or _index_version != version:
+                _index = MovieIndex(Movie.objects.values_list('id', 'name').iterator())
+                _index_version = version
+    return _index
+
+
+def _invalidate(**kwargs):  # pylint: disable=unused-argument
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        cache.set(VERSION_KEY, 1, None)
+
+
+def search(queryset, text):
+    """Returns movies of the queryset matching the text, best matches first"""
+    limit = settings.CINEMA_MOVIE_SEARCH_LIMIT
+    if connections[queryset.db].vendor == 'postgresql':
+        return queryset.annotate(
+            similarity=TrigramSimilarity('name', text),
+            rank=Case(When(name__ilike_startswith=text, then=PREFIX),
+                      When(name__ilike_contains=text, then=CONTAINS),
+                      default=SIMILAR, output_field=IntegerField()),
+        ).filter(
+            Q(name__ilike_contains=text) | Q(name__trigram_similar=text)
+        ).order_by('-rank', '-similarity', 'name', 'id')[:limit]
+    ids = movie_index().search(text, limit)
+    return queryset.filter(pk__in=ids).order_by(
+        Case(*[When(pk=movie_id, then=position) for position, movie_id in enumerate(ids)],
+             output_field=IntegerField()))
+
+
+def install():
+    """
+    Registers name lookups of PostgreSQL search and connects handlers rebuilding in-memory
+    indexes after movies are changed
+    """
+    # django.contrib.postgres is not installed: its app requires psycopg2 on every database
+    for lookup in (ILikeContains, ILikeStartsWith, TrigramSimilar):
+        CharField.register_lookup(lookup)
+    post_save.connect(_invalidate, sender=Movie, dispatch_uid='cinema_movie_search_save')
+    post_delete.connect(_invalidate, sender=Movie, dispatch_uid='cinema_movie_search_delete')
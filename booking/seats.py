@@ -0,0 +1,60 @@
+"""
+Booking app seats module
+
+Seat changes are published to pub/sub channel of the showing as JSON list of
+[row_number, seat_number, state] through the transactional outbox.
+"""
+import json
+
+from booking import layout
+from booking import outbox
+from booking import pricing
+from booking.models import Showing, Ticket
+
+BOOKED = 'booked'
+PAID = 'paid'
+FREE = 'free'
+
+# Milliseconds EventSource clients wait before reconnecting to a closed seats stream
+STREAM_RETRY = 3000
+
+
+def seat_map(showing_id):
+    """
+    Returns hall size and layout, row prices and taken seats of the showing
+
+    Raises Showing.DoesNotExist for unknown showing.
+    """
+    showing = Showing.objects.select_related('hall').get(pk=showing_id)
+    taken = Ticket.objects.filter(showing_id=showing_id) \
+        .order_by('row_number', 'seat_number') \
+        .values_list('row_number', 'seat_number')
+    return {
+        'showing': showing_id,
+        'rows_count': showing.hall.rows_count,
+        'rows_size': showing.hall.rows_size,
+        'layout': layout.hall_layout(showing.hall).rows(),
+        'prices': json.loads(pricing.showing_prices(showing).row_prices),
+        'taken': [list(seat) for seat in taken],
+    }
+
+
+def channel(showing_id):
+    """Returns pub/sub channel of showing seat changes"""
+    return f'seats:{showing_id}'
+
+
+def publish_changes(showing_id, changes):
+    """Publishes (row_number, seat_number, state) changes of the showing seats on commit"""
+    message = json.dumps([list(change) for change in changes], separators=(',', ':'))
+    outbox.publish(channel(showing_id), message)
+
+
+def stream_event(name, data):
+    """Returns Server-Sent Event of seats stream"""
+    return f'event: {name}\ndata: {data}\n\n'.encode()
+
+
+def snapshot_event(data):
+    """Returns 'snapshot' event of seats stream with the seat map"""
+    return stream_event('snapshot', json.dumps(data, separators=(',', ':')))
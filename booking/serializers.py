@@ -2,18 +2,116 @@
 Booking app serializers
 """
 import datetime as dt
-from collections import defaultdict
+from collections import OrderedDict, defaultdict
 
 from rest_framework import serializers
+from rest_framework.permissions import SAFE_METHODS
 from rest_framework.serializers import ModelSerializer
 
+from booking import layout
+from booking import pricing
 from booking.models import CustomUser, Hall, Movie, Showing, Ticket
+from booking.profiling import ProfiledSerializerMixin
 from cinema.settings import CINEMA_EARLIEST_TIME, \
     CINEMA_LATEST_TIME, \
     CINEMA_CLEANING_PERIOD_MINUTES, \
     CINEMA_COMMERCIAL_PERIOD_MINUTES
 
 
+def parse_fields(text):
+    """
+    Returns tree of comma separated dotted field names: 'id,showing.hall' is
+    {'id': {}, 'showing': {'hall': {}}}
+    """
+    tree = {}
+    for name in filter(None, (name.strip() for name in (text or '').split(','))):
+        node = tree
+        for part in name.split('.'):
+            node = node.setdefault(part, {})
+    return tree
+
+
+class SparseFieldsMixin:
+    """
+    Serializer mixin builds only fields requested by ?fields=... and replaces related object
+    ids with serializers of expandable_fields requested by ?expand=... in responses to safe
+    requests. Nested fields are separated by '.':
+    ?fields=id,showing.date_time&expand=showing,showing.movie
+
+    Serializers of expanded fields get their part of the requested shape with 'shape' argument.
+    Model fields read by other fields are listed by field name in 'field_columns' (see
+    shape_queryset).
+    """
+    expandable_fields = {}
+    field_columns = {}
+
+    def __init__(self, *args, **kwargs):
+        self._shape = kwargs.pop('shape', None)
+        super().__init__(*args, **kwargs)
+
+    def get_shape(self):
+        """Returns trees of requested fields (empty for all fields) and expanded fields"""
+        if self._shape is None:
+            request = self.context.get('request')
+            if request is None or request.method not in SAFE_METHODS:
+                self._shape = {}, {}
+            else:
+                self._shape = parse_fields(request.query_params.get('fields')), \
+                              parse_fields(request.query_params.get('expand'))
+        return self._shape
+
+    def get_fields(self):
+        fields = super().get_fields()
+        only, expand = self.get_shape()
+        errors = {}
+        unknown = set(only) - set(fields)
+        if unknown:
+            errors['fields'] = [f'Unknown fields: {", ".join(sorted(unknown))}']
+        unknown = set(expand) - set(self.expandable_fields)
+        if unknown:
+            errors['expand'] = [f'Not expandable fields: {", ".join(sorted(unknown))}']
+        if errors:
+            raise serializers.ValidationError(errors)
+        if only:
+            fields = OrderedDict((name, field) for name, field in fields.items() if name in only)
+        for name, nested in expand.items():
+            if name in fields:
+                fields[name] = self.expandable_fields[name](
+                    source=fields[name].source, read_only=True, shape=(only.get(name, {}), nested))
+        return fields
+
+
+def _read_columns(serializer, prefix=''):
+    """Returns model fields and related objects read by the serializer fields"""
+    model = serializer.Meta.model
+    concrete = [field.name for field in model._meta.concrete_fields]
+    columns, relations = [], []
+    for name, field in serializer.fields.items():
+        if isinstance(field, serializers.BaseSerializer):
+            nested_columns, nested_relations = _read_columns(field, f'{prefix}{field.source}__')
+            columns += [prefix + field.source] + nested_columns
+            relations += [prefix + field.source] + nested_relations
+            continue
+        for column in getattr(serializer, 'field_columns', {}).get(name, (field.source,)):
+            if column.split('__')[0] not in concrete:
+                # Field reads the instance itself
+                columns += [prefix + column for column in concrete]
+            elif '__' in column:
+                relations.append(prefix + column.rsplit('__', 1)[0])
+                columns += [prefix + column.rsplit('__', 1)[0], prefix + column]
+            else:
+                columns.append(prefix + column)
+    return columns, relations
+
+
+def shape_queryset(queryset, serializer):
+    """
+    Returns queryset loading only the columns and related objects read by the serializer fields
+    """
+    columns, relations = _read_columns(serializer)
+    return queryset.select_related(*relations).only(*columns)
+
+
 class CustomUserPasswordHashMixin:
     """
     User's password hash mixin. Prevents showing passwords as a plane text
@@ -51,21 +149,25 @@ class CustomUserAdminSerializer(CustomUserPasswordHashMixin, ModelSerializer):
         fields = ['id', 'email', 'is_staff', 'is_active', 'password']
 
 
-class HallSerializer(ModelSerializer):
+class HallSerializer(SparseFieldsMixin, ModelSerializer):
     """Hall serializer"""
-    seats_count = serializers.SerializerMethodField()
 
     class Meta:
         model = Hall
-        fields = ['id', 'name', 'rows_count', 'rows_size', 'seats_count']
+        fields = ['id', 'name', 'rows_count', 'rows_size', 'layout', 'seats_count']
 
-    @staticmethod
-    def get_seats_count(obj):
-        """Returns total seats count in current hall"""
-        return obj.rows_count * obj.rows_size
+    def validate(self, attrs):
+        values = {field: getattr(self.instance, field)
+                  for field in ('rows_count', 'rows_size', 'layout')} if self.instance else {}
+        values.update(attrs)
+        try:
+            layout.hall_layout(Hall(**values))
+        except ValueError as ex:
+            raise serializers.ValidationError({'layout': str(ex)})
+        return attrs
 
 
-class MovieSerializer(ModelSerializer):
+class MovieSerializer(SparseFieldsMixin, ModelSerializer):
     """Movie serializer"""
 
     class Meta:
@@ -73,8 +175,12 @@ class MovieSerializer(ModelSerializer):
         fields = ['id', 'name', 'duration', 'premiere_year']
 
 
-class ShowingSerializer(ModelSerializer):
+class ShowingSerializer(ProfiledSerializerMixin, SparseFieldsMixin, ModelSerializer):
     """Showing serializer"""
+    expandable_fields = {
+        'hall': HallSerializer,
+        'movie': MovieSerializer,
+    }
 
     class Meta:
         model = Showing
@@ -121,10 +227,22 @@ class ShowingSerializer(ModelSerializer):
         return attrs
 
 
-class TicketBaseSerializer(ModelSerializer):
+class TicketBaseSerializer(ProfiledSerializerMixin, SparseFieldsMixin, ModelSerializer):
     """Ticket base serializer"""
-    price = serializers.ReadOnlyField(source='showing.price')
+    price = serializers.SerializerMethodField()
     paid = serializers.SerializerMethodField()
+    expandable_fields = {
+        'showing': ShowingSerializer,
+    }
+    field_columns = {
+        'price': ('price', 'showing__price'),
+        'paid': ('receipt',),
+    }
+    # Representation of field_columns values by booking.compiled
+    compiled_fields = {
+        'price': pricing.price_of_ticket,
+        'paid': bool,
+    }
 
     class Meta:
         model = Ticket
@@ -140,6 +258,11 @@ class TicketBaseSerializer(ModelSerializer):
             'receipt',
         ]
 
+    @staticmethod
+    def get_price(obj=None):
+        """Returns price quoted at booking"""
+        return pricing.ticket_price(obj)
+
     @staticmethod
     def get_paid(obj=None):
         """Returns payment receipt"""
@@ -169,6 +292,10 @@ class TicketBaseSerializer(ModelSerializer):
                 errors['row_number'].append(f'Cannot be more than {showing.hall.rows_count}')
             if seat_number and showing.hall.rows_size < seat_number:
                 errors['seat_number'].append(f'Cannot be more than {showing.hall.rows_size}')
+            if not errors:
+                hall_layout = layout.hall_layout(showing.hall)
+                if not hall_layout.is_seat(row_number, seat_number):
+                    errors['seat_number'].append('There is no seat at this place')
 
         # Validate the place is free
         ticket = Ticket.objects.filter(showing=showing,
@@ -197,3 +324,71 @@ class TicketCreateSerializer(TicketSerializer):
         fields = TicketSerializer.Meta.fields
         read_only_fields = \
             list(set(TicketSerializer.Meta.read_only_fields) - {'showing', 'user', 'date_time'})
+
+
+class SeatMapSerializer(serializers.Serializer):  # pylint: disable=abstract-method
+    """
+    Showing seats serializer, taken seats are [row_number, seat_number] pairs, prices are
+    current seat prices by row, layout rows are strings of places (see booking.layout)
+    """
+    showing = serializers.IntegerField()
+    rows_count = serializers.IntegerField()
+    rows_size = serializers.IntegerField()
+    layout = serializers.ListField(child=serializers.CharField())
+    prices = serializers.ListField(
+        child=serializers.DecimalField(max_digits=32, decimal_places=2))
+    taken = serializers.ListField(child=serializers.ListField(child=serializers.IntegerField()))
+
+
+class ScheduleHallSerializer(ModelSerializer):
+    """Hall summary serializer of schedule"""
+
+    class Meta:
+        model = Hall
+        fields = ['id', 'name']
+
+
+class ScheduleShowingSerializer(ModelSerializer):
+    """Showing serializer of schedule"""
+    hall = ScheduleHallSerializer()
+    seats_left = serializers.IntegerField()
+
+    class Meta:
+        model = Showing
+        fields = ['id', 'date_time', 'price', 'hall', 'seats_left']
+
+
+class ScheduleMovieSerializer(serializers.Serializer):  # pylint: disable=abstract-method
+    """Movie showings serializer of schedule"""
+    movie = MovieSerializer()
+    showings = ScheduleShowingSerializer(many=True)
+
+
+class ScheduleSerializer(serializers.Serializer):  # pylint: disable=abstract-method
+    """Schedule serializer, showings of the day grouped by movie"""
+    date = serializers.DateField()
+    movies = ScheduleMovieSerializer(many=True)
+
+
+class OccupancyReportSerializer(serializers.Serializer):  # pylint: disable=abstract-method
+    """Showing occupancy report serializer"""
+    showing = serializers.IntegerField(source='id')
+    hall = serializers.IntegerField()
+    movie = serializers.IntegerField()
+    date_time = serializers.DateTimeField()
+    capacity = serializers.IntegerField()
+    sold = serializers.IntegerField()
+    held = serializers.IntegerField()
+    free = serializers.IntegerField()
+
+
+class RevenueReportSerializer(serializers.Serializer):  # pylint: disable=abstract-method
+    """
+    Revenue report serializer
+
+    key is movie or hall id with its name, or the first day of a period
+    """
+    key = serializers.ReadOnlyField()
+    name = serializers.CharField(required=False)
+    tickets = serializers.IntegerField()
+    revenue = serializers.DecimalField(max_digits=32, decimal_places=2)
@@ -0,0 +1,141 @@
+"""
+Booking app Celery task instrumentation
+
+Every task run is measured by Celery signal handlers, so tasks need no code of their own:
+ - queue wait: from sending the task to the broker (the sender stamps the message header)
+   to its start by a worker
+ - run time by final state, retries and rows written by SQL statements of the run
+Metrics go to the process registry (see tools.metrics). Runs that waited and ran longer than
+CINEMA_SLOW_TASK_SECONDS are stored in SlowTaskRun ring buffer and are viewable from the admin.
+Handlers are installed by the Celery app (cinema/celery.py), so processes which never send or
+run tasks do not import Celery.
+"""
+import logging
+import time
+
+from celery import signals
+from django.conf import settings
+from django.db import connections, DatabaseError
+
+from booking.metrics import TASK_QUEUE_WAIT, TASK_DURATION, TASK_RETRIES, TASK_ROWS_WRITTEN
+from tools.metrics import REGISTRY
+
+PUBLISHED_HEADER = 'cinema_published'
+WRITE_STATEMENTS = ('INSERT', 'UPDATE', 'DELETE')
+
+_runs = {}
+
+
+class TaskRun:
+    """
+    Measurements of one task run
+    """
+
+    def __init__(self, published=None):
+        self.start = time.perf_counter()
+        self.wait = max(0.0, time.time() - published) if published else None
+        self.query_count = 0
+        self.query_time = 0.0
+        self.rows_written = 0
+        self.connections = []
+
+    def execute_wrapper(self, execute, sql, params, many, context):
+        """Database execute wrapper counts statements, their time and written rows"""
+        start = time.perf_counter()
+        try:
+            result = execute(sql, params, many, context)
+        finally:
+            self.query_count += 1
+            self.query_time += time.perf_counter() - start
+        if sql.split(None, 1)[0].upper() in WRITE_STATEMENTS:
+            self.rows_written += max(context['cursor'].rowcount, 0)
+        return result
+
+    def watch_connections(self):
+        """Starts measuring statements of the thread connections"""
+        for connection in connections.all():
+            connection.execute_wrappers.append(self.execute_wrapper)
+            self.connections.append(connection)
+
+    def unwatch_connections(self):
+        """Stops measuring statements"""
+        for connection in self.connections:
+            connection.execute_wrappers.remove(self.execute_wrapper)
+        self.connections = []
+
+
+def slow_task_seconds(name):
+    """Returns total time of queue wait and run that makes the task run slow"""
+    thresholds = settings.CINEMA_SLOW_TASK_SECONDS
+    return thresholds.get(name, thresholds['default'])
+
+
+def save_slow_run(task, run, state, duration):
+    """Saves slow run keeping only CINEMA_SLOW_TASK_RUNS_LIMIT latest runs"""
+    # The Celery app installing the handlers is imported before Django apps are loaded
+    from booking.models import SlowTaskRun  # pylint: disable=import-outside-toplevel
+    instance = SlowTaskRun.objects.create(
+        task=task.name,
+        task_id=task.request.id or '',
+        queue=(task.request.delivery_info or {}).get('routing_key') or '',
+        state=state,
+        wait_ms=run.wait * 1000 if run.wait is not None else None,
+        duration_ms=duration * 1000,
+        retries=task.request.retries or 0,
+        rows_written=run.rows_written,
+        query_count=run.query_count,
+        query_ms=run.query_time * 1000,
+    )
+    limit = settings.CINEMA_SLOW_TASK_RUNS_LIMIT
+    SlowTaskRun.objects.filter(pk__lte=instance.pk - limit).delete()
+    return instance
+
+
+def _on_before_publish(headers=None, **kwargs):  # pylint: disable=unused-argument
+    if headers is not None:
+        headers[PUBLISHED_HEADER] = time.time()
+
+
+def _on_prerun(task_id=None, task=None, **kwargs):  # pylint: disable=unused-argument
+    run = TaskRun(getattr(task.request, PUBLISHED_HEADER, None))
+    run.watch_connections()
+    _runs[task_id] = run
+    if run.wait is not None:
+        TASK_QUEUE_WAIT.observe(run.wait, task=task.name)
+
+
+def _on_retry(sender=None, **kwargs):  # pylint: disable=unused-argument
+    TASK_RETRIES.inc(task=sender.name)
+
+
+def _on_postrun(task_id=None, task=None, state=None, **kwargs):  # pylint: disable=unused-argument
+    run = _runs.pop(task_id, None)
+    if run is None:
+        return
+    duration = time.perf_counter() - run.start
+    run.unwatch_connections()
+    state = state or 'UNKNOWN'
+    TASK_DURATION.observe(duration, task=task.name, state=state)
+    TASK_ROWS_WRITTEN.observe(run.rows_written, task=task.name)
+    REGISTRY.flush()
+
+    if (run.wait or 0.0) + duration < slow_task_seconds(task.name):
+        return
+    logger = logging.getLogger(__name__)
+    logger.warning('Slow task %s[%s]: %s after %.3f s in queue and %.3f s run',
+                   task.name, task_id, state, run.wait or 0.0, duration)
+    try:
+        save_slow_run(task, run, state, duration)
+    except DatabaseError:
+        logger.exception('Slow task run of %s was not saved', task.name)
+
+
+def install():
+    """
+    Connects handlers: stamps tasks sent by the process and measures tasks run by it
+    """
+    signals.before_task_publish.connect(_on_before_publish,
+                                        dispatch_uid='cinema_task_published')
+    signals.task_prerun.connect(_on_prerun, dispatch_uid='cinema_task_prerun')
+    signals.task_retry.connect(_on_retry, dispatch_uid='cinema_task_retry')
+    signals.task_postrun.connect(_on_postrun, dispatch_uid='cinema_task_postrun')
@@ -7,14 +7,26 @@ import time
 
 import pytz
 from celery import shared_task
+from django.db import transaction
 
+from booking.metrics import PAY_TICKET_QUEUE_DEPTH, DISABLE_BOOKINGS_DELETED
+from booking import pricing
+from booking import rollup
+from booking import seats
+from booking import tickets
 from booking.models import Ticket, Showing
+# Tasks are bound to the configured Celery app, web processes import it on first use only
+import cinema.celery  # noqa: F401 pylint: disable=unused-import
 
 
 @shared_task
 def pay_ticket(**kwargs):
     """
     Celery task processes ticket payment: waits 15 sec and saves receipt in ticket
+
+    Every payment leaves the queue depth once: when it is saved or dropped (incorrect
+    arguments, ticket deleted meanwhile). Deliveries of a payment already saved change
+    nothing, so redelivered tasks do not decrease the queue depth again.
     """
     logger = logging.getLogger(__name__)
     time.sleep(15)
@@ -22,23 +34,65 @@ def pay_ticket(**kwargs):
     payment_uuid = kwargs.get('payment_uuid', None)
 
     if not (pkey and payment_uuid):
+        PAY_TICKET_QUEUE_DEPTH.dec()
         logger.warning('Incorrect payment arguments were given: %s', kwargs)
         return
 
-    ticket = Ticket.objects.filter(pk=pkey).first()
-    if ticket is None:
-        logger.warning('Ticket with id %s was not found', pkey)
-        return
+    with transaction.atomic():
+        ticket = Ticket.objects.select_for_update(of=('self',)).select_related('showing') \
+            .filter(pk=pkey).first()
+        if ticket is not None and ticket.receipt == payment_uuid:
+            return
+        PAY_TICKET_QUEUE_DEPTH.dec()
+        if ticket is None:
+            logger.warning('Ticket with id %s was not found', pkey)
+            return
+
+        was_paid = bool(ticket.receipt)
+        ticket.receipt = payment_uuid
+        ticket.save()
+        if not was_paid:
+            rollup.record_paid(ticket, pricing.ticket_price(ticket))
+            seats.publish_changes(ticket.showing_id,
+                                  [(ticket.row_number, ticket.seat_number, seats.PAID)])
 
-    ticket.receipt = payment_uuid
-    ticket.save()
+
+def showings_before(deadline):
+    """
+    Returns subquery of showings starting before deadline, so unpaid tickets are looked up
+    by ticket_unpaid_showing_idx for every showing found by showing_date_time_idx
+    """
+    return Showing.objects.filter(date_time__lte=deadline).order_by().values('pk')
 
 
-@shared_task(bind=True)
+@shared_task
 def disable_bookings():
     """
     Celery task that disables bookings for showings that are coming up in 2 hours
     """
     deadline = datetime.datetime.now(tz=pytz.utc) + datetime.timedelta(hours=2)
-    showing_ids = [showing.pk for showing in Showing.objects.filter(date_time__lte=deadline)]
-    Ticket.objects.filter(showing__in=showing_ids, receipt='').delete()
+    with transaction.atomic():
+        unpaid = list(Ticket.objects
+                      .select_for_update(of=('self',))
+                      .filter(showing__in=showings_before(deadline), receipt='')
+                      .order_by()
+                      .values_list('pk', 'showing_id', 'date_time',
+                                   'row_number', 'seat_number'))
+        deleted, _ = Ticket.objects.filter(pk__in=[ticket[0] for ticket in unpaid]).delete()
+        tickets.record_released(ticket[1:] for ticket in unpaid)
+    DISABLE_BOOKINGS_DELETED.observe(deleted)
+
+
+@shared_task
+def reconcile_daily_stats(days=2):
+    """
+    Celery task rebuilds daily sales rollup of showings since given days ago (all showings
+    if days is None) from tickets
+    """
+    showings = Showing.objects.all()
+    if days is not None:
+        showings = showings.filter(
+            date_time__gte=datetime.datetime.now(tz=pytz.utc) - datetime.timedelta(days=days))
+    fixed = rollup.reconcile(showings)
+    if fixed:
+        logging.getLogger(__name__).warning('Daily showing stats: %s rows were fixed', fixed)
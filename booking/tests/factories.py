@@ -0,0 +1,49 @@
+"""
+Test factories create model instances with default values, so tests pass only the fields they
+check. Unique fields get a new value on every call.
+"""
+import datetime
+from itertools import count
+
+from booking.models import Hall, Movie, Showing, Ticket
+
+SHOW_TIME = datetime.datetime(2020, 1, 3, 10, 0, 0, 1, tzinfo=datetime.timezone.utc)
+
+_sequence = count(1)
+
+
+def make_hall(**kwargs):
+    """Creates and returns a hall, 16 rows of 20 seats by default"""
+    kwargs.setdefault('name', f'Hall {next(_sequence)}')
+    kwargs.setdefault('rows_count', 16)
+    kwargs.setdefault('rows_size', 20)
+    return Hall.objects.create(**kwargs)
+
+
+def make_movie(**kwargs):
+    """Creates and returns a movie"""
+    kwargs.setdefault('name', f'Movie {next(_sequence)}')
+    kwargs.setdefault('duration', 120)
+    kwargs.setdefault('premiere_year', 1999)
+    return Movie.objects.create(**kwargs)
+
+
+def make_showing(**kwargs):
+    """Creates and returns a showing, in a new hall of a new movie unless they are given"""
+    if 'hall' not in kwargs and 'hall_id' not in kwargs:
+        kwargs['hall'] = make_hall()
+    if 'movie' not in kwargs and 'movie_id' not in kwargs:
+        kwargs['movie'] = make_movie()
+    kwargs.setdefault('date_time', SHOW_TIME)
+    kwargs.setdefault('price', '19.99')
+    return Showing.objects.create(**kwargs)
+
+
+def make_ticket(user, **kwargs):
+    """Creates and returns a ticket of the user, the first seat of a new showing by default"""
+    if 'showing' not in kwargs and 'showing_id' not in kwargs:
+        kwargs['showing'] = make_showing()
+    kwargs.setdefault('date_time', SHOW_TIME - datetime.timedelta(10))
+    kwargs.setdefault('row_number', 1)
+    kwargs.setdefault('seat_number', 1)
+    return Ticket.objects.create(user=user, **kwargs)
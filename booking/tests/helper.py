@@ -1,8 +1,11 @@
 """
 Test helper module contains classes reusable in tests
 """
+import copy
+
 from django.test import TestCase
 from django.urls import reverse
+from rest_framework_simplejwt.tokens import RefreshToken
 
 from booking.models import CustomUser
 
@@ -10,7 +13,21 @@ from booking.models import CustomUser
 class LoggedInTestCase(TestCase):
     """
     Base test case that provides user and admin instances for further testing
+
+    Test data is created once per test case class in setUpTestData and rolled back after the
+    last test of the class. Subclasses add their data in setUpTestData too, every test gets its
+    own copies of the class attributes, so changing them in a test does not affect other tests.
     """
+    user_credentials = {
+        'email': 'user@test.com',
+        'password': 'user_password',
+    }
+    admin_credentials = {
+        'email': 'admin@test.com',
+        'password': 'admin_password',
+        'is_staff': True
+    }
+
     def _get_token(self, credentials):
         response = self.client.post(path=reverse('token'), data=credentials)
         return response.data.get('access', None)
@@ -24,22 +41,31 @@ class LoggedInTestCase(TestCase):
         user.save()
         return user
 
-    def setUp(self) -> None:
-        self.user_credentials = {
-            'email': 'user@test.com',
-            'password': 'user_password',
-        }
-        self.admin_credentials = {
-            'email': 'admin@test.com',
-            'password': 'admin_password',
-            'is_staff': True
-        }
-        self.user = self._create_user(**self.user_credentials)
-        self.admin = self._create_user(**self.admin_credentials)
-        self.user_token = self._get_token(self.user_credentials)
-        self.admin_token = self._get_token(self.admin_credentials)
-        self.credentials = [
-            self.user_credentials,
-            self.admin_credentials,
+    @staticmethod
+    def _mint_token(user):
+        """Returns access token of the user without a request to /token/"""
+        return str(RefreshToken.for_user(user).access_token)
+
+    @classmethod
+    def setUpClass(cls):
+        names = set(vars(cls))
+        super(LoggedInTestCase, cls).setUpClass()
+        # Attributes set by setUpTestData, cls_atomics is set by TestCase itself
+        cls._test_data = [name for name in vars(cls) if name not in names | {'cls_atomics'}]
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = cls._create_user(**cls.user_credentials)
+        cls.admin = cls._create_user(**cls.admin_credentials)
+        cls.user_token = cls._mint_token(cls.user)
+        cls.admin_token = cls._mint_token(cls.admin)
+        cls.credentials = [
+            cls.user_credentials,
+            cls.admin_credentials,
         ]
+
+    def setUp(self) -> None:
+        memo = {}
+        for name in self._test_data:
+            setattr(self, name, copy.deepcopy(getattr(type(self), name), memo))
         super(LoggedInTestCase, self).setUp()
@@ -0,0 +1,134 @@
+"""
+Tests for admin change lists
+"""
+import datetime
+from decimal import Decimal
+from unittest import mock
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+
+from booking import pricing
+from booking import seats
+from booking.models import DailyShowingStats, ShowingPrices, Ticket
+from booking.tests.factories import make_hall, make_showing, make_ticket
+from booking.tests.test_url_tickets import TicketsBaseTestCase
+
+ONE_DAY = datetime.timedelta(days=1)
+
+
+class AdminTestCase(TicketsBaseTestCase):
+    """
+    Test case checks that admin change lists do not query related objects row by row
+    """
+
+    def _count_queries(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return len(queries)
+
+    def test_admin_changelist_queries(self):
+        """
+        Test checks that number of queries does not depend on number of rows
+        """
+        self.client.force_login(self.admin)
+        urls = [reverse(f'admin:booking_{model}_changelist')
+                for model in ('ticket', 'showing', 'customuser')]
+        counts = [self._count_queries(url) for url in urls]
+        for seat_number in range(2, 12):
+            make_ticket(self.user, showing=make_showing(hall=self.hall),
+                        seat_number=seat_number)
+        self.assertListEqual([self._count_queries(url) for url in urls], counts)
+
+    def test_admin_ticket_filters(self):
+        """
+        Test checks paid and booking date filters of tickets
+        """
+        self.client.force_login(self.admin)
+        url = reverse('admin:booking_ticket_changelist')
+        day = self.ticket.date_time.replace(hour=0, minute=0, second=0, microsecond=0)
+        for query, expected in (({'paid': 'yes'}, 0), ({'paid': 'no'}, 1),
+                                ({'date_time__gte': day, 'date_time__lt': day + ONE_DAY}, 1),
+                                ({'date_time__gte': day + ONE_DAY}, 0)):
+            response = self.client.get(url, query)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(response.context['cl'].result_count, expected, query)
+
+    def test_admin_date_filters_bounded(self):
+        """
+        Test checks that ticket and user change lists do not read distinct dates of the table
+        """
+        self.client.force_login(self.admin)
+        for model in ('ticket', 'customuser'):
+            with CaptureQueriesContext(connection) as queries:
+                self.client.get(reverse(f'admin:booking_{model}_changelist'))
+            self.assertFalse([query for query in queries.captured_queries
+                              if 'DISTINCT' in query['sql']], model)
+
+    def _book_small_showing(self):
+        """Books 3 of 6 seats of a new showing, so its occupancy markup is raised"""
+        hall = make_hall(rows_count=3, rows_size=2)
+        showing = make_showing(hall=hall, movie=self.movie, price='10',
+                               date_time=timezone.now() + datetime.timedelta(days=7))
+        ids = []
+        for row_number, seat_number in ((2, 1), (2, 2), (1, 1)):
+            response = self.client.post(path=reverse('ticket-list'),
+                                        data={'showing': showing.pk, 'row_number': row_number,
+                                              'seat_number': seat_number},
+                                        HTTP_AUTHORIZATION=f'Bearer {self.user_token}')
+            self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+            ids.append(response.data['id'])
+        self.assertEqual(pricing.quote(showing, 1), Decimal('10.89'))
+        return showing, ids
+
+    def test_admin_ticket_delete(self):
+        """
+        Test checks that tickets deleted in the admin free their seats and occupancy prices
+        """
+        showing, ids = self._book_small_showing()
+        self.client.force_login(self.admin)
+        with mock.patch('booking.seats.publish_changes') as publish_changes:
+            response = self.client.post(reverse('admin:booking_ticket_delete', args=[ids[-1]]),
+                                        {'post': 'yes'})
+        self.assertEqual(response.status_code, status.HTTP_302_FOUND)
+        publish_changes.assert_called_once_with(showing.pk, [(1, 1, seats.FREE)])
+        self.assertEqual(pricing.quote(showing, 1), Decimal('9.90'))
+        stats = DailyShowingStats.objects.get(showing=showing)
+        self.assertTupleEqual((stats.booked, stats.released), (3, 1))
+
+        response = self.client.post(reverse('admin:booking_ticket_changelist'),
+                                    {'action': 'delete_selected', 'post': 'yes',
+                                     '_selected_action': ids[:2]})
+        self.assertEqual(response.status_code, status.HTTP_302_FOUND)
+        self.assertEqual(ShowingPrices.objects.get(showing=showing).booked, 0)
+        stats.refresh_from_db()
+        self.assertTupleEqual((stats.booked, stats.released), (3, 3))
+
+    def test_admin_ticket_move(self):
+        """
+        Test checks that ticket moved in the admin is quoted at the new seat and moves its
+        occupancy to the new showing
+        """
+        showing, ids = self._book_small_showing()
+        self.client.force_login(self.admin)
+        response = self.client.post(reverse('admin:booking_ticket_change', args=[ids[-1]]),
+                                    {'showing': self.showing.pk, 'row_number': 5,
+                                     'seat_number': 5, 'price': '9.90'})
+        self.assertEqual(response.status_code, status.HTTP_302_FOUND)
+        self.assertEqual(Ticket.objects.get(pk=ids[-1]).price, pricing.quote(self.showing, 5))
+        self.assertEqual(pricing.quote(showing, 1), Decimal('9.90'))
+
+    def test_admin_showing_autocomplete(self):
+        """
+        Test checks that showings are searched by movie name for ticket form
+        """
+        self.client.force_login(self.admin)
+        response = self.client.get(reverse('admin:booking_showing_autocomplete'),
+                                   {'term': 'Mov'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([result['id'] for result in response.json()['results']],
+                         [str(self.showing.pk)])
@@ -0,0 +1,77 @@
+"""
+Tests for the cache shared by processes
+"""
+import os
+import unittest
+
+from django.test import SimpleTestCase, override_settings
+
+from booking.checks import shared_cache_check
+from tools.cache import RedisCache
+
+REDIS_URL = os.environ.get('CINEMA_TEST_REDIS_URL')
+
+
+class SharedCacheCheckTestCase(SimpleTestCase):
+    """
+    Test case checks that deployments are warned about caches of every process
+    """
+
+    def test_shared_cache_check(self):
+        """
+        Test checks booking.W001 warning of the local memory cache only
+        """
+        with override_settings(CACHES={'default': {
+                'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}):
+            self.assertListEqual([warning.id for warning in shared_cache_check(None)],
+                                 ['booking.W001'])
+        with override_settings(CACHES={'default': {'BACKEND': 'tools.cache.RedisCache',
+                                                   'LOCATION': 'redis://redis:6379/0'}}):
+            self.assertListEqual(shared_cache_check(None), [])
+
+
+@unittest.skipUnless(REDIS_URL, 'CINEMA_TEST_REDIS_URL (redis://host:port/db) is not set')
+class RedisCacheTestCase(SimpleTestCase):
+    """
+    Test case for Redis cache backend, its database is flushed
+    """
+
+    def setUp(self) -> None:
+        self.cache = RedisCache(REDIS_URL, {})
+        self.cache.clear()
+        self.addCleanup(self.cache.clear)
+
+    def test_redis_cache_values(self):
+        """
+        Positive test checks stored values, timeouts and key versions
+        """
+        cache = self.cache
+        cache.set('data', {'date': '2020-01-03', 'movies': [1, 2]})
+        self.assertDictEqual(cache.get('data'), {'date': '2020-01-03', 'movies': [1, 2]})
+        self.assertIsNone(cache.get('missing'))
+        self.assertEqual(cache.get('missing', 0), 0)
+        self.assertFalse(cache.add('data', 'other'))
+        self.assertTrue(cache.add('flag', True, 10))
+        self.assertIs(cache.get('flag'), True)
+        cache.set_many({'a': 1, 'b': 'b'})
+        self.assertDictEqual(cache.get_many(['a', 'b', 'c']), {'a': 1, 'b': 'b'})
+        cache.set('zero', 1, 0)
+        self.assertFalse(cache.has_key('zero'))
+        self.assertTrue(cache.touch('data', None))
+        cache.set('data', 2, version=2)
+        self.assertEqual(cache.get('data', version=2), 2)
+        self.assertTrue(cache.delete('data'))
+        cache.delete_many(['a', 'b'])
+        self.assertDictEqual(cache.get_many(['a', 'b', 'data']), {})
+
+    def test_redis_cache_shared_incr(self):
+        """
+        Test checks that counters are incremented atomically and seen by other processes
+        """
+        other = RedisCache(REDIS_URL, {})
+        with self.assertRaises(ValueError):
+            self.cache.incr('version')
+        self.cache.set('version', 1, None)
+        self.assertEqual(other.incr('version'), 2)
+        self.assertEqual(self.cache.incr('version', 3), 5)
+        self.assertEqual(other.get('version'), 5)
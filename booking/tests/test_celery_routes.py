@@ -0,0 +1,70 @@
+"""
+Tests for Celery queues topology
+"""
+import copy
+
+from celery.app.utils import Settings
+from django.conf import settings
+from django.core.checks.registry import registry
+from django.core.exceptions import ImproperlyConfigured
+from django.test import SimpleTestCase, override_settings
+
+from booking.checks import celery_routes_check
+from cinema.celery import app, apply_queue_settings, check_routes, worker_queues
+
+
+class CeleryRoutesTestCase(SimpleTestCase):
+    """
+    Test case checks routing of booking tasks and settings of queue workers
+    """
+
+    def test_celery_routes_positive(self):
+        """
+        Positive test checks that booking tasks go to their queues
+        """
+        self.assertListEqual(celery_routes_check(None), [])
+        for task, queue in [('booking.tasks.pay_ticket', 'payments'),
+                            ('booking.tasks.disable_bookings', 'maintenance'),
+                            ('booking.tasks.reconcile_daily_stats', 'reporting')]:
+            self.assertEqual(app.amqp.router.route({}, task)['queue'].name, queue)
+
+    def test_celery_routes_check_deploy(self):
+        """
+        Test checks that routes are checked by `check --deploy` only, other checks of web
+        processes do not import Celery
+        """
+        self.assertNotIn(celery_routes_check, registry.get_checks())
+        self.assertIn(celery_routes_check, registry.get_checks(include_deployment_checks=True))
+
+    def test_celery_routes_negative_typo(self):
+        """
+        Negative test checks that misspelled task leaves the real task unrouted
+        """
+        queues = copy.deepcopy(settings.CINEMA_CELERY_QUEUES)
+        queues['payments']['tasks'] = ['bookings.tasks.pay_ticket']
+        with override_settings(CINEMA_CELERY_QUEUES=queues):
+            errors = celery_routes_check(None)
+            self.assertListEqual([error.id for error in errors], ['booking.E001'] * 2)
+            self.assertIn('bookings.tasks.pay_ticket', errors[0].msg)
+            self.assertIn('booking.tasks.pay_ticket', errors[1].msg)
+            with self.assertRaises(ImproperlyConfigured):
+                check_routes()
+
+    def test_celery_routes_worker_settings(self):
+        """
+        Test checks that worker consuming one queue gets its concurrency and prefetch
+        """
+        self.assertListEqual(
+            worker_queues(['celery', '-A', 'cinema', 'worker', '-Q', 'maintenance']),
+            ['maintenance'])
+        self.assertListEqual(worker_queues(['celery', 'worker', '--queues=a,b']), ['a', 'b'])
+        self.assertListEqual(worker_queues(['celery', 'beat']), [])
+
+        conf = Settings({'CELERY_WORKER_CONCURRENCY': 4}, prefix='CELERY')
+        apply_queue_settings(conf, ['maintenance'])
+        self.assertEqual(conf.worker_concurrency, 1)
+        self.assertEqual(conf.worker_prefetch_multiplier, 1)
+
+        conf = Settings({'CELERY_WORKER_CONCURRENCY': 4}, prefix='CELERY')
+        apply_queue_settings(conf, ['payments', 'maintenance'])
+        self.assertEqual(conf.worker_concurrency, 4)
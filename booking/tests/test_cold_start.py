@@ -0,0 +1,59 @@
+"""
+Startup benchmark: cold start of web and Celery processes
+"""
+import io
+from unittest import skipUnless
+
+from django.conf import settings
+from django.core.management import call_command
+from django.test import SimpleTestCase
+
+from tools import importprofile
+
+# Modules web processes import on first use only
+LAZY_MODULES = ['celery', 'kombu', 'booking.tasks', 'cinema.celery', 'drf_yasg.views',
+                'drf_yasg.generators', 'ruamel.yaml', 'cinema.schema', 'cinema.admin_urls',
+                'booking.admin']
+
+
+class ColdStartTestCase(SimpleTestCase):
+    """
+    Test case checks modules imported on start of web and Celery processes and time of it
+    """
+
+    def test_cold_start_web(self):
+        """
+        Test checks that web processes start without Celery, schema and admin modules
+        """
+        imported = {module[0] for module in importprofile.run(
+            'web', settings.SETTINGS_MODULE)['modules']}
+        self.assertIn('booking.views', imported)
+        self.assertListEqual([name for name in LAZY_MODULES if name in imported], [])
+
+    @skipUnless(settings.CINEMA_COLD_START_SECONDS, 'CINEMA_COLD_START_SECONDS is not set')
+    def test_cold_start_web_time(self):
+        """
+        Test checks that web processes start in CINEMA_COLD_START_SECONDS
+        """
+        total = min(importprofile.run('web', settings.SETTINGS_MODULE)['total']
+                    for _ in range(3))
+        self.assertLess(total, settings.CINEMA_COLD_START_SECONDS,
+                        f'Cold start took {total:.3f} s, see profile_imports command')
+
+    def test_cold_start_celery(self):
+        """
+        Positive test checks that Celery processes import tasks and the configured app
+        """
+        imported = {module[0] for module in importprofile.run(
+            'celery', settings.SETTINGS_MODULE)['modules']}
+        self.assertTrue({'celery', 'cinema.celery', 'booking.tasks'} <= imported)
+
+    def test_profile_imports(self):
+        """
+        Positive test checks modules report of profile_imports command
+        """
+        output = io.StringIO()
+        call_command('profile_imports', 'web', limit=5, sort='self', stdout=output)
+        lines = output.getvalue().splitlines()
+        self.assertEqual(len(lines), 7)
+        self.assertRegex(lines[-1], r'^web: \d+ modules imported in \d+ ms$')
@@ -0,0 +1,100 @@
+"""
+Tests for compiled serializers of list pages
+"""
+import io
+from decimal import Decimal
+from unittest import mock
+
+from django.core.management import call_command
+from django.test import RequestFactory
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import serializers as rest_serializers
+from rest_framework import status
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+
+from booking import compiled, serializers
+from booking.models import Showing, Ticket
+from booking.tests.factories import make_showing, make_ticket
+from booking.tests.test_url_tickets import TicketsBaseTestCase
+
+
+class CompiledSerializerTestCase(TicketsBaseTestCase):
+    """
+    Test case checks that compiled serializers represent rows as serializers do
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        super(CompiledSerializerTestCase, cls).setUpTestData()
+        make_ticket(cls.user, showing=make_showing(hall=cls.hall, price='7.50'),
+                    price='5.05', receipt='receipt')
+
+    def _assert_represented(self, serializer_class, queryset, **params):
+        request = Request(RequestFactory().get('/', params))
+        serializer = serializer_class(context={'request': request})
+        compiled_serializer = compiled.compile_serializer(serializer)
+        self.assertIsNotNone(compiled_serializer)
+        rows = queryset.order_by('pk').values_list(*compiled_serializer.columns)
+        instances = serializer_class(queryset.order_by('pk'), many=True,
+                                     context={'request': request})
+        renderer = JSONRenderer()
+        self.assertEqual(renderer.render(compiled_serializer.represent(rows)),
+                         renderer.render(instances.data))
+
+    def test_compiled_serializer(self):
+        """
+        Positive test checks byte-identical responses of compiled and usual serializers
+        """
+        for params in ({}, {'fields': 'id,price,paid'},
+                       {'expand': 'showing,showing.hall,showing.movie'},
+                       {'fields': 'price,showing.date_time,showing.movie.name',
+                        'expand': 'showing,showing.movie'}):
+            self._assert_represented(serializers.TicketSerializer, Ticket.objects.all(), **params)
+        self._assert_represented(serializers.ShowingSerializer, Showing.objects.all())
+        with timezone.override('Asia/Tokyo'):
+            self._assert_represented(serializers.ShowingSerializer, Showing.objects.all(),
+                                     expand='hall')
+
+    def test_compiled_serializer_not_compiled(self):
+        """
+        Test checks that serializers with fields having no compiled equivalent are not compiled
+        """
+        class SeatSerializer(rest_serializers.ModelSerializer):
+            seat = rest_serializers.SerializerMethodField()
+
+            class Meta:
+                model = Ticket
+                fields = ['id', 'seat']
+
+            @staticmethod
+            def get_seat(obj):
+                return f'{obj.row_number}-{obj.seat_number}'
+
+        class LocalizedShowingSerializer(serializers.ShowingSerializer):
+            price = rest_serializers.DecimalField(max_digits=5, decimal_places=2, localize=True)
+
+        self.assertIsNone(compiled.compile_serializer(SeatSerializer()))
+        self.assertIsNone(compiled.compile_serializer(LocalizedShowingSerializer()))
+
+    def test_compiled_list_view(self):
+        """
+        Test checks that list pages are represented by compiled serializers without instances
+        """
+        with mock.patch.object(serializers.TicketSerializer, 'to_representation') as represent:
+            response = self.client.get(path=reverse('ticket-list'),
+                                       HTTP_AUTHORIZATION=f'Bearer {self.user_token}')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        represent.assert_not_called()
+        self.assertCountEqual([ticket['price'] for ticket in response.data['results']],
+                              [Decimal('19.99'), Decimal('5.05')])
+
+    def test_benchmark_serializers(self):
+        """
+        Test checks output of benchmark_serializers command
+        """
+        output = io.StringIO()
+        call_command('benchmark_serializers', rows=10, repeat=1, stdout=output)
+        self.assertRegex(output.getvalue(), r'^tickets: 10 rows, serializer .* faster\n'
+                                            r'showings: 10 rows, serializer .* faster\n$')
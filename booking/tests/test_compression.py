@@ -0,0 +1,113 @@
+"""
+Tests for response compression
+"""
+import datetime
+import gzip
+from unittest import mock
+
+import brotli
+from django.core.cache import cache
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.response import Response
+
+from booking.tests.factories import make_showing
+from booking.tests.test_url_tickets import TicketsBaseTestCase
+from tools import compression
+
+
+@override_settings(CINEMA_COMPRESSION_MIN_BYTES=200)
+class CompressionTestCase(TicketsBaseTestCase):
+    """
+    Test case checks compressed responses of list, streaming, cached and schema endpoints
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        super(CompressionTestCase, cls).setUpTestData()
+        for hours in range(1, 6):
+            make_showing(hall=cls.hall, movie=cls.movie,
+                         date_time=cls.showing.date_time + datetime.timedelta(hours=hours))
+
+    def setUp(self) -> None:
+        super(CompressionTestCase, self).setUp()
+        cache.clear()
+
+    def _get(self, path, accept_encoding):
+        return self.client.get(path=path, HTTP_ACCEPT_ENCODING=accept_encoding,
+                               HTTP_AUTHORIZATION=f'Bearer {self.admin_token}')
+
+    def test_compression(self):
+        """
+        Positive test checks encoding chosen by Accept-Encoding and compressed content
+        """
+        path = reverse('showing-list') + '?page_size=100'
+        content = self._get(path, '').content
+        for accept_encoding, encoding, decompress in (
+                ('gzip, deflate, br', 'br', brotli.decompress),
+                ('gzip;q=1.0, br;q=0.5', 'gzip', gzip.decompress),
+                ('*', 'br', brotli.decompress)):
+            response = self._get(path, accept_encoding)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(response['Content-Encoding'], encoding)
+            self.assertIn('Accept-Encoding', response['Vary'])
+            self.assertEqual(int(response['Content-Length']), len(response.content))
+            self.assertEqual(decompress(response.content), content)
+
+        with mock.patch.object(compression, 'brotli', None):
+            self.assertEqual(self._get(path, 'br, gzip')['Content-Encoding'], 'gzip')
+            self.assertFalse(self._get(path, 'br').has_header('Content-Encoding'))
+
+    def test_compression_skipped(self):
+        """
+        Test checks that short responses and refused encodings are not compressed
+        """
+        for path, accept_encoding in ((reverse('showing-list') + '?page_size=1&fields=id', 'gzip'),
+                                      (reverse('showing-list'), 'gzip;q=0, br;q=0'),
+                                      (reverse('showing-list'), 'identity')):
+            response = self._get(path, accept_encoding)
+            self.assertFalse(response.has_header('Content-Encoding'))
+            self.assertIn('Accept-Encoding', response['Vary'])
+
+    def test_compression_streaming(self):
+        """
+        Positive test checks compressed streaming export
+        """
+        path = reverse('showing-export')
+        content = b''.join(self._get(path, '').streaming_content)
+        response = self._get(path, 'gzip')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.decompress(b''.join(response.streaming_content)), content)
+
+    def test_compression_cached(self):
+        """
+        Test checks that compressed bodies of cached responses are compressed once per
+        encoding and returned without rendering the data again
+        """
+        for path in (reverse('schedule') + '?date=2020-01-03', reverse('report-occupancy')):
+            with mock.patch.object(compression, 'compress', wraps=compression.compress) as patch:
+                first = self._get(path, 'br')
+                with mock.patch.object(Response, 'rendered_content',
+                                       new_callable=mock.PropertyMock) as rendered_content:
+                    second = self._get(path, 'br')
+                rendered_content.assert_not_called()
+                gzipped = self._get(path, 'gzip')
+                self._get(path, 'gzip')
+            self.assertEqual(first['Content-Encoding'], 'br')
+            self.assertEqual(second['Content-Encoding'], 'br')
+            self.assertIn('Accept-Encoding', second['Vary'])
+            self.assertEqual(second.content, first.content)
+            self.assertEqual(gzip.decompress(gzipped.content), brotli.decompress(first.content))
+            self.assertListEqual(patch.call_args_list,
+                                 [mock.call(mock.ANY, encoding, compression.CACHED_LEVELS[encoding])
+                                  for encoding in ('br', 'gzip')])
+
+    def test_compression_schema(self):
+        """
+        Positive test checks compressed OpenAPI schema
+        """
+        response = self._get(reverse('schema-json', args=['.yaml']), 'gzip')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertIn(b'Cinema API', gzip.decompress(response.content))
@@ -0,0 +1,84 @@
+"""
+Tests for persistent database connections management
+"""
+import time
+from unittest import mock
+
+from django.test import SimpleTestCase, override_settings
+
+from tools import db_pool
+
+
+class FakeConnection:  # pylint: disable=too-few-public-methods
+    """Database connection wrapper with an open connection"""
+
+    def __init__(self, close_at=None, usable=True):
+        self.alias = 'default'
+        self.connection = object()
+        self.in_atomic_block = False
+        self.errors_occurred = False
+        self.settings_dict = {'AUTOCOMMIT': True}
+        self.close_at = close_at
+        self.usable = usable
+        self.pings = 0
+
+    def get_autocommit(self):
+        """Connection is in autocommit mode"""
+        return True
+
+    def is_usable(self):
+        """Pings the server"""
+        self.pings += 1
+        return self.usable
+
+    def close(self):
+        """Closes connection"""
+        self.connection = None
+
+
+@override_settings(CINEMA_DB_HEALTH_CHECK_IDLE_SECONDS=30)
+class ConnectionsTestCase(SimpleTestCase):
+    """
+    Test case checks recycling and reuse of persistent connections
+    """
+
+    def _handle(self, handler, connection):
+        with mock.patch.object(db_pool.connections, 'all', return_value=[connection]):
+            handler()
+
+    def test_db_pool_reuse(self):
+        """
+        Test checks that recently used connection is reused without a ping
+        """
+        connection = FakeConnection(close_at=time.monotonic() + 300)
+        self._handle(db_pool.release_connections, connection)
+        self._handle(db_pool.acquire_connections, connection)
+        self.assertIsNotNone(connection.connection)
+        self.assertEqual(connection.pings, 0)
+
+    def test_db_pool_lifetime(self):
+        """
+        Test checks that connections older than CONN_MAX_AGE are closed
+        """
+        connection = FakeConnection(close_at=time.monotonic() - 1)
+        self._handle(db_pool.release_connections, connection)
+        self.assertIsNone(connection.connection)
+
+    def test_db_pool_health_check(self):
+        """
+        Test checks that idle connections are pinged and dropped ones are closed
+        """
+        connection = FakeConnection(close_at=time.monotonic() + 300, usable=False)
+        connection.cinema_idle_since = time.monotonic() - 60
+        self._handle(db_pool.acquire_connections, connection)
+        self.assertEqual(connection.pings, 1)
+        self.assertIsNone(connection.connection)
+
+    def test_db_pool_transaction(self):
+        """
+        Test checks that connections in transactions are left untouched
+        """
+        connection = FakeConnection(close_at=time.monotonic() - 1)
+        connection.in_atomic_block = True
+        self._handle(db_pool.release_connections, connection)
+        self.assertIsNotNone(connection.connection)
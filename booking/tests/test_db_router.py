@@ -0,0 +1,108 @@
+"""
+Tests for read-replica routing of:
+ - /movies/, /halls/, /showings/ and /tickets/ safe requests
+"""
+from django.core.cache import cache
+from django.db import transaction
+from django.test import TransactionTestCase, RequestFactory, override_settings
+from django.urls import reverse
+
+from booking import views
+from booking.models import CustomUser, Movie
+from booking.tests.factories import make_movie
+from tools.db_router import ReplicaRouter, ReplicaRoutingMiddleware
+
+
+@override_settings(DATABASE_REPLICAS=['replica'])
+class ReplicaRoutingTestCase(TransactionTestCase):
+    """
+    Test case checks databases chosen by the router during requests
+
+    TransactionTestCase is used since reads in transactions always go to the primary
+    """
+    databases = {'default', 'replica'}
+
+    def setUp(self) -> None:
+        cache.clear()
+        self.factory = RequestFactory()
+        self.router = ReplicaRouter()
+
+    def _route(self, request, view, write=False):
+        """Returns database the view would read from, optionally after a write"""
+        routed = {}
+
+        def get_response(request):
+            middleware.process_view(request, view, (), {})
+            if write:
+                self.router.db_for_write(Movie)
+            routed['read'] = self.router.db_for_read(Movie)
+            with transaction.atomic():
+                routed['read_in_transaction'] = self.router.db_for_read(Movie)
+            return None
+
+        middleware = ReplicaRoutingMiddleware(get_response)
+        middleware(request)
+        return routed
+
+    def test_db_router_catalog_read(self):
+        """
+        Test checks that catalog GET requests read from replica outside transactions
+        """
+        routed = self._route(self.factory.get('/movies/'), views.MoviesListView.as_view())
+        self.assertEqual(routed['read'], 'replica')
+        self.assertIsNone(routed['read_in_transaction'])
+
+    def test_db_router_primary(self):
+        """
+        Test checks that unsafe methods and views without replica reads use the primary
+        """
+        routed = self._route(self.factory.post('/movies/'), views.MoviesListView.as_view())
+        self.assertIsNone(routed['read'])
+        routed = self._route(self.factory.get('/users/'), views.CustomUserList.as_view())
+        self.assertIsNone(routed['read'])
+        routed = self._route(self.factory.get('/showings/1/seats/'), views.ShowingSeats.as_view())
+        self.assertIsNone(routed['read'])
+        with override_settings(DATABASE_REPLICAS=[]):
+            routed = self._route(self.factory.get('/movies/'), views.MoviesListView.as_view())
+            self.assertIsNone(routed['read'])
+
+    def test_db_router_read_your_writes(self):
+        """
+        Test checks that reads after a write of the same client use the primary
+        """
+        view = views.TicketsListView.as_view()
+        routed = self._route(self.factory.get('/tickets/', HTTP_AUTHORIZATION='Bearer writer'),
+                             view, write=True)
+        self.assertIsNone(routed['read'])
+
+        routed = self._route(self.factory.get('/tickets/', HTTP_AUTHORIZATION='Bearer writer'),
+                             view)
+        self.assertIsNone(routed['read'])
+
+        routed = self._route(self.factory.get('/tickets/', HTTP_AUTHORIZATION='Bearer reader'),
+                             view)
+        self.assertEqual(routed['read'], 'replica')
+
+    def test_db_router_allow_migrate(self):
+        """
+        Test checks that replicas are not migrated
+        """
+        self.assertFalse(self.router.allow_migrate('replica', 'booking'))
+        self.assertIsNone(self.router.allow_migrate('default', 'booking'))
+
+    def test_db_router_profiled(self):
+        """
+        Test checks that profiled requests read from the replica and their queries are
+        recorded and explained on it
+        """
+        admin = CustomUser.objects.create_user(email='admin@example.com', password='admin',
+                                               is_staff=True)
+        make_movie(name='Movie')
+        self.client.force_login(admin)
+        response = self.client.get(reverse('movie-list') + '?_profile=1')
+        movie_queries = [query for query in response.json()['queries']
+                         if 'FROM "booking_movie"' in query['sql']]
+        self.assertTrue(movie_queries)
+        for query in movie_queries:
+            self.assertEqual(query['database'], 'replica')
+            self.assertTrue(query['explain'])
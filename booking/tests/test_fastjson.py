@@ -0,0 +1,90 @@
+"""
+Tests for fast JSON renderer and parser
+"""
+import datetime
+import io
+import uuid
+from decimal import Decimal
+from unittest import mock
+
+from django.core.management import call_command
+from django.test import SimpleTestCase
+from django.utils import timezone
+from django.utils.translation import gettext_lazy
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from tools import fastjson
+
+DATA = {
+    'id': 1,
+    'price': Decimal('19.99'),
+    'receipt': uuid.UUID('5b6d0be2-0c4a-4d5e-9c4e-0a1f3b7c8d9e'),
+    'date': datetime.date(2020, 1, 3),
+    'detail': gettext_lazy('Not found.'),
+    'text': 'Кино\u2028\u2029',
+    'seats': {1: [(1, 2.5), None, True]},
+}
+
+
+class FastJSONTestCase(SimpleTestCase):
+    """
+    Test case checks that fast JSON renderer and parser behave as REST framework's ones
+    """
+
+    def test_fastjson_render(self):
+        """
+        Positive test checks rendered bytes with and without orjson
+        """
+        expected = JSONRenderer().render(DATA)
+        self.assertEqual(fastjson.JSONRenderer().render(DATA), expected)
+        with mock.patch.object(fastjson, 'orjson', None):
+            self.assertEqual(fastjson.JSONRenderer().render(DATA), expected)
+        self.assertEqual(fastjson.JSONRenderer().render(DATA, 'application/json; indent=4'),
+                         JSONRenderer().render(DATA, 'application/json; indent=4'))
+        self.assertEqual(fastjson.JSONRenderer().render(None), b'')
+
+    def test_fastjson_render_datetime(self):
+        """
+        Test checks that datetimes are rendered in DATETIME_FORMAT of the current time zone
+        """
+        data = [datetime.datetime(2020, 1, 3, 10, 0, 0, 1, tzinfo=datetime.timezone.utc)]
+        with timezone.override('Asia/Tokyo'):
+            self.assertEqual(fastjson.JSONRenderer().render(data),
+                             b'["2020-01-03T19:00:00.000001+0900"]')
+            with mock.patch.object(fastjson, 'orjson', None):
+                self.assertEqual(fastjson.JSONRenderer().render(data),
+                                 b'["2020-01-03T19:00:00.000001+0900"]')
+
+    def test_fastjson_parse(self):
+        """
+        Positive test checks parsed data with and without orjson
+        """
+        body = '{"name": "Кино", "seats": [1, 2.5, null], "big": 100000000000000000000}'
+        expected = JSONParser().parse(io.BytesIO(body.encode()))
+        self.assertDictEqual(fastjson.JSONParser().parse(io.BytesIO(body.encode())), expected)
+        with mock.patch.object(fastjson, 'orjson', None):
+            self.assertDictEqual(fastjson.JSONParser().parse(io.BytesIO(body.encode())),
+                                 expected)
+
+    def test_fastjson_parse_negative(self):
+        """
+        Negative test checks errors of malformed documents
+        """
+        for body in (b'{"name": ', b'[NaN]'):
+            with self.assertRaises(ParseError) as expected:
+                JSONParser().parse(io.BytesIO(body))
+            with self.assertRaises(ParseError) as error:
+                fastjson.JSONParser().parse(io.BytesIO(body))
+            self.assertEqual(str(error.exception), str(expected.exception))
+
+    def test_benchmark_renderers(self):
+        """
+        Test checks output of benchmark_renderers command
+        """
+        output = io.StringIO()
+        call_command('benchmark_renderers', page_size=10, pages=2, repeat=1, stdout=output)
+        self.assertRegex(output.getvalue(), r'^rest_framework: \d+ pages/s, .* MB/s\n'
+                                            r'fastjson: \d+ pages/s, .* MB/s\n'
+                                            r'fastjson backend: \w+, .* faster\n$')
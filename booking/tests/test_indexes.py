@@ -0,0 +1,90 @@
+"""
+Tests for indexes of the booking hot queries
+"""
+import datetime
+
+from django.db import connection
+from django.test import TestCase
+
+from booking.models import CustomUser, Hall, Movie, Showing, Ticket
+from booking.tasks import showings_before
+
+
+class HotQueriesIndexesTestCase(TestCase):
+    """
+    Test case checks via EXPLAIN that every hot query is an index scan on a seeded dataset
+    """
+    start = datetime.datetime(2020, 1, 1, 10, tzinfo=datetime.timezone.utc)
+
+    @classmethod
+    def setUpTestData(cls):
+        CustomUser.objects.bulk_create(
+            [CustomUser(email=f'user{index}@test.com') for index in range(20)])
+        cls.users = list(CustomUser.objects.all())
+        movie = Movie.objects.create(name='Movie', duration=120, premiere_year=1999)
+        halls = [Hall.objects.create(name=f'Hall {index}', rows_count=10, rows_size=10)
+                 for index in range(5)]
+        Showing.objects.bulk_create(
+            [Showing(hall=halls[index % 5], movie=movie, price='10',
+                     date_time=cls.start + datetime.timedelta(hours=index))
+             for index in range(100)])
+        cls.showings = list(Showing.objects.order_by('date_time'))
+        # Most of the tickets are paid, only upcoming showings have unpaid ones
+        Ticket.objects.bulk_create(
+            [Ticket(showing=cls.showings[index % 100], user=cls.users[index % 20],
+                    date_time=cls.start, row_number=index // 1000 + 1,
+                    seat_number=index // 100 % 10 + 1, receipt='' if index % 20 == 0 else 'paid')
+             for index in range(10000)],
+            batch_size=100)
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+
+    def _explain(self, queryset):
+        if connection.vendor == 'postgresql':
+            # Tables are still small for PostgreSQL planner to prefer index scans by cost
+            with connection.cursor() as cursor:
+                cursor.execute('SET LOCAL enable_seqscan = off')
+        return queryset.explain()
+
+    def test_index_ticket_seat(self):
+        """
+        Test checks that seat lookup uses (showing, row_number, seat_number) unique index
+        """
+        plan = self._explain(Ticket.objects.filter(showing=self.showings[0],
+                                                   row_number=1, seat_number=1))
+        self.assertRegex(plan, r'booking_ticket_showing_id_row_number_seat_number_\w+_uniq')
+
+    def test_index_ticket_user(self):
+        """
+        Test checks that user's tickets list uses (user, -id) index
+        """
+        plan = self._explain(Ticket.objects.filter(user=self.users[0]).order_by('-id')[:10])
+        self.assertIn('ticket_user_id_desc_idx', plan)
+
+    def test_index_ticket_unpaid(self):
+        """
+        Test checks that unpaid tickets of showing use partial index
+        """
+        plan = self._explain(Ticket.objects.filter(showing=self.showings[0], receipt=''))
+        self.assertIn('ticket_unpaid_showing_idx', plan)
+
+    def test_index_showing_hall(self):
+        """
+        Test checks that the latest hall showing lookup uses (hall, date_time) index
+        """
+        showing = self.showings[50]
+        plan = self._explain(Showing.objects
+                             .filter(hall=showing.hall, date_time__lte=showing.date_time)
+                             .order_by('-date_time')[:1])
+        self.assertIn('showing_hall_date_time_idx', plan)
+
+    def test_index_disable_bookings(self):
+        """
+        Test checks that disable_bookings query uses date_time and unpaid tickets indexes
+        """
+        deadline = self.start + datetime.timedelta(hours=2)
+        plan = self._explain(Ticket.objects
+                             .filter(showing__in=showings_before(deadline), receipt='')
+                             .order_by())
+        self.assertIn('showing_date_time_idx', plan)
+        self.assertIn('ticket_unpaid_showing_idx', plan)
@@ -0,0 +1,82 @@
+"""
+Tests for hall layouts
+"""
+from django.urls import reverse
+from rest_framework import status
+
+from booking import layout
+from booking.models import Hall
+from booking.tests.test_url_tickets import TicketsBaseTestCase
+
+
+class LayoutTestCase(TicketsBaseTestCase):
+    """
+    Test case checks layout encoding and its use by halls, bookings and seat maps
+    """
+
+    def setUp(self) -> None:
+        super(LayoutTestCase, self).setUp()
+        self.hall.layout = '/'.join(['2.16s2.'] * 15 + ['2w16v2w'])
+        self.hall.save()
+
+    def test_layout_decode(self):
+        """
+        Test checks decoded places, zones and encoding back
+        """
+        hall_layout = layout.hall_layout(self.hall)
+        self.assertEqual(hall_layout.seats_count, 16 * 16 + 4)
+        self.assertEqual(self.hall.seats_count, hall_layout.seats_count)
+        self.assertEqual(hall_layout.rows()[0], '..ssssssssssssssss..')
+        self.assertFalse(hall_layout.is_seat(1, 1))
+        self.assertFalse(hall_layout.is_seat(17, 3))
+        self.assertEqual(hall_layout.zone(16, 3), 'vip')
+        self.assertEqual(hall_layout.zone(16, 20), 'wheelchair')
+        self.assertEqual(hall_layout.encode(), self.hall.layout)
+        self.assertIs(layout.hall_layout(Hall.objects.get(pk=self.hall.pk)), hall_layout)
+
+    def test_layout_decode_negative(self):
+        """
+        Negative test checks malformed layouts and layouts not matching hall size
+        """
+        for text in ('3s/3x', '3s/3s/3s', '3s/4s', '3s//3s'):
+            with self.subTest(text=text), self.assertRaises(ValueError):
+                layout.decode(text, 2, 3)
+
+    def test_layout_booking(self):
+        """
+        Test checks that places without seats cannot be booked
+        """
+        for row_number, seat_number, expected in ((2, 2, status.HTTP_400_BAD_REQUEST),
+                                                  (2, 3, status.HTTP_201_CREATED)):
+            response = self.client.post(path=reverse('ticket-list'),
+                                        data={'showing': self.showing.pk,
+                                              'row_number': row_number,
+                                              'seat_number': seat_number},
+                                        HTTP_AUTHORIZATION=f'Bearer {self.user_token}')
+            self.assertEqual(response.status_code, expected)
+
+    def test_layout_hall_api(self):
+        """
+        Test checks that hall layout is validated against its size
+        """
+        path = reverse('hall-detail', args=[self.hall.pk])
+        response = self.client.patch(path=path, data={'rows_size': 21},
+                                     content_type='application/json',
+                                     HTTP_AUTHORIZATION=f'Bearer {self.admin_token}')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('layout', response.data)
+
+        response = self.client.patch(path=path, data={'rows_count': 2, 'layout': '20s/9s2.9s'},
+                                     content_type='application/json',
+                                     HTTP_AUTHORIZATION=f'Bearer {self.admin_token}')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['seats_count'], 38)
+
+    def test_layout_admin(self):
+        """
+        Test checks that admin shows hall places
+        """
+        self.client.force_login(self.admin)
+        response = self.client.get(reverse('admin:booking_hall_change', args=[self.hall.pk]))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertContains(response, 'wwvvvvvvvvvvvvvvvvww')
@@ -0,0 +1,84 @@
+"""
+Tests for transactional outbox:
+ - events saved by /tickets/<pk>/pay/ and booking
+ - relay_outbox command
+"""
+import json
+from unittest import mock
+
+from django.core.management import call_command
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework import status
+
+from booking import outbox, seats
+from booking.models import OutboxEvent
+from booking.tasks import pay_ticket
+from booking.tests.test_url_tickets import TicketsBaseTestCase
+from tools import pubsub
+
+
+@override_settings(CINEMA_PUBSUB_BACKEND='tools.pubsub.MemoryBackend')
+class OutboxTestCase(TicketsBaseTestCase):
+    """
+    Test case for transactional outbox
+    """
+
+    def setUp(self) -> None:
+        super(OutboxTestCase, self).setUp()
+        self.messages = []
+        pubsub.get_backend().listen(lambda channel, message: self.messages.append(
+            (channel, message)))
+
+    def test_outbox_pay_positive(self):
+        """
+        Positive test checks that payment is saved to outbox instead of being sent to broker
+        """
+        with mock.patch('cinema.celery.app.send_task') as send_task:
+            response = self.client.put(path=reverse('pay', args=[self.ticket.pk]),
+                                       HTTP_AUTHORIZATION=f'Bearer {self.user_token}')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        send_task.assert_not_called()
+        event = OutboxEvent.objects.get()
+        self.assertEqual(event.topic, OutboxEvent.TASK)
+        self.assertDictEqual(json.loads(event.payload), {
+            'task': 'booking.tasks.pay_ticket',
+            'kwargs': {'pk': self.ticket.pk, 'payment_uuid': str(response.data['receipt'])},
+        })
+
+    def test_outbox_relay_positive(self):
+        """
+        Positive test checks that relay sends tasks and messages in order and removes them
+        """
+        outbox.send_task(pay_ticket, pk=1, payment_uuid='receipt')
+        seats.publish_changes(self.showing.pk, [(1, 2, seats.BOOKED)])
+        seats.publish_changes(self.showing.pk, [(1, 2, seats.FREE)])
+        with mock.patch('cinema.celery.app.send_task') as send_task:
+            self.assertEqual(outbox.relay(batch_size=10), 3)
+        send_task.assert_called_once_with('booking.tasks.pay_ticket',
+                                          kwargs={'pk': 1, 'payment_uuid': 'receipt'},
+                                          producer=mock.ANY)
+        channel = seats.channel(self.showing.pk)
+        self.assertListEqual(self.messages, [(channel, '[[1,2,"booked"]]'),
+                                             (channel, '[[1,2,"free"]]')])
+        self.assertFalse(OutboxEvent.objects.exists())
+
+    def test_outbox_relay_negative_broker_error(self):
+        """
+        Negative test checks that events are kept when broker is not available
+        """
+        outbox.send_task(pay_ticket, pk=1, payment_uuid='receipt')
+        with mock.patch('cinema.celery.app.send_task', side_effect=OSError):
+            with self.assertRaises(OSError):
+                outbox.relay(batch_size=10)
+        self.assertEqual(OutboxEvent.objects.count(), 1)
+
+    def test_outbox_relay_command(self):
+        """
+        Positive test checks that command sends all events in batches
+        """
+        for row_number in range(1, 4):
+            seats.publish_changes(self.showing.pk, [(row_number, 1, seats.BOOKED)])
+        call_command('relay_outbox', '--once', batch_size=2)
+        self.assertEqual(len(self.messages), 3)
+        self.assertFalse(OutboxEvent.objects.exists())
@@ -0,0 +1,147 @@
+"""
+Tests for dynamic pricing
+"""
+import datetime
+from decimal import Decimal
+
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+
+from booking import pricing, rollup
+from booking.models import DailyShowingStats, Hall, Showing, ShowingPrices, Ticket
+from booking.serializers import TicketSerializer
+from booking.tests.test_url_tickets import TicketsBaseTestCase
+from booking.views import TicketsDetail
+
+
+class PricingTestCase(TicketsBaseTestCase):
+    """
+    Test case checks seat prices and rebuilding of precomputed price tables
+    """
+
+    def setUp(self) -> None:
+        super(PricingTestCase, self).setUp()
+        hall = Hall.objects.create(name='Small hall', rows_count=3, rows_size=2)
+        self.small_showing = Showing.objects.create(
+            hall=hall, movie=self.movie, price='10',
+            date_time=timezone.now() + datetime.timedelta(days=7))
+
+    def _book(self, row_number, seat_number):
+        response = self.client.post(path=reverse('ticket-list'),
+                                    data={'showing': self.small_showing.pk,
+                                          'row_number': row_number,
+                                          'seat_number': seat_number},
+                                    HTTP_AUTHORIZATION=f'Bearer {self.user_token}')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        return response.data
+
+    def _row_prices(self):
+        return pricing.showing_prices(self.small_showing).row_prices
+
+    def test_pricing_zones(self):
+        """
+        Test checks that middle rows cost more and early bookings cost less
+        """
+        self.assertEqual(self._row_prices(), '["9.90", "11.25", "9.90"]')
+        self.assertListEqual(pricing.row_markups(5, [(0.34, Decimal('2')), (1.0, Decimal('1'))]),
+                             [1, 1, 2, 1, 1])
+
+    def test_pricing_occupancy_bucket(self):
+        """
+        Test checks that prices are rebuilt only when occupancy crosses a bucket boundary and
+        tickets keep the price quoted at booking
+        """
+        self.assertEqual(self._book(2, 1)['price'], Decimal('11.25'))
+        self.assertEqual(self._book(2, 2)['price'], Decimal('11.25'))
+        self.assertEqual(self._row_prices(), '["9.90", "11.25", "9.90"]')
+
+        # 3 of 6 seats are booked
+        ticket = self._book(1, 1)
+        self.assertEqual(ticket['price'], Decimal('9.90'))
+        self.assertEqual(self._row_prices(), '["10.89", "12.38", "10.89"]')
+        self.assertEqual(Ticket.objects.get(pk=ticket['id']).price, Decimal('9.90'))
+
+        self.client.delete(path=reverse('ticket-detail', args=[ticket['id']]),
+                           HTTP_AUTHORIZATION=f'Bearer {self.user_token}')
+        self.assertEqual(self._row_prices(), '["9.90", "11.25", "9.90"]')
+
+    def test_pricing_ticket_moved(self):
+        """
+        Test checks that unpaid ticket moved to another pricing zone is quoted at the new seat,
+        occupancy and rollup rows of the showing stay as they are
+        """
+        ticket = self._book(1, 1)
+        self.assertEqual(ticket['price'], Decimal('9.90'))
+        stats = DailyShowingStats.objects.get(showing=self.small_showing)
+
+        response = self.client.patch(path=reverse('ticket-detail', args=[ticket['id']]),
+                                     data={'row_number': 2},
+                                     content_type='application/json',
+                                     HTTP_AUTHORIZATION=f'Bearer {self.admin_token}')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['price'], Decimal('11.25'))
+        self.assertEqual(Ticket.objects.get(pk=ticket['id']).price, Decimal('11.25'))
+        self.assertEqual(ShowingPrices.objects.get(showing=self.small_showing).booked, 1)
+        stats.refresh_from_db()
+        self.assertTupleEqual((stats.booked, stats.released), (1, 0))
+
+        Ticket.objects.filter(pk=ticket['id']).update(receipt='receipt')
+        response = self.client.patch(path=reverse('ticket-detail', args=[ticket['id']]),
+                                     data={'row_number': 3},
+                                     content_type='application/json',
+                                     HTTP_AUTHORIZATION=f'Bearer {self.admin_token}')
+        self.assertEqual(response.data['price'], Decimal('11.25'))
+
+    def test_pricing_ticket_moved_to_showing(self):
+        """
+        Test checks that paid ticket moved to another showing keeps its price and moves
+        occupancy, paid count and revenue to that showing
+        """
+        ticket = self._book(2, 1)
+        Ticket.objects.filter(pk=ticket['id']).update(receipt='receipt')
+        rollup.add(self.small_showing.pk, timezone.localdate(), paid=1, revenue=ticket['price'])
+        serializer = TicketSerializer(Ticket.objects.get(pk=ticket['id']),
+                                      data={'row_number': 1, 'seat_number': 2},
+                                      partial=True)
+        serializer.is_valid(raise_exception=True)
+        serializer.validated_data['showing'] = self.showing
+        TicketsDetail().perform_update(serializer)
+
+        self.assertEqual(Ticket.objects.get(pk=ticket['id']).price, Decimal('11.25'))
+        self.assertEqual(ShowingPrices.objects.get(showing=self.small_showing).booked, 0)
+        stats = {row.showing_id: (row.booked, row.paid, row.released, row.revenue)
+                 for row in DailyShowingStats.objects.all()}
+        self.assertTupleEqual(stats[self.small_showing.pk], (1, 0, 1, Decimal(0)))
+        self.assertTupleEqual(stats[self.showing.pk], (1, 1, 0, Decimal('11.25')))
+
+    def test_pricing_time_bucket(self):
+        """
+        Test checks that prices are rebuilt when time to the showing crosses a bucket boundary
+        """
+        self._row_prices()
+        valid_until = ShowingPrices.objects.get(showing=self.small_showing).valid_until
+        self.assertEqual(valid_until, self.small_showing.date_time - datetime.timedelta(hours=72))
+
+        prices = pricing.showing_prices(self.small_showing,
+                                        now=valid_until + datetime.timedelta(seconds=1))
+        self.assertEqual(prices.row_prices, '["11.00", "12.50", "11.00"]')
+        self.assertEqual(prices.valid_until,
+                         self.small_showing.date_time - datetime.timedelta(hours=3))
+
+    def test_pricing_showing_price_changed(self):
+        """
+        Test checks that prices are rebuilt when showing price is changed
+        """
+        self._row_prices()
+        self.small_showing.price = Decimal('20')
+        self.small_showing.save()
+        self.assertEqual(self._row_prices(), '["19.80", "22.50", "19.80"]')
+
+    def test_pricing_quote_single_query(self):
+        """
+        Test checks that seat price of up to date table is read by one query
+        """
+        self._row_prices()
+        with self.assertNumQueries(1):
+            self.assertEqual(pricing.quote(self.small_showing, 2), Decimal('11.25'))
@@ -0,0 +1,72 @@
+"""
+Tests for on-demand request profiling:
+ - /<any url>?_profile=1
+ - X-Profile header
+"""
+import json
+
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework import status
+
+from booking.models import ProfileReport
+from booking.tests.test_url_tickets import TicketsBaseTestCase
+
+
+class ProfilingTestCase(TicketsBaseTestCase):
+    """
+    Test case for on-demand request profiling
+    """
+
+    def test_profiling_positive_report_admin(self):
+        """
+        Positive test checks that admin gets profiling report for ?_profile=1
+        """
+        response = self.client.get(path=reverse('ticket-list') + '?_profile=1',
+                                   HTTP_AUTHORIZATION=f'Bearer {self.admin_token}')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        report = json.loads(response.content)
+        self.assertEqual(report['status_code'], status.HTTP_200_OK)
+        self.assertTrue(report['functions'])
+        self.assertTrue(any(query['explain'] for query in report['queries']))
+        self.assertEqual(report['serializers']['TicketSerializer']['price']['calls'], 1)
+        stored = ProfileReport.objects.get(pk=report['id'])
+        self.assertEqual(stored.user, self.admin.email)
+        self.assertEqual(stored.query_count, len(report['queries']))
+
+    def test_profiling_positive_header_admin(self):
+        """
+        Positive test checks that X-Profile header keeps response and refers to stored report
+        """
+        response = self.client.get(path=reverse('showing-list'),
+                                   HTTP_X_PROFILE='1',
+                                   HTTP_AUTHORIZATION=f'Bearer {self.admin_token}')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['count'], 1)
+        stored = ProfileReport.objects.get(pk=response['X-Profile-Id'])
+        report = json.loads(stored.report)
+        self.assertIn('date_time', report['serializers']['ShowingSerializer'])
+
+    def test_profiling_negative_user(self):
+        """
+        Negative test checks that non admin users cannot profile requests
+        """
+        response = self.client.get(path=reverse('ticket-list') + '?_profile=1',
+                                   HTTP_AUTHORIZATION=f'Bearer {self.user_token}')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['count'], 1)
+        self.assertFalse(ProfileReport.objects.exists())
+
+    @override_settings(CINEMA_PROFILE_REPORTS_LIMIT=2)
+    def test_profiling_reports_limit(self):
+        """
+        Test checks that only the latest reports are kept
+        """
+        ids = []
+        for _ in range(3):
+            response = self.client.get(path=reverse('hall-list'),
+                                       HTTP_X_PROFILE='1',
+                                       HTTP_AUTHORIZATION=f'Bearer {self.admin_token}')
+            ids.append(int(response['X-Profile-Id']))
+        self.assertListEqual(list(ProfileReport.objects.values_list('pk', flat=True)),
+                             ids[:0:-1])
@@ -0,0 +1,96 @@
+"""
+Tests for daily sales rollup updated by:
+ - /tickets/
+ - /tickets/<int:pk>/
+ - pay_ticket, disable_bookings and reconcile_daily_stats tasks
+"""
+import datetime
+from decimal import Decimal
+from unittest import mock
+
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+
+from booking.models import DailyShowingStats, Ticket
+from booking.tasks import pay_ticket, disable_bookings, reconcile_daily_stats
+from booking.tests.test_url_tickets import TicketsBaseTestCase
+
+
+class RollupTestCase(TicketsBaseTestCase):
+    """
+    Test case for incremental updates and reconciliation of DailyShowingStats
+    """
+
+    def _book(self, row_number, seat_number):
+        response = self.client.post(path=reverse('ticket-list'),
+                                    data={'showing': self.showing.pk,
+                                          'row_number': row_number,
+                                          'seat_number': seat_number},
+                                    content_type='application/json',
+                                    HTTP_AUTHORIZATION=f'Bearer {self.user_token}')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        return response.data['id']
+
+    def _stats(self):
+        stats = DailyShowingStats.objects.get(showing=self.showing, date=timezone.localdate())
+        return stats.booked, stats.paid, stats.released, stats.revenue
+
+    def test_rollup_booking_payment_and_release(self):
+        """
+        Test checks that booking, payment, cancellation and disabling update today's row
+        """
+        paid_id = self._book(2, 2)
+        cancelled_id = self._book(2, 3)
+        self._book(2, 4)
+        self.assertTupleEqual(self._stats(), (3, 0, 0, Decimal(0)))
+
+        with mock.patch('booking.tasks.time.sleep'):
+            pay_ticket(pk=paid_id, payment_uuid='receipt')
+            pay_ticket(pk=paid_id, payment_uuid='receipt')
+        # Price quoted at booking
+        price = Ticket.objects.get(pk=paid_id).price
+        self.assertTupleEqual(self._stats(), (3, 1, 0, price))
+
+        response = self.client.delete(path=reverse('ticket-detail', args=[cancelled_id]),
+                                      HTTP_AUTHORIZATION=f'Bearer {self.user_token}')
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertTupleEqual(self._stats(), (3, 1, 1, price))
+
+        disable_bookings()
+        self.assertTupleEqual(self._stats(), (3, 1, 2, price))
+        self.assertListEqual(list(Ticket.objects.filter(showing=self.showing, receipt='')), [])
+
+    def test_rollup_reconciliation(self):
+        """
+        Test checks that reconciliation restores booked, paid and revenue and keeps released
+        """
+        paid_id = self._book(2, 2)
+        self._book(2, 3)
+        Ticket.objects.filter(pk=paid_id).update(receipt='lost payment')
+        DailyShowingStats.objects.update(released=1)
+
+        self.assertEqual(self._stats(), (2, 0, 1, Decimal(0)))
+        with self.assertLogs('booking.tasks', 'WARNING') as logs:
+            reconcile_daily_stats(days=None)
+        self.assertListEqual(logs.output,
+                             ['WARNING:booking.tasks:Daily showing stats: 2 rows were fixed'])
+        self.assertEqual(self._stats(), (3, 1, 1, Ticket.objects.get(pk=paid_id).price))
+        booking_day = DailyShowingStats.objects.get(
+            date=timezone.localdate(self.ticket.date_time))
+        self.assertEqual((booking_day.booked, booking_day.paid), (1, 0))
+
+    def test_rollup_reconciliation_recent_showings(self):
+        """
+        Test checks that the nightly reconciliation skips past showings
+        """
+        self.showing.date_time = timezone.now() - datetime.timedelta(days=3)
+        self.showing.save()
+        self.assertFalse(DailyShowingStats.objects.exists())
+        reconcile_daily_stats()
+        self.assertFalse(DailyShowingStats.objects.exists())
+        with self.assertLogs('booking.tasks', 'WARNING') as logs:
+            reconcile_daily_stats(days=5)
+        self.assertListEqual(logs.output,
+                             ['WARNING:booking.tasks:Daily showing stats: 1 rows were fixed'])
+        self.assertTrue(DailyShowingStats.objects.exists())
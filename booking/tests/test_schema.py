@@ -0,0 +1,78 @@
+"""
+Tests for endpoints:
+ - /swagger.json, /swagger.yaml
+ - /swagger/, /redoc/
+"""
+import io
+import json
+import os
+import tempfile
+from unittest import mock
+
+from django.core.management import call_command
+from django.test import RequestFactory, SimpleTestCase, override_settings
+from django.urls import reverse
+from drf_yasg.views import get_schema_view
+from rest_framework import status
+
+from cinema import schema, urls
+from tools.schema import SchemaDocuments
+
+
+class SchemaTestCase(SimpleTestCase):
+    """
+    Test case for OpenAPI schema documents rendered once
+    """
+
+    def test_url_schema_positive(self):
+        """
+        Positive test checks that documents are the introspected schema served with ETag
+        """
+        view = get_schema_view(schema.schema_info, public=True,
+                               patterns=urls.documented_url_patterns).without_ui()
+        introspected = view(RequestFactory().get('/swagger.json'), format='.json').render()
+        expected = json.loads(introspected.content)
+        del expected['host'], expected['schemes']
+
+        response = self.client.get(reverse('schema-json', args=['.json']))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['Content-Type'], 'application/json; charset=utf-8')
+        self.assertDictEqual(json.loads(response.content), expected)
+        self.assertTrue(response.has_header('ETag'))
+
+        response = self.client.get(reverse('schema-json', args=['.yaml']))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.content.startswith(b"swagger: '2.0'\n"))
+        response = self.client.get(reverse('schema-swagger-ui'), {'format': 'openapi'})
+        self.assertEqual(response['Content-Type'], 'application/openapi+json; charset=utf-8')
+        for name in ('schema-swagger-ui', 'schema-redoc'):
+            self.assertEqual(self.client.get(reverse(name)).status_code, status.HTTP_200_OK)
+
+    def test_url_schema_not_modified(self):
+        """
+        Test checks that documents are not introspected again and revalidated by ETag
+        """
+        path = reverse('schema-json', args=['.json'])
+        etag = self.client.get(path)['ETag']
+        with mock.patch.object(schema.schema_documents.generator, 'get_schema') as get_schema:
+            self.assertEqual(self.client.get(path).status_code, status.HTTP_200_OK)
+            response = self.client.get(path, HTTP_IF_NONE_MATCH=etag)
+        get_schema.assert_not_called()
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response['ETag'], etag)
+
+    def test_generate_schema(self):
+        """
+        Test checks that documents written by generate_schema command are served from files
+        """
+        with tempfile.TemporaryDirectory() as directory, \
+                override_settings(CINEMA_SCHEMA_DIR=directory):
+            output = io.StringIO()
+            call_command('generate_schema', stdout=output)
+            self.assertEqual(sorted(os.listdir(directory)), ['swagger.json', 'swagger.yaml'])
+            self.assertIn('swagger.yaml was written', output.getvalue())
+
+            documents = SchemaDocuments(mock.Mock())
+            with open(os.path.join(directory, 'swagger.json'), 'rb') as file:
+                self.assertEqual(documents.get('swagger.json')[0], file.read())
+            documents.generator.get_schema.assert_not_called()
@@ -0,0 +1,95 @@
+"""
+Tests for movie search: /movies/?q=
+"""
+from unittest import skipUnless
+
+from django.db import connection
+from django.urls import reverse
+from rest_framework import status
+
+from booking import search
+from booking.models import Movie
+from booking.tests.factories import make_movie
+from booking.tests.helper import LoggedInTestCase
+
+
+class MovieSearchTestCase(LoggedInTestCase):
+    """
+    Test case checks ranking of movies found by name
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        super(MovieSearchTestCase, cls).setUpTestData()
+        for name in ('The Matrix', 'Matrix Reloaded', 'Mad Max', 'Amadeus', 'Dogma'):
+            make_movie(name=name)
+
+    def _search(self, text, **params):
+        response = self.client.get(path=reverse('movie-list'), data={'q': text, **params})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [movie['name'] for movie in response.data['results']]
+
+    def test_search_prefix(self):
+        """
+        Test checks autocomplete: names starting with the query go first
+        """
+        self.assertListEqual(self._search('ma'),
+                             ['Mad Max', 'Matrix Reloaded', 'The Matrix', 'Dogma', 'Amadeus'])
+        self.assertListEqual(self._search('MATRIX'), ['Matrix Reloaded', 'The Matrix'])
+
+    def test_search_fuzzy(self):
+        """
+        Test checks that misspelled names are found by trigram similarity
+        """
+        self.assertListEqual(self._search('matrx'), ['The Matrix'])
+        self.assertListEqual(self._search('zzz'), [])
+
+    def test_search_rank_order(self):
+        """
+        Test checks that in-memory search keeps rank order of movies, not their id order
+        """
+        make_movie(name='Matrx Remastered')
+        self.assertListEqual(self._search('matrx'), ['Matrx Remastered', 'The Matrix'])
+        found = search.search(Movie.objects.order_by('pk'), 'matrx')
+        self.assertListEqual([movie.name for movie in found], ['Matrx Remastered', 'The Matrix'])
+
+    def test_search_filters(self):
+        """
+        Test checks that search is combined with other filters and index follows changes
+        """
+        make_movie(name='Matrix Resurrections', premiere_year=2021)
+        self.assertListEqual(self._search('matrix', premiere_year=2021),
+                             ['Matrix Resurrections'])
+        self.assertEqual(len(self._search('')), 6)
+
+    def test_search_index(self):
+        """
+        Test checks in-memory index limit and ranking of word prefixes over similar names
+        """
+        index = search.MovieIndex([(1, 'Star Wars'), (2, 'Stars'), (3, 'Lone Star'),
+                                   (4, 'Start'), (5, 'Tsar')])
+        self.assertListEqual(index.search('star', 10), [2, 4, 1, 3])
+        self.assertListEqual(index.search('star', 3), [2, 4, 1])
+        self.assertListEqual(index.search('tsars', 10), [5])
+        self.assertListEqual(index.search(' ', 10), [])
+
+    def test_search_ilike_lookups(self):
+        """
+        Test checks that PostgreSQL search matches names by ILIKE with escaped patterns
+        """
+        for lookup, pattern in (('ilike_contains', r'%100\%\_%'),
+                                ('ilike_startswith', r'100\%\_%')):
+            query = Movie.objects.filter(**{f'name__{lookup}': '100%_'}).query
+            sql, params = query.sql_with_params()
+            self.assertIn('"name" ILIKE %s', sql)
+            self.assertTupleEqual(params, (pattern,))
+
+    @skipUnless(connection.vendor == 'postgresql', 'pg_trgm index is created on PostgreSQL only')
+    def test_search_postgres_index(self):
+        """
+        Test checks that PostgreSQL search filters movies by the trigram index
+        """
+        with connection.cursor() as cursor:
+            cursor.execute('SET LOCAL enable_seqscan = off')
+        plan = search.search(Movie.objects.all(), 'matrix').explain()
+        self.assertIn('movie_name_trgm_idx', plan)
@@ -0,0 +1,80 @@
+"""
+Tests for sparse fieldsets and expansion of related objects: ?fields=...&expand=...
+"""
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+
+from booking.tests.factories import make_showing, make_ticket
+from booking.tests.test_url_tickets import TicketsBaseTestCase
+
+
+class SparseFieldsTestCase(TicketsBaseTestCase):
+    """
+    Test case checks requested fields and related objects of responses and loaded columns
+    """
+
+    def _get(self, path, **params):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(path=path, data=params,
+                                       HTTP_AUTHORIZATION=f'Bearer {self.user_token}')
+        return response, [query['sql'] for query in queries]
+
+    def test_sparse_fields(self):
+        """
+        Test checks that only requested fields are returned and read from the database
+        """
+        response, queries = self._get(reverse('ticket-list'), fields='id,row_number,paid')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertDictEqual(dict(response.data['results'][0]),
+                             {'id': self.ticket.pk, 'row_number': 1, 'paid': False})
+        self.assertIn('"receipt"', queries[-1])
+        self.assertNotIn('"seat_number"', queries[-1])
+
+        response, _ = self._get(reverse('movie-detail', args=[self.movie.pk]), fields='name')
+        self.assertDictEqual(response.data, {'name': 'Movie'})
+
+    def test_sparse_fields_expand(self):
+        """
+        Test checks that expanded related objects are loaded by the same query
+        """
+        params = {'fields': 'id,price,showing.price,showing.movie,showing.hall.name',
+                  'expand': 'showing,showing.movie,showing.hall'}
+        _, queries = self._get(reverse('ticket-list'), **params)
+        make_ticket(self.user, showing=make_showing(hall=self.hall), seat_number=2)
+        response, more_queries = self._get(reverse('ticket-list'), **params)
+        self.assertEqual(len(more_queries), len(queries))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        ticket = response.data['results'][1]
+        self.assertDictEqual(ticket['showing']['movie'], {
+            'id': self.movie.pk,
+            'name': 'Movie',
+            'duration': 120,
+            'premiere_year': 1999,
+        })
+        self.assertDictEqual(ticket['showing']['hall'], {'name': 'Hall'})
+        self.assertListEqual(list(ticket), ['id', 'showing', 'price'])
+        self.assertListEqual(list(ticket['showing']), ['hall', 'movie', 'price'])
+        self.assertIn('"booking_hall"."name"', more_queries[-1])
+        self.assertNotIn('"booking_hall"."rows_count"', more_queries[-1])
+
+    def test_sparse_fields_negative(self):
+        """
+        Negative test checks unknown fields and fields which cannot be expanded
+        """
+        for params in ({'fields': 'id,unknown'}, {'expand': 'user'}):
+            response, _ = self._get(reverse('ticket-list'), **params)
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+            self.assertIn(list(params)[0], response.data)
+
+    def test_sparse_fields_update(self):
+        """
+        Test checks that fields of the request are not dropped when updating
+        """
+        response = self.client.patch(
+            path=reverse('ticket-detail', args=[self.ticket.pk]) + '?fields=id',
+            data={'row_number': 2}, content_type='application/json',
+            HTTP_AUTHORIZATION=f'Bearer {self.admin_token}')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['row_number'], 2)
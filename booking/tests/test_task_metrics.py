@@ -0,0 +1,91 @@
+"""
+Tests for Celery task instrumentation
+"""
+import tempfile
+import time
+from types import SimpleNamespace
+
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework import status
+
+from booking import task_metrics
+from booking.models import SlowTaskRun, Ticket
+from booking.tasks import disable_bookings, reconcile_daily_stats
+from booking.tests.test_url_tickets import TicketsBaseTestCase
+from tools.metrics import REGISTRY
+
+
+class TaskMetricsTestCase(TicketsBaseTestCase):
+    """
+    Test case checks task runs measurements and slow task runs
+    """
+
+    def setUp(self) -> None:
+        super(TaskMetricsTestCase, self).setUp()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        settings_override = override_settings(CINEMA_METRICS_DIR=directory.name)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    @staticmethod
+    def _count(family, **labels):
+        key = (family, f'{family}_count', tuple(sorted(labels.items())))
+        return REGISTRY.collect().get(key, 0.0)
+
+    @override_settings(CINEMA_SLOW_TASK_SECONDS={'default': 0.0})
+    def test_task_metrics_slow_run(self):
+        """
+        Test checks run time and rows written by the task and the admin page of slow runs
+        """
+        task = 'booking.tasks.disable_bookings'
+        before = self._count('cinema_task_duration_seconds', task=task, state='SUCCESS')
+        with self.assertLogs('booking.task_metrics', 'WARNING'):
+            disable_bookings.apply()
+        self.assertFalse(Ticket.objects.exists())
+        after = self._count('cinema_task_duration_seconds', task=task, state='SUCCESS')
+        self.assertEqual(after - before, 1)
+
+        run = SlowTaskRun.objects.get()
+        self.assertEqual(run.task, task)
+        self.assertEqual(run.state, 'SUCCESS')
+        self.assertIsNone(run.wait_ms)
+        # Deleted ticket, daily stats row and seat change in the outbox
+        self.assertEqual(run.rows_written, 3)
+        self.assertGreater(run.query_count, run.rows_written)
+
+        self.client.force_login(self.admin)
+        response = self.client.get(reverse('admin:booking_slowtaskrun_changelist'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertContains(response, task)
+
+    def test_task_metrics_fast_run(self):
+        """
+        Test checks that runs faster than the threshold are not saved
+        """
+        reconcile_daily_stats.apply()
+        self.assertFalse(SlowTaskRun.objects.exists())
+
+    @override_settings(CINEMA_SLOW_TASK_SECONDS={'default': 1.0})
+    def test_task_metrics_queue_wait(self):
+        """
+        Test checks that time since the task was sent is measured as queue wait
+        """
+        headers = {}
+        task_metrics._on_before_publish(headers=headers)  # pylint: disable=protected-access
+        headers[task_metrics.PUBLISHED_HEADER] -= 2
+        task = SimpleNamespace(name='booking.tasks.pay_ticket', request=SimpleNamespace(
+            id='1', delivery_info={'routing_key': 'payments'}, retries=1, **headers))
+        # pylint: disable=protected-access
+        task_metrics._on_prerun(task_id='1', task=task)
+        time.sleep(0.01)
+        with self.assertLogs('booking.task_metrics', 'WARNING'):
+            task_metrics._on_postrun(task_id='1', task=task, state='SUCCESS')
+
+        self.assertEqual(self._count('cinema_task_queue_wait_seconds',
+                                     task='booking.tasks.pay_ticket'), 1)
+        run = SlowTaskRun.objects.get()
+        self.assertGreaterEqual(run.wait_ms, 2000)
+        self.assertEqual(run.queue, 'payments')
+        self.assertEqual(run.retries, 1)
@@ -0,0 +1,85 @@
+"""
+Tests for endpoints:
+ - /tickets/export.csv
+ - /showings/export.ndjson
+"""
+import csv
+import datetime
+import io
+import json
+
+from django.urls import reverse
+from rest_framework import status
+
+from booking.models import Showing, Ticket
+from booking.tests.test_url_tickets import TicketsBaseTestCase
+
+
+class ExportTestCase(TicketsBaseTestCase):
+    """
+    Test case for streaming export: /tickets/export.csv, /showings/export.ndjson
+    """
+
+    def setUp(self) -> None:
+        super(ExportTestCase, self).setUp()
+        self.paid_ticket = Ticket(showing=self.showing,
+                                  user=self.admin,
+                                  date_time=self.ticket.date_time + datetime.timedelta(days=1),
+                                  row_number=2, seat_number=2,
+                                  receipt='6d0b7c1e-3b0a-4d6c-9d43-52a1c1b0b6b1')
+        self.paid_ticket.save()
+
+    def _get(self, name, query='', token=None):
+        response = self.client.get(path=reverse(name) + query,
+                                   HTTP_AUTHORIZATION=f'Bearer {token or self.admin_token}')
+        content = b''.join(response.streaming_content) \
+            if response.status_code == status.HTTP_200_OK else b''
+        return response, content.decode()
+
+    def test_url_tickets_export_positive_admin(self):
+        """
+        Positive test checks that CSV rows are the same as /tickets/ results
+        """
+        response, content = self._get('ticket-export')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['Content-Type'], 'text/csv; charset=utf-8')
+        rows = list(csv.DictReader(io.StringIO(content)))
+
+        api_response = self.client.get(path=reverse('ticket-list'),
+                                       HTTP_AUTHORIZATION=f'Bearer {self.admin_token}')
+        expected = [{key: str(value) for key, value in ticket.items()}
+                    for ticket in api_response.data['results']]
+        self.assertListEqual(rows, expected)
+
+    def test_url_tickets_export_positive_date_range(self):
+        """
+        Positive test checks that tickets are filtered by booking time range
+        """
+        after = (self.ticket.date_time + datetime.timedelta(hours=1)).strftime('%Y-%m-%d%%20%H:%M')
+        response, content = self._get('ticket-export', f'?date_time_after={after}')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        rows = list(csv.DictReader(io.StringIO(content)))
+        self.assertListEqual([row['id'] for row in rows], [str(self.paid_ticket.pk)])
+        self.assertEqual(rows[0]['paid'], 'True')
+
+    def test_url_showings_export_positive_admin(self):
+        """
+        Positive test checks that NDJSON lines are the same as /showings/ results
+        """
+        Showing(hall=self.hall, movie=self.movie, price='5',
+                date_time=self.showing.date_time + datetime.timedelta(days=1)).save()
+        response, content = self._get('showing-export')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        lines = [json.loads(line) for line in content.splitlines()]
+
+        api_response = self.client.get(path=reverse('showing-list'))
+        self.assertListEqual(lines, json.loads(api_response.content)['results'])
+
+    def test_url_export_negative_user(self):
+        """
+        Negative test checks that non admin users cannot export
+        """
+        for name in ('ticket-export', 'showing-export'):
+            response, _ = self._get(name, token=self.user_token)
+            self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
@@ -25,6 +25,7 @@ class HallsDetailPositiveTestCase(LoggedInTestCase):
             'name': hall.name,
             'rows_count': hall.rows_count,
             'rows_size': hall.rows_size,
+            'layout': '',
             'seats_count': hall.rows_count * hall.rows_size,
         }
         response = self.client.get(path=reverse('hall-detail', args=[hall.pk]))
@@ -50,6 +51,7 @@ class HallsDetailPositiveTestCase(LoggedInTestCase):
             'name': input_data['name'],
             'rows_count': input_data['rows_count'],
             'rows_size': input_data['rows_size'],
+            'layout': '',
             'seats_count': input_data['rows_count'] * input_data['rows_size'],
         }
         self.assertEqual(response.status_code, status.HTTP_200_OK)
@@ -280,6 +282,7 @@ class HallsListPositiveTestCase(LoggedInTestCase):
                 'name': hall.name,
                 'rows_count': hall.rows_count,
                 'rows_size': hall.rows_size,
+                'layout': '',
                 'seats_count': hall.rows_count * hall.rows_size,
             } for hall in Hall.objects.all().order_by('-pk')
         ]
@@ -310,6 +313,7 @@ class HallsListPositiveTestCase(LoggedInTestCase):
         hall = halls[0]
         expected_response = data.copy()
         expected_response['id'] = hall.pk
+        expected_response['layout'] = ''
         expected_response['seats_count'] = data['rows_count'] * data['rows_size']
         self.assertDictEqual(response.data, expected_response)
 
@@ -0,0 +1,193 @@
+"""
+Tests for endpoint:
+ - /metrics
+"""
+import os
+import subprocess
+import sys
+import tempfile
+from unittest import mock
+
+from django.conf import settings
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework import status
+
+from booking.serializers import TicketCreateSerializer
+from booking.tasks import disable_bookings, pay_ticket
+from booking.tests.test_url_tickets import TicketsBaseTestCase
+from tools.metrics import REGISTRY, CONTENT_TYPE
+
+
+# Run by a new interpreter: forked children are not allowed in workers of --parallel
+_INCREMENT_IN_CHILD = """
+import sys
+from django.conf import settings
+settings.configure(CINEMA_METRICS_DIR=sys.argv[1])
+from tools.metrics import REGISTRY
+REGISTRY.counter('cinema_test_child', 'Child process counter').inc(int(sys.argv[2]))
+REGISTRY.flush(force=True)
+"""
+
+
+class MetricsTestCase(TicketsBaseTestCase):
+    """
+    Test case for metrics exposition: /metrics
+    """
+
+    def setUp(self) -> None:
+        super(MetricsTestCase, self).setUp()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        settings_override = override_settings(CINEMA_METRICS_DIR=directory.name,
+                                              CINEMA_METRICS_TOKEN='scraper')
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def _scrape(self):
+        """Stand-in scraper: parses text exposition into {'name{labels}': value}"""
+        response = self.client.get(path=reverse('metrics'), HTTP_AUTHORIZATION='Bearer scraper')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['Content-Type'], CONTENT_TYPE)
+        samples = {}
+        for line in response.content.decode().splitlines():
+            if line and not line.startswith('#'):
+                sample, value = line.rsplit(' ', 1)
+                samples[sample] = float(value)
+        return samples
+
+    def _book(self, row_number, seat_number):
+        return self.client.post(path=reverse('ticket-list'),
+                                data={'showing': self.showing.pk,
+                                      'row_number': row_number,
+                                      'seat_number': seat_number},
+                                content_type='application/json',
+                                HTTP_AUTHORIZATION=f'Bearer {self.user_token}')
+
+    def test_metrics_seat_bookings(self):
+        """
+        Test checks that successful and conflicting bookings are counted
+        """
+        before = self._scrape()
+        self.assertEqual(self._book(5, 5).status_code, status.HTTP_201_CREATED)
+        self.assertEqual(self._book(5, 5).status_code, status.HTTP_400_BAD_REQUEST)
+        after = self._scrape()
+        for result in ('success', 'conflict'):
+            key = f'cinema_seat_bookings_total{{result="{result}"}}'
+            self.assertEqual(after[key] - before.get(key, 0), 1)
+
+    def test_metrics_seat_bookings_race(self):
+        """
+        Test checks that booking conflicts found on saving the ticket are counted and
+        returned as validation errors
+        """
+        self.assertEqual(self._book(5, 5).status_code, status.HTTP_201_CREATED)
+        key = 'cinema_seat_bookings_total{result="conflict"}'
+        before = self._scrape()
+        # The validator passes as if the concurrent booking was not committed yet
+        with mock.patch.object(TicketCreateSerializer, 'get_validators', return_value=[]), \
+                mock.patch.object(TicketCreateSerializer, 'validate', new=lambda _, attrs: attrs):
+            response = self._book(5, 5)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.json(), self._book(5, 5).json())
+        self.assertEqual(self._scrape()[key] - before.get(key, 0), 2)
+
+    def test_metrics_request_latency(self):
+        """
+        Test checks that request latency histogram is labeled by view
+        """
+        key = 'cinema_http_request_duration_seconds_count{method="GET",view="ticket-list"}'
+        inf_key = 'cinema_http_request_duration_seconds_bucket' \
+                  '{method="GET",view="ticket-list",le="+Inf"}'
+        before = self._scrape()
+        self.client.get(path=reverse('ticket-list'),
+                        HTTP_AUTHORIZATION=f'Bearer {self.user_token}')
+        after = self._scrape()
+        self.assertEqual(after[key] - before.get(key, 0), 1)
+        self.assertEqual(after[inf_key], after[key])
+
+    def test_metrics_pay_ticket_queue_depth(self):
+        """
+        Test checks that payments sent to the broker increase queue depth and saved payments
+        decrease it once, however many times the task is delivered
+        """
+        key = 'cinema_pay_ticket_queue_depth'
+        before = self._scrape()
+        response = self.client.put(path=reverse('pay', args=[self.ticket.pk]),
+                                   HTTP_AUTHORIZATION=f'Bearer {self.user_token}')
+        after = self._scrape()
+        self.assertEqual(after[key] - before.get(key, 0), 1)
+
+        with mock.patch('booking.tasks.time.sleep'):
+            for _ in range(2):
+                pay_ticket(pk=self.ticket.pk, payment_uuid=str(response.data['receipt']))
+        self.assertEqual(self._scrape()[key], before.get(key, 0))
+
+    def test_metrics_pay_ticket_queue_depth_ticket_deleted(self):
+        """
+        Test checks that payments of tickets deleted before the task runs leave queue depth
+        """
+        key = 'cinema_pay_ticket_queue_depth'
+        before = self._scrape()
+        response = self.client.put(path=reverse('pay', args=[self.ticket.pk]),
+                                   HTTP_AUTHORIZATION=f'Bearer {self.user_token}')
+        self.assertEqual(self._scrape()[key] - before.get(key, 0), 1)
+        response_delete = self.client.delete(path=reverse('ticket-detail', args=[self.ticket.pk]),
+                                             HTTP_AUTHORIZATION=f'Bearer {self.user_token}')
+        self.assertEqual(response_delete.status_code, status.HTTP_204_NO_CONTENT)
+
+        with mock.patch('booking.tasks.time.sleep'), \
+                self.assertLogs('booking.tasks', 'WARNING'):
+            pay_ticket(pk=self.ticket.pk, payment_uuid=str(response.data['receipt']))
+        self.assertEqual(self._scrape()[key], before.get(key, 0))
+
+    def test_metrics_disable_bookings_deleted_rows(self):
+        """
+        Test checks that disable_bookings reports deleted rows
+        """
+        key = 'cinema_disable_bookings_deleted_rows_sum'
+        before = self._scrape()
+        disable_bookings()
+        after = self._scrape()
+        self.assertEqual(after[key] - before.get(key, 0), 1)
+
+    def test_metrics_aggregated_across_processes(self):
+        """
+        Test checks that samples flushed by another process are summed up
+        """
+        for amount in (2, 3):
+            subprocess.run([sys.executable, '-c', _INCREMENT_IN_CHILD, REGISTRY.directory,
+                            str(amount)], cwd=settings.BASE_DIR, check=True)
+        self.assertEqual(self._scrape()['cinema_test_child_total'], 5)
+
+    def test_metrics_access(self):
+        """
+        Negative test checks that metrics are served to staff users and the scraper only
+        """
+        path = reverse('metrics')
+        self.assertEqual(self.client.get(path).status_code, status.HTTP_403_FORBIDDEN)
+        self.assertEqual(self.client.get(path, HTTP_AUTHORIZATION='Bearer wrong').status_code,
+                         status.HTTP_403_FORBIDDEN)
+        self.client.force_login(self.admin)
+        self.assertEqual(self.client.get(path).status_code, status.HTTP_200_OK)
+
+    @override_settings(CINEMA_METRICS_FLUSH_SECONDS=60)
+    def test_metrics_flush_throttled(self):
+        """
+        Test checks that the metrics file is written once per interval and later by a timer
+        """
+        counter = REGISTRY.counter('cinema_test_throttled', 'Throttled counter')
+        counter.inc()
+        REGISTRY.flush(force=True)
+        directory = REGISTRY.directory
+        (file_name,) = os.listdir(directory)
+        self.assertRegex(file_name, rf'^{os.getpid()}-[0-9a-f]{{32}}\.json$')
+        modified = os.stat(os.path.join(directory, file_name)).st_mtime_ns
+        with mock.patch.object(REGISTRY, '_timer', None), \
+                mock.patch('tools.metrics.threading.Timer') as timer:
+            counter.inc()
+            REGISTRY.flush()
+            REGISTRY.flush()
+        timer.assert_called_once()
+        self.assertEqual(os.stat(os.path.join(directory, file_name)).st_mtime_ns, modified)
+        self.assertEqual(self._scrape()['cinema_test_throttled_total'], 2)
@@ -0,0 +1,134 @@
+"""
+Tests for endpoints:
+ - /reports/occupancy/
+ - /reports/revenue/
+"""
+import datetime
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+
+from booking.models import DailyShowingStats, Hall, Movie, Showing, Ticket
+from booking.tasks import reconcile_daily_stats
+from booking.tests.test_url_tickets import TicketsBaseTestCase
+
+
+class ReportsBaseTestCase(TicketsBaseTestCase):
+    """
+    Base test case prepares two movies in two halls with paid and booked tickets
+    """
+
+    def setUp(self) -> None:
+        super(ReportsBaseTestCase, self).setUp()
+        cache.clear()
+        self.movie_2 = Movie(name='Movie 2', duration=90, premiere_year=2000)
+        self.movie_2.save()
+        self.hall_2 = Hall(name='Hall 2', rows_count=2, rows_size=5)
+        self.hall_2.save()
+        self.showing_2 = Showing(hall=self.hall_2,
+                                 movie=self.movie_2,
+                                 date_time=self.showing.date_time + datetime.timedelta(days=40),
+                                 price='5.50')
+        self.showing_2.save()
+        seats = [(self.showing, 2, 'paid-1'), (self.showing, 3, ''),
+                 (self.showing_2, 1, 'paid-2'), (self.showing_2, 2, 'paid-3')]
+        for showing, seat_number, receipt in seats:
+            Ticket(showing=showing, user=self.user, date_time=self.ticket.date_time,
+                   row_number=1, seat_number=seat_number, receipt=receipt).save()
+        # Tickets were saved bypassing the booking path
+        with self.assertLogs('booking.tasks', 'WARNING'):
+            reconcile_daily_stats(days=None)
+
+    def _get(self, name, query=''):
+        return self.client.get(path=reverse(name) + query,
+                               HTTP_AUTHORIZATION=f'Bearer {self.admin_token}')
+
+
+class OccupancyReportTestCase(ReportsBaseTestCase):
+    """
+    Test case for occupancy report: /reports/occupancy/
+    """
+
+    def test_url_reports_occupancy_positive_admin(self):
+        """
+        Positive test checks sold, held and free seats of every showing
+        """
+        response = self._get('report-occupancy')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        results = {row['showing']: row for row in response.data['results']}
+        self.assertEqual(results[self.showing.pk]['capacity'], 16 * 20)
+        self.assertEqual(results[self.showing.pk]['sold'], 1)
+        self.assertEqual(results[self.showing.pk]['held'], 2)
+        self.assertEqual(results[self.showing.pk]['free'], 16 * 20 - 3)
+        self.assertEqual(results[self.showing_2.pk]['sold'], 2)
+        self.assertEqual(results[self.showing_2.pk]['free'], 8)
+
+    def test_url_reports_occupancy_positive_filtered(self):
+        """
+        Positive test checks that report is filtered by hall
+        """
+        response = self._get('report-occupancy', f'?hall={self.hall_2.pk}')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertListEqual([row['showing'] for row in response.data['results']],
+                             [self.showing_2.pk])
+
+    def test_url_reports_occupancy_negative_user(self):
+        """
+        Negative test checks that non admin users cannot view reports
+        """
+        for name in ('report-occupancy', 'report-revenue'):
+            response = self.client.get(path=reverse(name),
+                                       HTTP_AUTHORIZATION=f'Bearer {self.user_token}')
+            self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+
+class RevenueReportTestCase(ReportsBaseTestCase):
+    """
+    Test case for revenue report: /reports/revenue/
+    """
+
+    def test_url_reports_revenue_positive_movie(self):
+        """
+        Positive test checks revenue grouped by movie with a single rollup query
+        """
+        with CaptureQueriesContext(connection) as queries:
+            response = self._get('report-revenue')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertListEqual(response.data, [
+            {'key': self.movie.pk, 'name': 'Movie', 'tickets': 1, 'revenue': '19.99'},
+            {'key': self.movie_2.pk, 'name': 'Movie 2', 'tickets': 2, 'revenue': '11.00'},
+        ])
+        report_queries = [query for query in queries.captured_queries
+                          if 'booking_dailyshowingstats' in query['sql']]
+        self.assertEqual(len(report_queries), 1)
+        self.assertNotIn('booking_ticket', report_queries[0]['sql'])
+
+    def test_url_reports_revenue_positive_month(self):
+        """
+        Positive test checks revenue time series grouped by month
+        """
+        response = self._get('report-revenue', '?group_by=month')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertListEqual(
+            [(row['key'], row['revenue']) for row in response.data],
+            [(datetime.date(2020, 1, 1), '19.99'), (datetime.date(2020, 2, 1), '11.00')])
+
+    def test_url_reports_revenue_positive_cached(self):
+        """
+        Positive test checks that repeated report is served from cache
+        """
+        self._get('report-revenue', '?group_by=hall')
+        DailyShowingStats.objects.update(revenue=0)
+        response = self._get('report-revenue', '?group_by=hall')
+        self.assertEqual(sum(Decimal(row['revenue']) for row in response.data), Decimal('30.99'))
+
+    def test_url_reports_revenue_negative_group_by(self):
+        """
+        Negative test checks that unknown grouping is rejected
+        """
+        response = self._get('report-revenue', '?group_by=year')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
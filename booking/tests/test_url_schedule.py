@@ -0,0 +1,123 @@
+"""
+Tests for endpoints:
+ - /schedule/
+"""
+import datetime
+
+from django.core.cache import cache
+from django.db import connection
+from django.db.models.signals import post_delete
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+
+from booking import schedule
+from booking.models import Ticket
+from booking.tasks import disable_bookings
+from booking.tests.factories import make_hall, make_movie, make_showing, make_ticket
+from booking.tests.test_url_tickets import TicketsBaseTestCase
+
+
+def run_on_commit():
+    """Runs callbacks waiting for commit of the test case transaction"""
+    callbacks, connection.run_on_commit = connection.run_on_commit, []
+    for _, callback in callbacks:
+        callback()
+
+
+class ScheduleTestCase(TicketsBaseTestCase):
+    """
+    Test case for schedule of a day: /schedule/
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        super(ScheduleTestCase, cls).setUpTestData()
+        cls.small_hall = make_hall(name='Small hall', rows_count=2, rows_size=5)
+        cls.later_showing = make_showing(hall=cls.small_hall, movie=cls.movie,
+                                         date_time=cls.showing.date_time +
+                                         datetime.timedelta(hours=3))
+        cls.other_showing = make_showing(movie=make_movie(name='Another movie'),
+                                         hall=cls.small_hall,
+                                         date_time=cls.showing.date_time)
+        # Next day in the current time zone
+        make_showing(hall=cls.hall, movie=cls.movie,
+                     date_time=cls.showing.date_time + datetime.timedelta(hours=14))
+
+    def setUp(self) -> None:
+        super(ScheduleTestCase, self).setUp()
+        cache.clear()
+
+    def _get(self, date):
+        return self.client.get(path=reverse('schedule'), data={'date': date})
+
+    def test_url_schedule_positive(self):
+        """
+        Positive test checks showings of the day grouped by movie and seats left
+        """
+        with self.assertNumQueries(1):
+            response = self._get('2020-01-03')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['date'], '2020-01-03')
+        movies = response.data['movies']
+        self.assertListEqual([movie['movie']['name'] for movie in movies],
+                             ['Another movie', 'Movie'])
+        self.assertDictEqual(dict(movies[1]['movie']), {
+            'id': self.movie.pk,
+            'name': 'Movie',
+            'duration': 120,
+            'premiere_year': 1999,
+        })
+        self.assertListEqual([(showing['id'], showing['hall']['name'], showing['seats_left'])
+                              for showing in movies[1]['showings']],
+                             [(self.showing.pk, 'Hall', 319),
+                              (self.later_showing.pk, 'Small hall', 10)])
+        self.assertEqual(movies[1]['showings'][0]['price'], '19.99')
+
+    def test_url_schedule_cache(self):
+        """
+        Positive test checks that schedule is cached until tickets or showings are changed
+        """
+        self._get('2020-01-03')
+        with self.assertNumQueries(0):
+            self._get('2020-01-03')
+
+        make_ticket(self.user, showing=self.later_showing)
+        run_on_commit()
+        showings = self._get('2020-01-03').data['movies'][1]['showings']
+        self.assertEqual(showings[1]['seats_left'], 9)
+
+        self.other_showing.delete()
+        self.assertEqual(len(self._get('2020-01-03').data['movies']), 2)
+        run_on_commit()
+        self.assertEqual(len(self._get('2020-01-03').data['movies']), 1)
+
+    def test_url_schedule_tickets_deleted(self):
+        """
+        Test checks that tickets are deleted by one query and cached schedules are dropped once
+        """
+        self.assertFalse(post_delete.has_listeners(Ticket))
+        showing = make_showing(hall=self.hall, movie=self.movie,
+                               date_time=timezone.now() + datetime.timedelta(hours=1))
+        for seat_number in (1, 2):
+            make_ticket(self.user, showing=showing, seat_number=seat_number)
+        run_on_commit()
+        version = cache.get(schedule.VERSION_KEY)
+        with CaptureQueriesContext(connection) as queries:
+            disable_bookings()
+        # Tickets locked by the task are not selected again to be deleted one by one
+        self.assertEqual(len([query for query in queries.captured_queries
+                              if query['sql'].startswith('SELECT "booking_ticket"."id"')]), 1)
+        self.assertEqual(len(connection.run_on_commit), 1)
+        run_on_commit()
+        self.assertEqual(cache.get(schedule.VERSION_KEY), version + 1)
+
+    def test_url_schedule_negative(self):
+        """
+        Negative test checks response for malformed date and a day without showings
+        """
+        self.assertEqual(self._get('03.01.2020').status_code, status.HTTP_400_BAD_REQUEST)
+        response = self._get('2020-01-05')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertListEqual(response.data['movies'], [])
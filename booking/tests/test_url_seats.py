@@ -0,0 +1,203 @@
+"""
+Tests for endpoints:
+ - /showings/<int:pk>/seats/ served by WSGI and ASGI applications
+ - /showings/<int:pk>/seats/stream served by ASGI application
+"""
+import asyncio
+import datetime
+import json
+from unittest import mock
+
+from asgiref.sync import sync_to_async
+from asgiref.testing import ApplicationCommunicator
+from django.core.wsgi import get_wsgi_application
+from django.test import TransactionTestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+
+from booking import outbox
+from booking import seats
+from booking.asgi import ROUTES
+from booking.models import Showing, Hall, Movie, Ticket, CustomUser
+from booking.tests.test_url_tickets import TicketsBaseTestCase
+from tools.asgi import AsgiHandler
+from tools.metrics import REGISTRY
+
+
+class SeatsTestCase(TicketsBaseTestCase):
+    """
+    Test case for showing seats: /showings/<int:pk>/seats/
+    """
+
+    def test_url_showing_seats_positive(self):
+        """
+        Positive test checks hall size and layout, row prices and taken seats
+        """
+        Ticket(showing=self.showing, user=self.admin, date_time=self.ticket.date_time,
+               row_number=2, seat_number=5).save()
+        response = self.client.get(path=reverse('showing-seats', args=[self.showing.pk]))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        # 19.99 after the showing time (x1.1), middle rows cost x1.25 and next ones x1.1
+        prices = ['21.99'] * 3 + ['24.19'] * 2 + ['27.49'] * 6 + ['24.19'] * 2 + ['21.99'] * 3
+        self.assertDictEqual(response.data, {'showing': self.showing.pk,
+                                             'rows_count': 16,
+                                             'rows_size': 20,
+                                             'layout': ['s' * 20] * 16,
+                                             'prices': prices,
+                                             'taken': [[1, 1], [2, 5]]})
+
+    def test_url_showing_seats_positive_changes_published(self):
+        """
+        Positive test checks that booked and released seats are published
+        """
+        with mock.patch('booking.views.seats.publish_changes') as publish:
+            response = self.client.post(path=reverse('ticket-list'),
+                                        data={'showing': self.showing.pk,
+                                              'row_number': 3, 'seat_number': 4},
+                                        HTTP_AUTHORIZATION=f'Bearer {self.user_token}')
+            self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+            publish.assert_called_once_with(self.showing.pk, [(3, 4, seats.BOOKED)])
+
+            publish.reset_mock()
+            self.client.delete(path=reverse('ticket-detail', args=[response.data['id']]),
+                               HTTP_AUTHORIZATION=f'Bearer {self.user_token}')
+            publish.assert_called_once_with(self.showing.pk, [(3, 4, seats.FREE)])
+
+    def test_url_showing_seats_stream_wsgi(self):
+        """
+        Positive test checks that WSGI stream sends snapshot and makes clients reconnect
+        """
+        response = self.client.get(path=reverse('showing-seats-stream', args=[self.showing.pk]))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        retry, snapshot = response.content.decode().split('\n\n', 1)
+        self.assertEqual(retry, f'retry: {seats.STREAM_RETRY}')
+        self.assertTrue(snapshot.startswith('event: snapshot\ndata: '))
+        self.assertListEqual(json.loads(snapshot.split('data: ')[1])['taken'], [[1, 1]])
+        response = self.client.get(path=reverse('showing-seats-stream', args=[1000]))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_url_showing_seats_negative_unknown(self):
+        """
+        Negative test checks response for unknown showing
+        """
+        response = self.client.get(path=reverse('showing-seats', args=[1000]))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class AsgiSeatsTestCase(TransactionTestCase):
+    """
+    Test case for ASGI application, the data is committed to be seen by executor threads
+    """
+
+    def setUp(self) -> None:
+        hall = Hall.objects.create(name='Hall', rows_count=2, rows_size=3)
+        movie = Movie.objects.create(name='Movie', duration=120, premiere_year=1999)
+        self.showing = Showing.objects.create(
+            hall=hall, movie=movie, price='10',
+            date_time=datetime.datetime(2020, 1, 1, tzinfo=datetime.timezone.utc))
+        user = CustomUser.objects.create_user(email='user@cinema.com',
+                                              password='password')
+        Ticket.objects.create(showing=self.showing, user=user, date_time=self.showing.date_time,
+                              row_number=2, seat_number=3)
+        self.application = AsgiHandler(get_wsgi_application(), ROUTES)
+
+    def _communicator(self, path, host=b'testserver'):
+        return ApplicationCommunicator(self.application, {
+            'type': 'http', 'method': 'GET', 'path': path, 'query_string': b'',
+            'root_path': '', 'headers': [(b'host', host)],
+            'server': ('testserver', 80), 'client': ('127.0.0.1', 1), 'scheme': 'http',
+            'http_version': '1.1',
+        })
+
+    def _get(self, path, host=b'testserver'):
+        async def request():
+            communicator = self._communicator(path, host)
+            await communicator.send_input({'type': 'http.request', 'body': b''})
+            start = await communicator.receive_output(5)
+            body = b''
+            while True:
+                message = await communicator.receive_output(5)
+                body += message.get('body', b'')
+                if not message.get('more_body'):
+                    break
+            self.headers = dict(start['headers'])
+            return start['status'], body
+        return asyncio.get_event_loop().run_until_complete(request())
+
+    def test_asgi_showing_seats_positive(self):
+        """
+        Positive test checks that native async handler responds as the view
+        """
+        path = reverse('showing-seats', args=[self.showing.pk])
+        status_code, body = self._get(path)
+        self.assertEqual(status_code, status.HTTP_200_OK)
+        self.assertDictEqual(json.loads(body), json.loads(self.client.get(path).content))
+        self.assertListEqual(json.loads(body)['taken'], [[2, 3]])
+
+        status_code, _ = self._get(reverse('showing-seats', args=[1000]))
+        self.assertEqual(status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_asgi_showing_seats_middleware(self):
+        """
+        Test checks host validation, security headers and latency of native routes
+        """
+        path = reverse('showing-seats', args=[self.showing.pk])
+        key = ('cinema_http_request_duration_seconds', 'cinema_http_request_duration_seconds_count',
+               (('method', 'GET'), ('view', 'showing-seats')))
+        count = REGISTRY.collect().get(key, 0)
+        status_code, _ = self._get(path)
+        self.assertEqual(status_code, status.HTTP_200_OK)
+        self.assertEqual(self.headers[b'x-frame-options'], b'SAMEORIGIN')
+        self.assertEqual(self.headers[b'content-type'], b'application/json')
+        self.assertEqual(REGISTRY.collect()[key], count + 1)
+
+        status_code, _ = self._get(path, host=b'attacker.com')
+        self.assertEqual(status_code, status.HTTP_400_BAD_REQUEST)
+        # Middleware settings are read on start, as Django does
+        with override_settings(SECURE_SSL_REDIRECT=True):
+            self.application = AsgiHandler(get_wsgi_application(), ROUTES)
+        status_code, _ = self._get(path)
+        self.assertEqual(status_code, status.HTTP_301_MOVED_PERMANENTLY)
+        self.assertEqual(self.headers[b'location'], f'https://testserver{path}'.encode())
+
+    def test_asgi_wsgi_fallback(self):
+        """
+        Positive test checks that other urls are served by Django views
+        """
+        status_code, body = self._get(reverse('showing-detail', args=[self.showing.pk]))
+        self.assertEqual(status_code, status.HTTP_200_OK)
+        self.assertEqual(json.loads(body)['id'], self.showing.pk)
+
+    @override_settings(CINEMA_PUBSUB_BACKEND='tools.pubsub.MemoryBackend',
+                       CINEMA_SSE_HEARTBEAT_SECONDS=0.1)
+    def test_asgi_showing_seats_stream(self):
+        """
+        Positive test checks snapshot, seat changes and heartbeat events of the stream
+        """
+        path = f'/showings/{self.showing.pk}/seats/stream'
+
+        async def stream():
+            communicator = self._communicator(path)
+            await communicator.send_input({'type': 'http.request', 'body': b''})
+            start = await communicator.receive_output(5)
+            events = [(await communicator.receive_output(5))['body']]
+            await sync_to_async(seats.publish_changes)(self.showing.pk, [(1, 2, seats.BOOKED)])
+            await sync_to_async(seats.publish_changes)(self.showing.pk + 1, [(1, 3, seats.PAID)])
+            await sync_to_async(outbox.relay)(10)
+            events.append((await communicator.receive_output(5))['body'])
+            events.append((await communicator.receive_output(5))['body'])
+            await communicator.send_input({'type': 'http.disconnect'})
+            await communicator.wait(5)
+            return start, events
+
+        start, events = asyncio.get_event_loop().run_until_complete(stream())
+        self.assertEqual(start['status'], status.HTTP_200_OK)
+        self.assertIn((b'content-type', b'text/event-stream'), start['headers'])
+        snapshot = json.loads(events[0].decode().split('data: ')[1])
+        self.assertListEqual(snapshot['taken'], [[2, 3]])
+        self.assertEqual(events[1], b'event: seats\ndata: [[1,2,"booked"]]\n\n')
+        self.assertEqual(events[2], b': ping\n\n')
+
+        status_code, _ = self._get('/showings/1000/seats/stream')
+        self.assertEqual(status_code, status.HTTP_404_NOT_FOUND)
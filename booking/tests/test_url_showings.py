@@ -8,7 +8,8 @@ import datetime
 from django.urls import reverse
 from rest_framework import status
 
-from booking.models import Movie, Hall, Showing
+from booking.models import Showing
+from booking.tests.factories import make_hall, make_movie
 from booking.tests.helper import LoggedInTestCase
 
 
@@ -17,12 +18,11 @@ class ShowingsBaseTestCase(LoggedInTestCase):
     Base test case prepares movie and hall instances for test showings
     """
 
-    def setUp(self) -> None:
-        self.movie = Movie(name='Movie', duration=120, premiere_year=1999)
-        self.movie.save()
-        self.hall = Hall(name='Hall', rows_count=16, rows_size=20)
-        self.hall.save()
-        super(ShowingsBaseTestCase, self).setUp()
+    @classmethod
+    def setUpTestData(cls):
+        super(ShowingsBaseTestCase, cls).setUpTestData()
+        cls.movie = make_movie(name='Movie')
+        cls.hall = make_hall(name='Hall')
 
 
 class ShowingsDetailPositiveTestCase(ShowingsBaseTestCase):
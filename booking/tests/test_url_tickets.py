@@ -9,7 +9,9 @@ from decimal import Decimal
 from django.urls import reverse
 from rest_framework import status
 
-from booking.models import Showing, Hall, Movie, Ticket
+from booking import pricing
+from booking.models import Showing, Ticket
+from booking.tests.factories import make_hall, make_movie, make_showing, make_ticket
 from booking.tests.helper import LoggedInTestCase
 
 
@@ -18,26 +20,13 @@ class TicketsBaseTestCase(LoggedInTestCase):
     Base test case prepares movie and hall instances for test tickets
     """
 
-    def setUp(self) -> None:
-        super(TicketsBaseTestCase, self).setUp()
-        self.movie = Movie(name='Movie', duration=120, premiere_year=1999)
-        self.movie.save()
-        self.hall = Hall(name='Hall', rows_count=16, rows_size=20)
-        self.hall.save()
-        show_time = \
-            datetime.datetime(2019, 12, 24, 10, 0, 0, 1, tzinfo=datetime.timezone.utc) + \
-            datetime.timedelta(10)
-        self.showing = Showing(hall=self.hall,
-                               movie=self.movie,
-                               date_time=show_time,
-                               price='19.99')
-        self.showing.save()
-        ticket_time = show_time - datetime.timedelta(10)
-        self.ticket = Ticket(showing=self.showing,
-                             user=self.user,
-                             date_time=ticket_time,
-                             row_number=1, seat_number=1)
-        self.ticket.save()
+    @classmethod
+    def setUpTestData(cls):
+        super(TicketsBaseTestCase, cls).setUpTestData()
+        cls.movie = make_movie(name='Movie')
+        cls.hall = make_hall(name='Hall')
+        cls.showing = make_showing(hall=cls.hall, movie=cls.movie)
+        cls.ticket = make_ticket(cls.user, showing=cls.showing)
 
 
 class TicketsDetailPositiveTestCase(TicketsBaseTestCase):
@@ -89,7 +78,7 @@ class TicketsDetailPositiveTestCase(TicketsBaseTestCase):
             'paid': False,
             'receipt': '',
             'user': self.user.pk,
-            'price': Decimal(self.showing.price),
+            'price': pricing.quote(self.showing, 2),
         }
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertDictEqual(response.data, expected_response)
@@ -116,7 +105,7 @@ class TicketsDetailPositiveTestCase(TicketsBaseTestCase):
             'paid': False,
             'receipt': '',
             'user': self.user.pk,
-            'price': Decimal(self.showing.price),
+            'price': pricing.quote(self.showing, 2),
         }
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertDictEqual(response.data, expected_response)
@@ -168,7 +157,7 @@ class TicketsDetailNegativeTestCase(TicketsBaseTestCase):
             'showing': self.ticket.showing.pk,
             'row_number': 2,
             'seat_number': 2,
-            'price': Decimal(self.ticket.showing.price),
+            'price': pricing.quote(self.ticket.showing, 2),
             'user': self.ticket.user.pk,
             'date_time': date_time,
             'paid': False,
@@ -403,7 +392,8 @@ class TicketsListPositiveTestCase(TicketsBaseTestCase):
             'date_time': ticket.date_time.isoformat()[:-3] + ticket.date_time.isoformat()[-2:],
             'row_number': input_data['row_number'],
             'seat_number': input_data['seat_number'],
-            'price': Decimal(ticket.showing.price),
+            # 19.99 after the showing time (x1.1), row 3 is not in the middle zones
+            'price': Decimal('21.99'),
             'paid': False,
             'receipt': '',
         }
@@ -435,7 +425,7 @@ class TicketsListPositiveTestCase(TicketsBaseTestCase):
                 'date_time': ticket.date_time.isoformat()[:-3] + ticket.date_time.isoformat()[-2:],
                 'row_number': input_data['row_number'],
                 'seat_number': input_data['seat_number'],
-                'price': Decimal(ticket.showing.price),
+                'price': Decimal('21.99'),
                 'paid': False,
                 'receipt': '',
             }
@@ -463,7 +453,7 @@ class TicketsListPositiveTestCase(TicketsBaseTestCase):
                 'date_time': ticket.date_time.isoformat()[:-3] + ticket.date_time.isoformat()[-2:],
                 'row_number': input_data['row_number'],
                 'seat_number': input_data['seat_number'],
-                'price': Decimal(ticket.showing.price),
+                'price': Decimal('24.19'),
                 'paid': False,
                 'receipt': '',
             }
@@ -0,0 +1,80 @@
+"""
+Booking app ticket bookkeeping
+
+Booking, moving and releasing a ticket changes more than its row: occupancy counts of the
+showing prices (booking.pricing), daily sales rollup (booking.rollup), seat changes streamed
+to clients (booking.seats) and cached schedules (booking.schedule). API views, Celery tasks
+and the admin call these functions in the transaction of the change, so all of them stay
+in step with tickets.
+"""
+from collections import defaultdict
+
+from booking import pricing
+from booking import rollup
+from booking import schedule
+from booking import seats
+
+
+def seat_state(ticket):
+    """Returns state of the ticket seat streamed to clients"""
+    return seats.PAID if ticket.receipt else seats.BOOKED
+
+
+def record_booked(ticket):
+    """Counts saved new ticket"""
+    rollup.record_booked(ticket)
+    pricing.record_booked(ticket.showing_id)
+    seats.publish_changes(ticket.showing_id,
+                          [(ticket.row_number, ticket.seat_number, seat_state(ticket))])
+
+
+def moved_price(ticket, showing, row_number):
+    """
+    Returns price of the ticket moved to the row of the showing: unpaid tickets are quoted
+    at the new seat, paid ones keep their price
+    """
+    if ticket.receipt:
+        return pricing.ticket_price(ticket)
+    return pricing.quote(showing, row_number)
+
+
+def record_moved(ticket, seat, price):
+    """
+    Counts ticket saved at a new seat, seat is (showing_id, row_number, seat_number) the
+    ticket had before
+    """
+    showing_id, row_number, seat_number = seat
+    if ticket.showing_id != showing_id:
+        rollup.record_moved(ticket, showing_id, price)
+        pricing.record_released(showing_id)
+        pricing.record_booked(ticket.showing_id)
+    seats.publish_changes(showing_id, [(row_number, seat_number, seats.FREE)])
+    seats.publish_changes(ticket.showing_id,
+                          [(ticket.row_number, ticket.seat_number, seat_state(ticket))])
+
+
+def record_released(tickets):
+    """
+    Counts deleted tickets given as (showing_id, date_time, row_number, seat_number) tuples
+    """
+    tickets = list(tickets)
+    if not tickets:
+        return
+    rollup.record_released((showing_id, date_time) for showing_id, date_time, _, _ in tickets)
+    released = defaultdict(list)
+    for showing_id, _, row_number, seat_number in tickets:
+        released[showing_id].append((row_number, seat_number, seats.FREE))
+    for showing_id, changes in released.items():
+        pricing.record_released(showing_id, len(changes))
+        seats.publish_changes(showing_id, changes)
+    schedule.invalidate()
+
+
+def seat(ticket):
+    """Returns (showing_id, row_number, seat_number) of the ticket"""
+    return ticket.showing_id, ticket.row_number, ticket.seat_number
+
+
+def released(ticket):
+    """Returns tuple of the ticket record_released() takes"""
+    return ticket.showing_id, ticket.date_time, ticket.row_number, ticket.seat_number
@@ -13,8 +13,16 @@ urlpatterns = [
     path('movies/', views.MoviesListView.as_view(), name='movie-list'),
     path('movies/<int:pk>/', views.MoviesDetail.as_view(), name='movie-detail'),
     path('showings/', views.ShowingsListView.as_view(), name='showing-list'),
+    path('showings/export.ndjson', views.ShowingsExport.as_view(), name='showing-export'),
     path('showings/<int:pk>/', views.ShowingsDetail.as_view(), name='showing-detail'),
+    path('showings/<int:pk>/seats/', views.ShowingSeats.as_view(), name='showing-seats'),
+    path('showings/<int:pk>/seats/stream', views.showing_seats_stream,
+         name='showing-seats-stream'),
+    path('schedule/', views.Schedule.as_view(), name='schedule'),
     path('tickets/', views.TicketsListView.as_view(), name='ticket-list'),
+    path('tickets/export.csv', views.TicketsExport.as_view(), name='ticket-export'),
     path('tickets/<int:pk>/', views.TicketsDetail.as_view(), name='ticket-detail'),
     path('tickets/<int:pk>/pay/', views.PayForTicket.as_view(), name='pay'),
+    path('reports/occupancy/', views.OccupancyReport.as_view(), name='report-occupancy'),
+    path('reports/revenue/', views.RevenueReport.as_view(), name='report-revenue'),
 ]
@@ -2,21 +2,44 @@
 Booking app views module
 """
 import datetime
+import hashlib
 import uuid
 
 import django_filters
+from django.conf import settings
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
 from django.db.models import ProtectedError
+from django.http import HttpResponse, StreamingHttpResponse, Http404
+from django.utils import timezone
+from django.views.decorators.http import require_safe
 from rest_framework import status
 from rest_framework.decorators import api_view
-from rest_framework.generics import ListCreateAPIView, RetrieveUpdateDestroyAPIView, UpdateAPIView
+from rest_framework.exceptions import ValidationError
+from rest_framework.generics import ListCreateAPIView, RetrieveUpdateDestroyAPIView, \
+    UpdateAPIView, GenericAPIView, ListAPIView
 from rest_framework.permissions import IsAuthenticated, AllowAny, IsAdminUser
 from rest_framework.response import Response
 from rest_framework.reverse import reverse
-
+from rest_framework.settings import api_settings
+from rest_framework.validators import UniqueTogetherValidator
+
+from booking import compiled
+from booking import export
+from booking import filters
+from booking import outbox
+from booking import pricing
+from booking import reports
+from booking import schedule
+from booking import seats
 from booking import serializers
+from booking import tickets
 from booking import models
+from booking.metrics import SEAT_BOOKINGS, PAY_TICKET_QUEUE_DEPTH
+from booking.profiling import current_profile
 from booking.serializers import TicketSerializer
-from booking.tasks import pay_ticket
+from tools import compression
+from tools.metrics import record_cache_lookup
 
 
 @api_view(['GET'])
@@ -32,6 +55,10 @@ def api_root(request, format_=None):
         'movies': reverse('movie-list', request=request, format=format_),
         'showings': reverse('showing-list', request=request, format=format_),
         'tickets': reverse('ticket-list', request=request, format=format_),
+        'tickets/export.csv': reverse('ticket-export', request=request),
+        'showings/export.ndjson': reverse('showing-export', request=request),
+        'reports/occupancy': reverse('report-occupancy', request=request, format=format_),
+        'reports/revenue': reverse('report-revenue', request=request, format=format_),
         # 'pay/<int:pk>': reverse('pay', request=request, format=format_),
     })
 
@@ -101,6 +128,65 @@ class ProtectedErrorOnDeleteMixin:  # pylint: disable=too-few-public-methods
             return Response(data=str(ex), status=status.HTTP_423_LOCKED)
 
 
+class CachedResponseMixin:  # pylint: disable=too-few-public-methods
+    """
+    APIView mixin caches successful GET responses data by full request path
+
+    Cache name (used in metrics) and timeout are defined by 'cache_name' and 'cache_timeout'
+    attributes. Compressed bodies of the responses are cached for the same time by path and
+    media type and are returned without rendering the data (see tools.compression).
+    """
+    cache_name = 'default'
+    cache_timeout = None
+
+    def get(self, request, *args, **kwargs):
+        """
+        Overrides get() method: returns cached compressed body or cached data if any
+        """
+        key = f'{self.cache_name}:' + hashlib.md5(request.get_full_path().encode()).hexdigest()
+        compressed_key = f'{key}:{request.accepted_media_type}'
+        response = compression.cached_response(request, compressed_key)
+        if response is not None:
+            return response
+
+        data = cache.get(key)
+        record_cache_lookup(self.cache_name, data is not None)
+        if data is not None:
+            response = Response(data)
+        else:
+            response = super().get(request, *args, **kwargs)
+            if response.status_code != status.HTTP_200_OK:
+                return response
+            cache.set(key, response.data, self.cache_timeout)
+        response.compressed_cache_key = compressed_key
+        response.compressed_cache_timeout = self.cache_timeout
+        return response
+
+
+class CompiledListMixin:  # pylint: disable=too-few-public-methods
+    """
+    ListAPIView mixin represents pages by the compiled serializer (see booking.compiled)
+
+    Rows of the page are read by values_list() and represented without serializer instances.
+    Profiled requests and serializers which are not compiled are served as usual.
+    """
+
+    def list(self, request, *args, **kwargs):
+        """
+        Overrides list() method: represents page rows by the compiled serializer
+        """
+        compiled_serializer = None if current_profile() else \
+            compiled.compile_serializer(self.get_serializer())
+        if compiled_serializer is None:
+            return super().list(request, *args, **kwargs)
+        rows = self.filter_queryset(self.get_queryset()) \
+            .values_list(*compiled_serializer.columns)
+        page = self.paginate_queryset(rows)
+        if page is None:
+            return Response(compiled_serializer.represent(rows))
+        return self.get_paginated_response(compiled_serializer.represent(page))
+
+
 class CustomUserList(FilterByUserMixin, ListCreateAPIView):
     """
     Represent users list
@@ -163,7 +249,9 @@ class HallsList(PermissionSelectorMixin, ListCreateAPIView):
     serializer_class = serializers.HallSerializer
     permission_classes = [AllowAny]
     queryset = models.Hall.objects.all()
-    filter_backends = [django_filters.rest_framework.DjangoFilterBackend]
+    replica_reads = True
+    filter_backends = [django_filters.rest_framework.DjangoFilterBackend,
+                       filters.SparseFieldsFilter]
     filterset_fields = ['name', ]
 
     permission_classes_by_method = {
@@ -182,6 +270,8 @@ class HallsDetail(ProtectedErrorOnDeleteMixin, PermissionSelectorMixin,
     serializer_class = serializers.HallSerializer
     permission_classes = [AllowAny]
     queryset = models.Hall.objects.all()
+    replica_reads = True
+    filter_backends = [filters.SparseFieldsFilter]
 
     permission_classes_by_method = {
         'PUT': (IsAdminUser,),
@@ -200,7 +290,9 @@ class MoviesListView(PermissionSelectorMixin, ListCreateAPIView):
     serializer_class = serializers.MovieSerializer
     permission_classes = [AllowAny]
     queryset = models.Movie.objects.all()
-    filter_backends = [django_filters.rest_framework.DjangoFilterBackend]
+    replica_reads = True
+    filter_backends = [django_filters.rest_framework.DjangoFilterBackend,
+                       filters.MovieSearchFilter, filters.SparseFieldsFilter]
     filterset_fields = ['name', 'duration', 'premiere_year']
 
     permission_classes_by_method = {
@@ -219,6 +311,8 @@ class MoviesDetail(ProtectedErrorOnDeleteMixin, PermissionSelectorMixin,
     serializer_class = serializers.MovieSerializer
     permission_classes = [AllowAny]
     queryset = models.Movie.objects.all()
+    replica_reads = True
+    filter_backends = [filters.SparseFieldsFilter]
 
     permission_classes_by_method = {
         'PUT': (IsAdminUser,),
@@ -227,7 +321,7 @@ class MoviesDetail(ProtectedErrorOnDeleteMixin, PermissionSelectorMixin,
     }
 
 
-class ShowingsListView(PermissionSelectorMixin, ListCreateAPIView):
+class ShowingsListView(CompiledListMixin, PermissionSelectorMixin, ListCreateAPIView):
     """
     Represents showings list
 
@@ -237,7 +331,9 @@ class ShowingsListView(PermissionSelectorMixin, ListCreateAPIView):
     serializer_class = serializers.ShowingSerializer
     permission_classes = [AllowAny]
     queryset = models.Showing.objects.all()
-    filter_backends = [django_filters.rest_framework.DjangoFilterBackend]
+    replica_reads = True
+    filter_backends = [django_filters.rest_framework.DjangoFilterBackend,
+                       filters.SparseFieldsFilter]
     filterset_fields = ['hall', 'movie', 'date_time', 'price']
 
     permission_classes_by_method = {
@@ -256,6 +352,8 @@ class ShowingsDetail(ProtectedErrorOnDeleteMixin, PermissionSelectorMixin,
     serializer_class = serializers.ShowingSerializer
     permission_classes = [AllowAny]
     queryset = models.Showing.objects.all()
+    replica_reads = True
+    filter_backends = [filters.SparseFieldsFilter]
 
     permission_classes_by_method = {
         'PUT': (IsAdminUser,),
@@ -264,7 +362,75 @@ class ShowingsDetail(ProtectedErrorOnDeleteMixin, PermissionSelectorMixin,
     }
 
 
-class TicketsListView(FilterByUserMixin, ListCreateAPIView):
+class ShowingSeats(GenericAPIView):
+    """
+    Represents showing seats availability
+
+    Public url allows anyone to view hall size and taken seats of a showing.
+    Served natively by the ASGI application (booking.asgi), this view is used by WSGI.
+    Seats are read from the primary database, lagging replicas would show booked seats as free.
+    """
+    serializer_class = serializers.SeatMapSerializer
+    permission_classes = [AllowAny]
+    queryset = models.Showing.objects.all()
+
+    def get(self, request, *args, **kwargs):  # pylint: disable=unused-argument
+        """Returns seat map of the showing"""
+        try:
+            return Response(seats.seat_map(kwargs['pk']))
+        except models.Showing.DoesNotExist:
+            raise Http404
+
+
+@require_safe
+def showing_seats_stream(request, pk):  # pylint: disable=unused-argument
+    """
+    Represents seat changes stream of a showing
+
+    Streamed natively by the ASGI application (booking.asgi). WSGI servers (runserver, gunicorn
+    sync workers) can not hold streams: this view sends the 'snapshot' event and closes the
+    stream, so EventSource clients reconnect in STREAM_RETRY milliseconds, polling the seat map.
+    """
+    try:
+        data = seats.seat_map(pk)
+    except models.Showing.DoesNotExist:
+        raise Http404
+    content = f'retry: {seats.STREAM_RETRY}\n\n'.encode() + seats.snapshot_event(data)
+    response = HttpResponse(content, content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    return response
+
+
+class Schedule(GenericAPIView):
+    """
+    Represents schedule of a day
+
+    Public url allows anyone to view showings of the day (date=YYYY-MM-DD, today by default)
+    grouped by movie with movie and hall summaries and seats left.
+    """
+    serializer_class = serializers.ScheduleSerializer
+    permission_classes = [AllowAny]
+    queryset = models.Showing.objects.all()
+
+    def get(self, request, *args, **kwargs):  # pylint: disable=unused-argument
+        """Returns schedule of the day"""
+        date = request.query_params.get('date')
+        try:
+            day = datetime.date.fromisoformat(date) if date else timezone.localdate()
+        except ValueError:
+            raise ValidationError({'date': ['Should be YYYY-MM-DD']})
+        key = schedule.cache_key(day)
+        compressed_key = f'{key}:{request.accepted_media_type}'
+        response = compression.cached_response(request, compressed_key)
+        if response is not None:
+            return response
+        response = Response(schedule.schedule(day, key))
+        response.compressed_cache_key = compressed_key
+        response.compressed_cache_timeout = settings.CINEMA_SCHEDULE_CACHE_SECONDS
+        return response
+
+
+class TicketsListView(CompiledListMixin, FilterByUserMixin, ListCreateAPIView):
     """
     Represents tickets list
 
@@ -274,7 +440,9 @@ class TicketsListView(FilterByUserMixin, ListCreateAPIView):
     serializer_class = serializers.TicketSerializer
     permission_classes = [IsAuthenticated]
     queryset = models.Ticket.objects.all()
-    filter_backends = [django_filters.rest_framework.DjangoFilterBackend]
+    replica_reads = True
+    filter_backends = [django_filters.rest_framework.DjangoFilterBackend,
+                       filters.SparseFieldsFilter]
     filterset_fields = ['user', 'showing', 'date_time', 'row_number', 'seat_number']
     user_field = 'user'
 
@@ -294,11 +462,33 @@ class TicketsListView(FilterByUserMixin, ListCreateAPIView):
         data['date_time'] = date_time
 
         serializer = self.get_serializer(data=data)
-        serializer.is_valid(raise_exception=True)
-        self.perform_create(serializer)
+        try:
+            serializer.is_valid(raise_exception=True)
+        except ValidationError as ex:
+            codes = ex.get_codes()
+            if isinstance(codes, dict) and \
+                    'unique' in codes.get(api_settings.NON_FIELD_ERRORS_KEY, []):
+                SEAT_BOOKINGS.inc(result='conflict')
+            raise
+        try:
+            with transaction.atomic():
+                self.perform_create(serializer)
+                tickets.record_booked(serializer.instance)
+        except IntegrityError:
+            # The seat was booked by a concurrent request after validation
+            SEAT_BOOKINGS.inc(result='conflict')
+            field_names = ', '.join(models.Ticket._meta.unique_together[0])
+            message = UniqueTogetherValidator.message.format(field_names=field_names)
+            raise ValidationError({api_settings.NON_FIELD_ERRORS_KEY: [message]}, code='unique')
+        SEAT_BOOKINGS.inc(result='success')
         headers = self.get_success_headers(serializer.data)
         return Response(serializer.data, status=status.HTTP_201_CREATED, headers=headers)
 
+    def perform_create(self, serializer):
+        """Saves ticket with the current price of the seat"""
+        data = serializer.validated_data
+        serializer.save(price=pricing.quote(data['showing'], data['row_number']))
+
 
 class TicketsDetail(FilterByUserMixin, RetrieveUpdateDestroyAPIView):
     """
@@ -310,13 +500,35 @@ class TicketsDetail(FilterByUserMixin, RetrieveUpdateDestroyAPIView):
     serializer_class = serializers.TicketSerializer
     permission_classes = [IsAuthenticated]
     queryset = models.Ticket.objects.all()
+    filter_backends = [filters.SparseFieldsFilter]
     user_field = 'user'
 
+    def perform_update(self, serializer):
+        """
+        Moves ticket to the given seat: unpaid tickets are quoted at the new seat, paid ones
+        keep their price, occupancy and rollup rows follow the ticket to its showing
+        """
+        ticket = serializer.instance
+        before = tickets.seat(ticket)
+        data = serializer.validated_data
+        showing = data.get('showing', ticket.showing)
+        row_number = data.get('row_number', ticket.row_number)
+        with transaction.atomic():
+            if (showing.pk, row_number, data.get('seat_number', ticket.seat_number)) == before:
+                serializer.save()
+                return
+            price = tickets.moved_price(ticket, showing, row_number)
+            serializer.save(price=price)
+            tickets.record_moved(ticket, before, price)
+
     def delete(self, request, *args, **kwargs):
         ticket = self.get_object()
         if ticket.receipt:
             return Response(data='Paid ticket cannot be removed', status=status.HTTP_423_LOCKED)
-        return super(TicketsDetail, self).delete(request, *args, **kwargs)
+        with transaction.atomic():
+            response = super(TicketsDetail, self).delete(request, *args, **kwargs)
+            tickets.record_released([tickets.released(ticket)])
+        return response
 
 
 class PayForTicket(FilterByUserMixin, UpdateAPIView):
@@ -335,8 +547,97 @@ class PayForTicket(FilterByUserMixin, UpdateAPIView):
                             status=status.HTTP_400_BAD_REQUEST)
 
         payment_uuid = uuid.uuid4()
-        pay_ticket.delay(pk=instance.pk, payment_uuid=payment_uuid)
+        with transaction.atomic():
+            outbox.send_task('booking.tasks.pay_ticket', pk=instance.pk,
+                             payment_uuid=str(payment_uuid))
+        PAY_TICKET_QUEUE_DEPTH.inc()
         data = {
             'receipt': payment_uuid
         }
         return Response(data=data, status=status.HTTP_200_OK)
+
+
+class TicketsExport(GenericAPIView):
+    """
+    Streams tickets as CSV
+
+    Url allows admins to export all tickets filtered by booking time range
+    (date_time_after, date_time_before), showing and user.
+    """
+    serializer_class = serializers.TicketSerializer
+    permission_classes = [IsAdminUser]
+    queryset = models.Ticket.objects.all()
+    filter_backends = [django_filters.rest_framework.DjangoFilterBackend]
+    filterset_class = filters.TicketDateRangeFilter
+
+    def get(self, request, *args, **kwargs):  # pylint: disable=unused-argument
+        """Returns streaming CSV response"""
+        queryset = self.filter_queryset(self.get_queryset())
+        response = StreamingHttpResponse(export.tickets_csv(queryset),
+                                         content_type='text/csv; charset=utf-8')
+        response['Content-Disposition'] = 'attachment; filename="tickets.csv"'
+        return response
+
+
+class ShowingsExport(GenericAPIView):
+    """
+    Streams showings as newline delimited JSON
+
+    Url allows admins to export all showings filtered by showing time range
+    (date_time_after, date_time_before), hall and movie.
+    """
+    serializer_class = serializers.ShowingSerializer
+    permission_classes = [IsAdminUser]
+    queryset = models.Showing.objects.all()
+    filter_backends = [django_filters.rest_framework.DjangoFilterBackend]
+    filterset_class = filters.ShowingDateRangeFilter
+
+    def get(self, request, *args, **kwargs):  # pylint: disable=unused-argument
+        """Returns streaming NDJSON response"""
+        queryset = self.filter_queryset(self.get_queryset())
+        return StreamingHttpResponse(export.showings_ndjson(queryset),
+                                     content_type='application/x-ndjson')
+
+
+class OccupancyReport(CachedResponseMixin, ListAPIView):
+    """
+    Represents showings occupancy report
+
+    Url allows admins to view capacity, sold (paid), held (booked, not paid) and free seats
+    of showings filtered by showing time range (date_time_after, date_time_before), hall and
+    movie.
+    """
+    serializer_class = serializers.OccupancyReportSerializer
+    permission_classes = [IsAdminUser]
+    queryset = models.Showing.objects.all()
+    filter_backends = [django_filters.rest_framework.DjangoFilterBackend]
+    filterset_class = filters.ShowingDateRangeFilter
+    cache_name = 'reports'
+    cache_timeout = settings.CINEMA_REPORTS_CACHE_SECONDS
+
+    def filter_queryset(self, queryset):
+        return reports.occupancy(super().filter_queryset(queryset))
+
+
+class RevenueReport(CachedResponseMixin, ListAPIView):
+    """
+    Represents revenue report
+
+    Url allows admins to view paid tickets count and revenue of showings filtered by showing
+    time range (date_time_after, date_time_before), hall and movie, and grouped by
+    group_by=[movie|hall|day|week|month] (movie by default).
+    """
+    serializer_class = serializers.RevenueReportSerializer
+    permission_classes = [IsAdminUser]
+    queryset = models.Showing.objects.all()
+    filter_backends = [django_filters.rest_framework.DjangoFilterBackend]
+    filterset_class = filters.ShowingDateRangeFilter
+    pagination_class = None
+    cache_name = 'reports'
+    cache_timeout = settings.CINEMA_REPORTS_CACHE_SECONDS
+
+    def filter_queryset(self, queryset):
+        group_by = self.request.query_params.get('group_by', 'movie')
+        if group_by not in reports.REVENUE_GROUPS:
+            raise ValidationError({'group_by': [f'Should be one of {reports.REVENUE_GROUPS}']})
+        return reports.revenue(super().filter_queryset(queryset), group_by)
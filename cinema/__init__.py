@@ -1,7 +1,13 @@
 from __future__ import absolute_import
 
-# This will make sure the app is always imported when
-# Django starts so that shared_task will use this app.
-from .celery import app as celery_app
+# celery_app is provided by module __getattr__
+__all__ = ('celery_app', )  # pylint: disable=undefined-all-variable
 
-__all__ = ('celery_app', )
+
+def __getattr__(name):
+    # The Celery app is imported on first use, web processes start without Celery. Tasks
+    # modules import it (see booking/tasks.py), so shared_task uses this app.
+    if name == 'celery_app':
+        from .celery import app  # pylint: disable=import-outside-toplevel
+        return app
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
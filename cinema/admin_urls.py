@@ -0,0 +1,11 @@
+"""
+Admin URL configuration
+
+Imported on the first admin request or reverse() of an admin url (see cinema/urls.py), so
+admin modules of the apps are not imported by processes which do not serve the admin.
+"""
+from django.contrib import admin
+
+admin.autodiscover()
+
+urlpatterns = admin.site.get_urls()
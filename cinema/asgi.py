@@ -0,0 +1,26 @@
+"""
+ASGI config for cinema project.
+
+It exposes the ASGI callable as a module-level variable named ``application``.
+Run it with ``uvicorn cinema.asgi:application``.
+
+Urls of booking.asgi.ROUTES are served by native async handlers, the rest by the WSGI
+application in a thread pool (see tools.asgi).
+"""
+
+import os
+
+from django.core.wsgi import get_wsgi_application
+
+from tools import db_pool
+from tools.asgi import AsgiHandler
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'cinema.settings')
+
+wsgi_application = get_wsgi_application()
+
+db_pool.install()
+
+from booking.asgi import ROUTES  # noqa: E402 pylint: disable=wrong-import-position
+
+application = AsgiHandler(wsgi_application, ROUTES)
@@ -1,7 +1,14 @@
 from __future__ import absolute_import
+import importlib
 import os
-from celery import Celery
+import sys
+from celery import Celery, signals
+from celery.schedules import crontab
 from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+
+from booking import task_metrics
+from tools import db_pool
 
 # set the default Django settings module for the 'celery' program.
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'cinema.settings')
@@ -10,4 +17,90 @@ app = Celery('cinema')
 # Using a string here means the worker will not have to
 # pickle the object when using Windows.
 app.config_from_object('django.conf:settings', namespace='CELERY')
-app.autodiscover_tasks(lambda: settings.INSTALLED_APPS)
+# Task modules of app configs ('booking.apps.BookingConfig') are found by their app names
+app.autodiscover_tasks()
+db_pool.install_worker()
+task_metrics.install()
+
+CHECKED_TASK_MODULES = ['booking.tasks']
+
+
+def misrouted_tasks():
+    """
+    Returns problems of tasks routing: tasks of CHECKED_TASK_MODULES that are not routed to
+    the queue of CINEMA_CELERY_QUEUES listing them and listed tasks that are not registered
+    """
+    for module in CHECKED_TASK_MODULES:
+        importlib.import_module(module)
+    intended = {task: queue for queue, options in settings.CINEMA_CELERY_QUEUES.items()
+                for task in options['tasks']}
+    problems = [f'{task} is routed to {queue} queue, but it is not registered'
+                for task, queue in intended.items() if task not in app.tasks]
+    for task in sorted(app.tasks):
+        if task.rpartition('.')[0] not in CHECKED_TASK_MODULES:
+            continue
+        queue = app.amqp.router.route({}, task)['queue'].name
+        if queue != intended.get(task):
+            problems.append(f'{task} is routed to {queue} queue instead of '
+                            f'{intended.get(task) or "one of CINEMA_CELERY_QUEUES"}')
+    return problems
+
+
+def worker_queues(argv):
+    """Returns queues consumed by `celery worker` command"""
+    if 'worker' not in argv:
+        return []
+    for index, arg in enumerate(argv):
+        if arg in ('-Q', '--queues') and index + 1 < len(argv):
+            value = argv[index + 1]
+        elif arg.startswith('--queues='):
+            value = arg.split('=', 1)[1]
+        elif arg.startswith('-Q') and len(arg) > 2:
+            value = arg[2:]
+        else:
+            continue
+        return [queue for queue in value.split(',') if queue]
+    return []
+
+
+def beat_schedule():
+    """Returns Celery beat schedule of CINEMA_BEAT_SCHEDULE"""
+    return {name: {'task': entry['task'], 'schedule': crontab(**entry['crontab'])}
+            for name, entry in settings.CINEMA_BEAT_SCHEDULE.items()}
+
+
+def apply_queue_settings(conf, queues):
+    """Sets concurrency and prefetch multiplier of the worker consuming one configured queue"""
+    if len(queues) == 1 and queues[0] in settings.CINEMA_CELERY_QUEUES:
+        queue = settings.CINEMA_CELERY_QUEUES[queues[0]]
+        for key, value in (('worker_concurrency', queue['concurrency']),
+                           ('worker_prefetch_multiplier', queue['prefetch_multiplier'])):
+            conf[key] = value
+            # Namespaced keys loaded from Django settings are looked up first
+            if conf.prefix:
+                conf[conf.prefix + key.upper()] = value
+
+
+@app.on_after_configure.connect
+def configure_worker(sender=None, **kwargs):  # pylint: disable=unused-argument
+    """
+    Applies settings of the queue consumed by the worker
+
+    Worker command line options default to the configuration, so it is changed as soon as
+    it is loaded, before the options are parsed. Explicit -c and --prefetch-multiplier win.
+    """
+    apply_queue_settings(sender.conf, worker_queues(sys.argv))
+
+
+@app.on_after_configure.connect
+def configure_beat(sender=None, **kwargs):  # pylint: disable=unused-argument
+    """Sets beat schedule"""
+    sender.conf.beat_schedule = beat_schedule()
+
+
+@signals.celeryd_init.connect
+def check_routes(**kwargs):  # pylint: disable=unused-argument
+    """Stops worker when tasks routing is broken"""
+    problems = misrouted_tasks()
+    if problems:
+        raise ImproperlyConfigured('Celery tasks routing: ' + '; '.join(problems))
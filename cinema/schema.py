@@ -0,0 +1,34 @@
+"""
+OpenAPI schema views of the API
+
+Imported on the first schema request (see cinema/urls.py), so processes start without
+drf_yasg views, generators and renderers.
+"""
+from drf_yasg import openapi
+from drf_yasg.views import get_schema_view
+from rest_framework import permissions
+
+from cinema.urls import documented_url_patterns
+from tools.schema import SchemaDocuments, cached_schema_view
+
+schema_info = openapi.Info(
+    title="Cinema API",
+    default_version='v1',
+    description="Example Django REST API"
+)
+
+schema_view = get_schema_view(
+    schema_info,
+    public=True,
+    permission_classes=(permissions.AllowAny,),
+    patterns=documented_url_patterns
+)
+
+# Schema documents rendered once, see generate_schema management command
+schema_documents = SchemaDocuments(
+    schema_view.generator_class(schema_info, url='', patterns=documented_url_patterns))
+schema_view = cached_schema_view(schema_view, schema_documents)
+
+json_view = schema_view.without_ui()
+swagger_view = schema_view.with_ui('swagger')
+redoc_view = schema_view.with_ui('redoc')
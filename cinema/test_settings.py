@@ -0,0 +1,45 @@
+"""
+Django settings for running tests
+
+In-memory SQLite database, fast password hashing, in-process broker, pub/sub and cache, so
+tests need no services and test processes share nothing:
+
+    python manage.py test --settings=cinema.test_settings --parallel
+"""
+import tempfile
+
+# pylint: disable=wildcard-import,unused-wildcard-import
+from cinema.settings import *  # noqa: F401,F403
+
+SECRET_KEY = os.environ.get('DJANGO_SECRET_KEY') or 'test'  # noqa: F405
+
+DATABASES = {
+    'default': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': ':memory:',
+    },
+}
+# Replica alias of the same database for routing tests, reads go to it only when a test
+# sets DATABASE_REPLICAS
+DATABASES['replica'] = dict(DATABASES['default'], TEST={'MIRROR': 'default'})
+DATABASE_REPLICAS = []
+
+# The default PBKDF2 hasher takes most of the time of creating and authenticating users
+PASSWORD_HASHERS = ['django.contrib.auth.hashers.MD5PasswordHasher']
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+}
+
+CELERY_BROKER_URL = 'memory://'
+CELERY_RESULT_BACKEND = 'cache+memory://'
+CINEMA_PUBSUB_BACKEND = 'tools.pubsub.MemoryBackend'
+
+# Metrics files of the test run are not mixed with files of other runs, tests reading metrics
+# set a directory of their own in setUp, so workers of --parallel do not sum up each other
+CINEMA_METRICS_DIR = tempfile.mkdtemp(prefix='cinema_test_metrics_')
+
+# Schema documents are rendered by the tests, not read from files of generate_schema command
+CINEMA_SCHEMA_DIR = tempfile.mkdtemp(prefix='cinema_test_schema_')
@@ -14,14 +14,20 @@ Including another URLconf
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
 from django.conf.urls import url
-from django.contrib import admin
+from django.contrib.staticfiles.urls import staticfiles_urlpatterns
 from django.urls import path, include
-from drf_yasg import openapi
-from drf_yasg.views import get_schema_view
-from rest_framework import permissions
+from django.utils.module_loading import import_string
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
 
 from booking import views
+from tools.metrics import metrics_view
+
+
+def lazy_view(dotted_path):
+    """Returns view calling the view of the dotted path, which is imported on the first request"""
+    def view(request, *args, **kwargs):
+        return import_string(dotted_path)(request, *args, **kwargs)
+    return view
 
 
 documented_url_patterns = [
@@ -30,22 +36,17 @@ documented_url_patterns = [
     url('token/refresh/', TokenRefreshView.as_view(), name='token-refresh'),
 ]
 
-schema_view = get_schema_view(
-    openapi.Info(
-        title="Cinema API",
-        default_version='v1',
-        description="Example Django REST API"
-    ),
-    public=True,
-    permission_classes=(permissions.AllowAny,),
-    patterns=documented_url_patterns
-)
-
 urlpatterns = documented_url_patterns + [
     path('', views.api_root),
-    path('admin/', admin.site.urls, name='admin'),
+    # Admin url conf is imported on first use, same as schema views (see cinema/schema.py)
+    path('admin/', ('cinema.admin_urls', 'admin', 'admin')),
+    path('metrics', metrics_view, name='metrics'),
 
-    url(r'^swagger(?P<format>\.json|\.yaml)$', schema_view.without_ui(cache_timeout=0), name='schema-json'),
-    url(r'^swagger/$', schema_view.with_ui('swagger', cache_timeout=0), name='schema-swagger-ui'),
-    url(r'^redoc/$', schema_view.with_ui('redoc', cache_timeout=0), name='schema-redoc'),
+    url(r'^swagger(?P<format>\.json|\.yaml)$', lazy_view('cinema.schema.json_view'),
+        name='schema-json'),
+    url(r'^swagger/$', lazy_view('cinema.schema.swagger_view'), name='schema-swagger-ui'),
+    url(r'^redoc/$', lazy_view('cinema.schema.redoc_view'), name='schema-redoc'),
 ]
+
+# Admin static files with DEBUG, gunicorn does not serve them as runserver did
+urlpatterns += staticfiles_urlpatterns()
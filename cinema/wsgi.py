@@ -11,6 +11,10 @@ import os
 
 from django.core.wsgi import get_wsgi_application
 
+from tools import db_pool
+
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'cinema.settings')
 
 application = get_wsgi_application()
+
+db_pool.install()
@@ -0,0 +1,137 @@
+"""
+ASGI module
+
+AsgiHandler serves some urls with native async handlers and passes the rest to the WSGI
+application. Request bodies are read and responses are sent by the event loop, so slow
+clients hold only a socket; views run in the default executor (ASGI_THREADS threads,
+each keeping its own database connections, see tools.db_pool).
+
+Native routes do not pass Django middleware. AsgiHandler applies the security-relevant part
+of it to them: Host is validated by ALLOWED_HOSTS, SecurityMiddleware (SSL redirect, HSTS and
+other headers) and XFrameOptionsMiddleware are applied, and request latency is observed by
+route name up to the start of the response, as RequestMetricsMiddleware does for views.
+Native routes skip the rest on purpose: they are public (no sessions, authentication or CSRF),
+read the primary database (no replica routing), send small or streamed responses (no
+compression) and are not profiled.
+"""
+import json
+import re
+import time
+
+from asgiref.wsgi import WsgiToAsgi
+from django.core.exceptions import DisallowedHost
+from django.http import HttpRequest, HttpResponse, HttpResponseBadRequest
+from django.middleware.clickjacking import XFrameOptionsMiddleware
+from django.middleware.security import SecurityMiddleware
+
+from tools.metrics import REGISTRY, REQUEST_LATENCY
+
+
+async def send_json(send, status, data, head=False):
+    """Sends JSON response rendered as by rest_framework.renderers.JSONRenderer"""
+    body = json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode()
+    await send({
+        'type': 'http.response.start',
+        'status': status,
+        'headers': [(b'content-type', b'application/json'),
+                    (b'content-length', str(len(body)).encode())],
+    })
+    await send({'type': 'http.response.body', 'body': b'' if head else body})
+
+
+async def send_response(send, response):
+    """Sends Django response with content"""
+    await send({
+        'type': 'http.response.start',
+        'status': response.status_code,
+        'headers': [(name.lower().encode('latin1'), value.encode('latin1'))
+                    for name, value in response.items()],
+    })
+    await send({'type': 'http.response.body', 'body': response.content})
+
+
+class ScopeRequest(HttpRequest):
+    """Django request of ASGI scope, without body, for middleware and host validation"""
+
+    def __init__(self, scope):
+        super().__init__()
+        self.method = scope['method']
+        self.path = self.path_info = scope['path']
+        self._scope_scheme = scope.get('scheme', 'http')
+        server_name, server_port = scope.get('server') or ('localhost', 80)
+        self.META.update(SERVER_NAME=server_name, SERVER_PORT=str(server_port),
+                         QUERY_STRING=scope.get('query_string', b'').decode('latin1'))
+        for name, value in scope.get('headers', []):
+            name = name.decode('latin1').upper().replace('-', '_')
+            self.META[f'HTTP_{name}'] = value.decode('latin1')
+
+    def _get_scheme(self):
+        return self._scope_scheme
+
+
+class AsgiHandler:
+    """
+    ASGI application with native async routes
+
+    routes are (regex, handler, name) triples, handlers are called as
+    handler(scope, receive, send, **named_groups) for GET and HEAD requests, name labels
+    their latency.
+    """
+
+    def __init__(self, wsgi_application, routes=()):
+        self.wsgi = WsgiToAsgi(wsgi_application)
+        self.routes = [(re.compile(pattern), handler, name) for pattern, handler, name in routes]
+        self.security = SecurityMiddleware()
+        self.xframe = XFrameOptionsMiddleware()
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await self._lifespan(receive, send)
+            return
+        if scope['type'] == 'http' and scope['method'] in ('GET', 'HEAD'):
+            for pattern, handler, name in self.routes:
+                match = pattern.fullmatch(scope['path'])
+                if match:
+                    await self._native(handler, name, scope, receive, send, match.groupdict())
+                    return
+        await self.wsgi(scope, receive, send)
+
+    async def _native(self, handler, name, scope, receive, send, kwargs):
+        # pylint: disable=too-many-arguments
+        start = time.perf_counter()
+        request = ScopeRequest(scope)
+        try:
+            request.get_host()
+        except DisallowedHost:
+            await send_response(send, HttpResponseBadRequest())
+            return
+        redirect = self.security.process_request(request)
+        if redirect is not None:
+            await send_response(send, redirect)
+            return
+        headers = self.xframe.process_response(
+            request, self.security.process_response(request, HttpResponse()))
+        headers = [(header.lower().encode('latin1'), value.encode('latin1'))
+                   for header, value in headers.items() if header.lower() != 'content-type']
+
+        async def send_secured(message):
+            if message['type'] == 'http.response.start':
+                names = {header for header, _ in message['headers']}
+                message = dict(message, headers=message['headers'] + [
+                    (header, value) for header, value in headers if header not in names])
+                REQUEST_LATENCY.observe(time.perf_counter() - start, view=name,
+                                        method=scope['method'])
+                REGISTRY.flush()
+            await send(message)
+
+        await handler(scope, receive, send_secured, **kwargs)
+
+    @staticmethod
+    async def _lifespan(receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
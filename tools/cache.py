@@ -0,0 +1,126 @@
+"""
+Cache module
+
+Django 2.2 has no Redis cache backend, RedisCache stores entries of the cache in the Redis
+database given by LOCATION (redis://host:port/db), so all web, ASGI and Celery processes
+share them: invalidation of cached schedules and read-your-writes stickiness of the replica
+router are seen by every process. The database is used by the cache only, clear() flushes it.
+
+Integers are stored as is, so incr() is atomic, other values are pickled.
+"""
+import math
+import pickle
+
+import redis
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+
+# Increments existing keys only, as incr() of Django caches does
+_INCR_SCRIPT = """
+if redis.call('exists', KEYS[1]) == 0 then
+    return nil
+end
+return redis.call('incrby', KEYS[1], ARGV[1])
+"""
+
+
+class RedisCache(BaseCache):
+    """
+    Cache backend storing entries in Redis
+    """
+
+    def __init__(self, server, params):
+        super().__init__(params)
+        self._client = redis.Redis.from_url(server)
+        self._incr = self._client.register_script(_INCR_SCRIPT)
+
+    def _ttl(self, timeout):
+        """Returns entry time to live in whole seconds, None for entries that never expire"""
+        if timeout is DEFAULT_TIMEOUT:
+            timeout = self.default_timeout
+        return None if timeout is None else max(0, math.ceil(timeout))
+
+    @staticmethod
+    def _dumps(value):
+        if isinstance(value, int) and not isinstance(value, bool):
+            return str(value).encode()
+        return pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+
+    @staticmethod
+    def _loads(value):
+        try:
+            return int(value)
+        except ValueError:
+            return pickle.loads(value)
+
+    def _key(self, key, version):
+        key = self.make_key(key, version=version)
+        self.validate_key(key)
+        return key
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        ttl = self._ttl(timeout)
+        key = self._key(key, version)
+        if ttl == 0:
+            return not self._client.exists(key)
+        return bool(self._client.set(key, self._dumps(value), ex=ttl, nx=True))
+
+    def get(self, key, default=None, version=None):
+        value = self._client.get(self._key(key, version))
+        return default if value is None else self._loads(value)
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        ttl = self._ttl(timeout)
+        key = self._key(key, version)
+        if ttl == 0:
+            self._client.delete(key)
+        else:
+            self._client.set(key, self._dumps(value), ex=ttl)
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        ttl = self._ttl(timeout)
+        key = self._key(key, version)
+        if ttl is None:
+            return bool(self._client.persist(key) or self._client.exists(key))
+        if ttl == 0:
+            return bool(self._client.delete(key))
+        return bool(self._client.expire(key, ttl))
+
+    def delete(self, key, version=None):
+        return bool(self._client.delete(self._key(key, version)))
+
+    def get_many(self, keys, version=None):
+        keys = list(keys)
+        values = self._client.mget([self._key(key, version) for key in keys])
+        return {key: self._loads(value) for key, value in zip(keys, values) if value is not None}
+
+    def set_many(self, data, timeout=DEFAULT_TIMEOUT, version=None):
+        ttl = self._ttl(timeout)
+        with self._client.pipeline() as pipeline:
+            for key, value in data.items():
+                if ttl == 0:
+                    pipeline.delete(self._key(key, version))
+                else:
+                    pipeline.set(self._key(key, version), self._dumps(value), ex=ttl)
+            pipeline.execute()
+        return []
+
+    def delete_many(self, keys, version=None):
+        keys = [self._key(key, version) for key in keys]
+        if keys:
+            self._client.delete(*keys)
+
+    def has_key(self, key, version=None):
+        return bool(self._client.exists(self._key(key, version)))
+
+    def incr(self, key, delta=1, version=None):
+        value = self._incr(keys=[self._key(key, version)], args=[delta])
+        if value is None:
+            raise ValueError(f"Key '{key}' not found")
+        return value
+
+    def clear(self):
+        self._client.flushdb()
+
+    def close(self, **kwargs):
+        # Connections are pooled per process, as database connections are
+        pass
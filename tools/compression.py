@@ -0,0 +1,161 @@
+"""
+Compression module
+
+CompressionMiddleware compresses responses of settings.CINEMA_COMPRESSION_TYPES content types
+by brotli (when the brotli package is installed) or gzip, whichever the client prefers by
+Accept-Encoding. Responses shorter than settings.CINEMA_COMPRESSION_MIN_BYTES are sent as is,
+streaming responses are compressed chunk by chunk.
+
+Responses of cached data set 'compressed_cache_key' and 'compressed_cache_timeout' attributes
+(see booking.views.CachedResponseMixin): their compressed bodies are cached by that key and
+encoding for that time, so they are compressed once, at a higher level. Views answer later
+requests with cached_response() before the data is rendered.
+"""
+import re
+import zlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.utils.cache import patch_vary_headers
+
+from tools.metrics import record_cache_lookup
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Compression levels of responses and of cached compressed bodies by encoding
+LEVELS = {'br': 4, 'gzip': 6}
+CACHED_LEVELS = {'br': 9, 'gzip': 9}
+
+_GZIP_WBITS = 16 + zlib.MAX_WBITS
+
+
+def encodings():
+    """Returns supported encodings, preferred first"""
+    return ('br', 'gzip') if brotli is not None else ('gzip',)
+
+
+def _compressor(encoding, level):
+    """Returns (compress, flush, finish) functions of a new compressor"""
+    if encoding == 'br':
+        compressor = brotli.Compressor(quality=level)
+        return compressor.process, compressor.flush, compressor.finish
+    compressor = zlib.compressobj(level, zlib.DEFLATED, _GZIP_WBITS)
+    return compressor.compress, lambda: compressor.flush(zlib.Z_SYNC_FLUSH), compressor.flush
+
+
+def compress(content, encoding, level=None):
+    """Returns content compressed by the encoding"""
+    process, _, finish = _compressor(encoding, LEVELS[encoding] if level is None else level)
+    return process(content) + finish()
+
+
+def compress_sequence(sequence, encoding, level=None):
+    """Yields compressed chunks of the sequence, every chunk is flushed as soon as it is read"""
+    process, flush, finish = _compressor(encoding, LEVELS[encoding] if level is None else level)
+    for chunk in sequence:
+        data = process(chunk) + flush()
+        if data:
+            yield data
+    yield finish()
+
+
+def accepted_encoding(request):
+    """Returns supported encoding of the highest Accept-Encoding quality or None"""
+    qualities = {}
+    for item in request.META.get('HTTP_ACCEPT_ENCODING', '').split(','):
+        name, _, params = item.partition(';')
+        quality = 1.0
+        for param in params.split(';'):
+            key, _, value = param.partition('=')
+            if key.strip() == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        qualities[name.strip().lower()] = quality
+    best, best_quality = None, 0.0
+    for encoding in encodings():
+        quality = qualities.get(encoding, qualities.get('*', 0.0))
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+def _cache_key(key, encoding):
+    return f'compressed:{encoding}:{key}'
+
+
+def cached_response(request, key):
+    """
+    Returns response of the body cached for the key compressed by the encoding the request
+    accepts, None if it is not cached
+    """
+    encoding = accepted_encoding(request)
+    if encoding is None:
+        return None
+    entry = cache.get(_cache_key(key, encoding))
+    record_cache_lookup('compressed', entry is not None)
+    if entry is None:
+        return None
+    content_type, content = entry
+    response = HttpResponse(content, content_type=content_type)
+    response['Content-Encoding'] = encoding
+    response['Content-Length'] = str(len(content))
+    patch_vary_headers(response, ('Accept-Encoding',))
+    return response
+
+
+class CompressionMiddleware:  # pylint: disable=too-few-public-methods
+    """
+    Middleware compresses responses by brotli or gzip
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        content_type = response.get('Content-Type', '').split(';')[0].strip().lower()
+        if content_type not in settings.CINEMA_COMPRESSION_TYPES or \
+                response.has_header('Content-Encoding') or response.status_code == 206 or \
+                'no-transform' in response.get('Cache-Control', ''):
+            return response
+        patch_vary_headers(response, ('Accept-Encoding',))
+        encoding = accepted_encoding(request)
+        if encoding is None:
+            return response
+
+        if response.streaming:
+            response.streaming_content = compress_sequence(response.streaming_content, encoding)
+            if response.has_header('Content-Length'):
+                del response['Content-Length']
+        else:
+            if len(response.content) < settings.CINEMA_COMPRESSION_MIN_BYTES:
+                return response
+            if hasattr(response, 'compressed_cache_key'):
+                content = self._cache(response, encoding)
+            else:
+                content = compress(response.content, encoding)
+            if len(content) >= len(response.content):
+                return response
+            response.content = content
+            response['Content-Length'] = str(len(content))
+
+        # Compressed body differs byte by byte, same as Django's GZipMiddleware does
+        if response.has_header('ETag'):
+            response['ETag'] = re.sub(r'^"', 'W/"', response['ETag'])
+        response['Content-Encoding'] = encoding
+        return response
+
+    @staticmethod
+    def _cache(response, encoding):
+        # The view has looked the body up by cached_response() before rendering it
+        content = compress(response.content, encoding, CACHED_LEVELS[encoding])
+        if len(content) < len(response.content):
+            cache.set(_cache_key(response.compressed_cache_key, encoding),
+                      (response['Content-Type'], content), response.compressed_cache_timeout)
+        return content
@@ -0,0 +1,125 @@
+"""
+Database connections module
+
+Django keeps at most one connection per database alias in every thread, so a web worker
+thread or a Celery worker process is its own one-connection pool. By default Django closes it
+after each request and Celery closes it before and after each task, so every request and task
+pays for the connection setup. With settings.DATABASES[...]['CONN_MAX_AGE'] the connections
+are kept and the handlers below manage them instead:
+ - connections older than CONN_MAX_AGE or broken by an error are recycled
+ - connections idle longer than CINEMA_DB_HEALTH_CHECK_IDLE_SECONDS are pinged before reuse
+   (the server or a firewall may have dropped them)
+ - connections opened, reused and recycled are counted in /metrics
+
+install() replaces Django's request handlers, install_worker() connects Celery task handlers.
+"""
+import time
+
+from django.conf import settings
+from django.core import signals
+from django.db import close_old_connections, connections
+from django.db.backends.signals import connection_created
+
+from tools.metrics import REGISTRY
+
+CONNECTIONS_OPENED = REGISTRY.counter(
+    'cinema_db_connections_opened',
+    'Database connections opened',
+    labels=('alias',),
+)
+
+CONNECTIONS_REUSED = REGISTRY.counter(
+    'cinema_db_connections_reused',
+    'Requests and tasks served by an already open database connection',
+    labels=('alias',),
+)
+
+CONNECTIONS_RECYCLED = REGISTRY.counter(
+    'cinema_db_connections_recycled',
+    'Persistent database connections closed by reason (lifetime/unusable/health_check)',
+    labels=('alias', 'reason'),
+)
+
+
+def _recycle_reason(connection, health_check):
+    if connection.get_autocommit() != connection.settings_dict['AUTOCOMMIT']:
+        return 'unusable'
+    if connection.errors_occurred and not connection.is_usable():
+        return 'unusable'
+    connection.errors_occurred = False
+    if connection.close_at is not None and time.monotonic() >= connection.close_at:
+        return 'lifetime'
+    idle_since = getattr(connection, 'cinema_idle_since', None)
+    if health_check and idle_since is not None and \
+            time.monotonic() - idle_since > settings.CINEMA_DB_HEALTH_CHECK_IDLE_SECONDS and \
+            not connection.is_usable():
+        return 'health_check'
+    return None
+
+
+def _recycle(connection, health_check):
+    """Closes connection if it should not be used anymore, returns True if it was closed"""
+    reason = _recycle_reason(connection, health_check)
+    if reason is None:
+        return False
+    connection.close()
+    CONNECTIONS_RECYCLED.inc(alias=connection.alias, reason=reason)
+    return True
+
+
+def _open_connections():
+    return [connection for connection in connections.all()
+            if connection.connection is not None and not connection.in_atomic_block]
+
+
+def acquire_connections(**kwargs):  # pylint: disable=unused-argument
+    """Recycles or checks open connections before a request or a task"""
+    for connection in _open_connections():
+        if not _recycle(connection, health_check=True):
+            CONNECTIONS_REUSED.inc(alias=connection.alias)
+            connection.cinema_idle_since = None
+
+
+def release_connections(**kwargs):  # pylint: disable=unused-argument
+    """Recycles open connections after a request or a task and marks the rest as idle"""
+    for connection in _open_connections():
+        if not _recycle(connection, health_check=False):
+            connection.cinema_idle_since = time.monotonic()
+
+
+def _count_opened(sender, connection, **kwargs):  # pylint: disable=unused-argument
+    CONNECTIONS_OPENED.inc(alias=connection.alias)
+    connection.cinema_idle_since = None
+
+
+def install():
+    """Manages connections of web requests, replaces Django's close_old_connections"""
+    connection_created.connect(_count_opened, dispatch_uid='cinema_db_connection_opened')
+    signals.request_started.disconnect(close_old_connections)
+    signals.request_finished.disconnect(close_old_connections)
+    signals.request_started.connect(acquire_connections, dispatch_uid='cinema_db_acquire')
+    signals.request_finished.connect(release_connections, dispatch_uid='cinema_db_release')
+
+
+def _on_task_prerun(sender=None, **kwargs):
+    if not getattr(sender.request, 'is_eager', False):
+        acquire_connections()
+
+
+def _on_task_postrun(sender=None, **kwargs):
+    if not getattr(sender.request, 'is_eager', False):
+        release_connections()
+        REGISTRY.flush()
+
+
+def install_worker():
+    """
+    Manages connections of Celery tasks
+
+    Celery closes connections around every task unless CELERY_DB_REUSE_MAX is set,
+    it has to be set high enough to leave recycling to CONN_MAX_AGE.
+    """
+    from celery import signals as celery_signals  # pylint: disable=import-outside-toplevel
+    connection_created.connect(_count_opened, dispatch_uid='cinema_db_connection_opened')
+    celery_signals.task_prerun.connect(_on_task_prerun, dispatch_uid='cinema_db_acquire')
+    celery_signals.task_postrun.connect(_on_task_postrun, dispatch_uid='cinema_db_release')
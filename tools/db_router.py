@@ -0,0 +1,93 @@
+"""
+Database router module
+
+Sends reads of safe-method requests to views with 'replica_reads = True' attribute to one of
+settings.DATABASE_REPLICAS. Writes, reads after a write in the same request, reads in
+transactions and reads of a client that wrote within DATABASE_REPLICA_STICKY_SECONDS
+(read-your-writes) go to the primary (default) database. Without replicas everything goes
+to the default database.
+"""
+import hashlib
+import random
+import threading
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+_state = threading.local()
+
+
+def _sticky_key(request):
+    credentials = request.META.get('HTTP_AUTHORIZATION') or \
+        request.COOKIES.get(settings.SESSION_COOKIE_NAME)
+    if not credentials:
+        return None
+    return 'db-sticky:' + hashlib.md5(credentials.encode()).hexdigest()
+
+
+class ReplicaRouter:
+    """
+    Routes reads to the replica chosen for the current request
+    """
+
+    @staticmethod
+    def db_for_read(model, **hints):  # pylint: disable=unused-argument
+        """Returns request replica unless the primary has to be used"""
+        replica = getattr(_state, 'replica', None)
+        if replica is None or getattr(_state, 'wrote', False) or \
+                connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return None
+        return replica
+
+    @staticmethod
+    def db_for_write(model, **hints):  # pylint: disable=unused-argument
+        """Returns the primary database and switches the rest of request to it"""
+        _state.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    @staticmethod
+    def allow_relation(obj1, obj2, **hints):  # pylint: disable=unused-argument
+        """Replicas contain the same data as the primary"""
+        return True
+
+    @staticmethod
+    def allow_migrate(db, app_label, model_name=None, **hints):  # pylint: disable=unused-argument
+        """Replicas are migrated by replication"""
+        return False if db in settings.DATABASE_REPLICAS else None
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Middleware chooses replica for safe-method requests to views allowing replica reads
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        _state.replica = None
+        _state.wrote = False
+        try:
+            response = self.get_response(request)
+            key = _sticky_key(request)
+            if _state.wrote and key:
+                cache.set(key, True, settings.DATABASE_REPLICA_STICKY_SECONDS)
+        finally:
+            _state.replica = None
+            _state.wrote = False
+        return response
+
+    @staticmethod
+    def process_view(request, view_func, view_args, view_kwargs):  # pylint: disable=unused-argument
+        """Chooses replica when resolved view allows it"""
+        view_class = getattr(view_func, 'view_class', None)
+        if not (settings.DATABASE_REPLICAS and request.method in SAFE_METHODS and
+                getattr(view_class, 'replica_reads', False)):
+            return
+        key = _sticky_key(request)
+        if key and cache.get(key):
+            return
+        _state.replica = random.choice(settings.DATABASE_REPLICAS)
@@ -0,0 +1,86 @@
+"""
+Fast JSON module
+
+JSONRenderer and JSONParser are REST framework's ones backed by orjson, which encodes and
+decodes in C and handles UUIDs natively. Values orjson does not handle itself (decimals,
+datetimes and lazy strings) are converted by JSONEncoder.default(), the same hook the standard
+library encoder uses, so both produce the same bytes. Without orjson installed, or for
+requests orjson cannot serve (indented output, ASCII-only output, non UTF-8 requests),
+the standard library is used.
+"""
+import datetime
+import decimal
+import io
+
+from django.conf import settings
+from rest_framework import parsers, renderers, serializers
+from rest_framework.utils import encoders
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+_LINE_SEPARATOR = '\u2028'.encode()
+_PARAGRAPH_SEPARATOR = '\u2029'.encode()
+
+
+class JSONEncoder(encoders.JSONEncoder):
+    """
+    REST framework's JSON encoder rendering datetimes as serializers.DateTimeField does, in
+    the current time zone and REST_FRAMEWORK['DATETIME_FORMAT']
+    """
+    _datetime_field = serializers.DateTimeField()
+
+    def default(self, obj):  # pylint: disable=arguments-differ,method-hidden
+        # Ticket prices are the most frequent values here
+        if isinstance(obj, decimal.Decimal):
+            return float(obj)
+        if isinstance(obj, datetime.datetime):
+            return self._datetime_field.to_representation(obj)
+        return super().default(obj)
+
+
+class JSONRenderer(renderers.JSONRenderer):
+    """
+    JSON renderer encoding by orjson
+    """
+    encoder_class = JSONEncoder
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        """
+        Render `data` into JSON, returning a bytestring.
+        """
+        if orjson is None or data is None or self.ensure_ascii or not self.compact or \
+                self.get_indent(accepted_media_type, renderer_context or {}) is not None:
+            return super().render(data, accepted_media_type, renderer_context)
+        ret = orjson.dumps(data, default=self.encoder_class().default,
+                           option=orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME)
+        # Same escaping as REST framework's renderer, JSON output is a strict javascript subset
+        if _LINE_SEPARATOR in ret or _PARAGRAPH_SEPARATOR in ret:
+            ret = ret.replace(_LINE_SEPARATOR, b'\\u2028') \
+                .replace(_PARAGRAPH_SEPARATOR, b'\\u2029')
+        return ret
+
+
+class JSONParser(parsers.JSONParser):
+    """
+    JSON parser decoding by orjson
+    """
+    renderer_class = JSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        """
+        Parses the incoming bytestream as JSON and returns the resulting data.
+        """
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', settings.DEFAULT_CHARSET)
+        if orjson is None or not self.strict or encoding.lower().replace('-', '') != 'utf8':
+            return super().parse(stream, media_type, parser_context)
+        body = stream.read()
+        try:
+            return orjson.loads(body)
+        except orjson.JSONDecodeError:
+            # Documents orjson rejects (e.g. integers beyond 64 bits) and error messages
+            # are left to the standard library
+            return super().parse(io.BytesIO(body), media_type, parser_context)
@@ -0,0 +1,102 @@
+"""
+Import profiling module
+
+Measures cold start of a process: every module imported by a startup target in a fresh
+interpreter is timed, including the ones imported by importlib.import_module() (settings,
+url confs, apps), which ``python -X importtime`` does not report. Targets are:
+ - web: WSGI application with its middleware and url conf, as a worker before its first request
+ - asgi: same for the ASGI application
+ - celery: Celery application with its task modules, as a worker or beat
+ - any module name
+
+    python -m tools.importprofile web
+
+prints JSON {"total": seconds, "modules": [[name, self seconds, cumulative seconds, parent]]}
+in import order. profile_imports management command reports it.
+"""
+import importlib
+import json
+import os
+import subprocess
+import sys
+import time
+from importlib import _bootstrap  # pylint: disable=no-name-in-module
+
+TARGETS = ('web', 'asgi', 'celery')
+
+
+class Profiler:
+    """Times modules loaded by importlib while it is installed"""
+
+    def __init__(self):
+        self.modules = []
+        self._stack = []
+        self._find_and_load = None
+
+    def install(self):
+        """Wraps importlib's function loading modules, both import and import_module() use it"""
+        self._find_and_load = _bootstrap._find_and_load  # pylint: disable=protected-access
+        _bootstrap._find_and_load = self._timed  # pylint: disable=protected-access
+
+    def uninstall(self):
+        """Restores importlib's function"""
+        _bootstrap._find_and_load = self._find_and_load  # pylint: disable=protected-access
+
+    def _timed(self, name, import_):
+        if name in sys.modules:
+            return self._find_and_load(name, import_)
+        # Self time is the cumulative time less cumulative times of the nested imports
+        record = [name, 0.0, 0.0, self._stack[-1][0] if self._stack else None]
+        self.modules.append(record)
+        self._stack.append(record)
+        start = time.perf_counter()
+        try:
+            return self._find_and_load(name, import_)
+        finally:
+            record[2] = time.perf_counter() - start
+            record[1] += record[2]
+            self._stack.pop()
+            if self._stack:
+                self._stack[-1][1] -= record[2]
+
+
+def _start(target):
+    if target in ('web', 'asgi'):
+        importlib.import_module('cinema.wsgi' if target == 'web' else 'cinema.asgi')
+        from django.urls import get_resolver  # pylint: disable=import-outside-toplevel
+        get_resolver().url_patterns  # pylint: disable=expression-not-assigned
+    elif target == 'celery':
+        from cinema.celery import app  # pylint: disable=import-outside-toplevel
+        app.loader.import_default_modules()
+    else:
+        importlib.import_module(target)
+
+
+def profile(target):
+    """Returns total time and modules of the target imported in this process"""
+    profiler = Profiler()
+    profiler.install()
+    start = time.perf_counter()
+    try:
+        _start(target)
+    finally:
+        total = time.perf_counter() - start
+        profiler.uninstall()
+    return {'total': total, 'modules': profiler.modules}
+
+
+def run(target, settings_module=None):
+    """Returns profile of the target imported by a new interpreter"""
+    env = dict(os.environ)
+    if settings_module:
+        env['DJANGO_SETTINGS_MODULE'] = settings_module
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env['PYTHONPATH'] = os.pathsep.join(filter(None, [root, env.get('PYTHONPATH')]))
+    output = subprocess.run([sys.executable, '-m', 'tools.importprofile', target], env=env,
+                            cwd=root, stdout=subprocess.PIPE, check=True).stdout
+    return json.loads(output)
+
+
+if __name__ == '__main__':
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'cinema.settings')
+    json.dump(profile(sys.argv[1]), sys.stdout)
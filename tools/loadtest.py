@@ -0,0 +1,154 @@
+"""
+Load test module
+
+Sends requests to one url from concurrent clients and prints throughput and latency
+percentiles. Slow clients open connections and drip request headers one byte per second for
+the whole run, as mobile clients on bad networks do. Compare the WSGI and the ASGI
+applications on the same hardware with the same number of workers, for example:
+
+    gunicorn cinema.wsgi -w 4 --threads 8 -b :8000
+    gunicorn cinema.asgi:application -w 4 -k uvicorn.workers.UvicornWorker -b :8001
+
+    python -m tools.loadtest http://localhost:8000/showings/1/seats/ -n 2000 -c 50 -s 500
+    python -m tools.loadtest http://localhost:8001/showings/1/seats/ -n 2000 -c 50 -s 500
+"""
+import argparse
+import asyncio
+import re
+import time
+from urllib.parse import urlsplit
+
+
+def _request(url, method='GET', headers=(), body=b''):
+    parts = urlsplit(url)
+    path = (parts.path or '/') + (f'?{parts.query}' if parts.query else '')
+    lines = [f'{method} {path} HTTP/1.1', f'Host: {parts.netloc}', 'Connection: close']
+    lines += list(headers)
+    if body:
+        lines.append(f'Content-Length: {len(body)}')
+    return ('\r\n'.join(lines) + '\r\n\r\n').encode() + body
+
+
+async def _read_body(reader, headers):
+    length = re.search(rb'\r\ncontent-length:\s*(\d+)', headers, re.IGNORECASE)
+    if length:
+        await reader.readexactly(int(length.group(1)))
+    elif re.search(rb'\r\ntransfer-encoding:\s*chunked', headers, re.IGNORECASE):
+        while True:
+            size = int((await reader.readuntil(b'\r\n')).split(b';')[0], 16)
+            await reader.readexactly(size + 2)
+            if not size:
+                break
+    else:
+        await reader.read()
+
+
+async def _fetch(host, port, request):
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        writer.write(request)
+        await writer.drain()
+        headers = await reader.readuntil(b'\r\n\r\n')
+        if not request.startswith(b'HEAD '):
+            await _read_body(reader, headers)
+    finally:
+        writer.close()
+    return int(headers.split(b' ', 2)[1])
+
+
+async def _client(host, port, request, jobs, latencies, statuses):
+    while jobs:
+        jobs.pop()
+        start = time.perf_counter()
+        try:
+            status = await _fetch(host, port, request)
+        except (OSError, ValueError, IndexError, asyncio.IncompleteReadError):
+            status = 0
+        latencies.append(time.perf_counter() - start)
+        statuses[status] = statuses.get(status, 0) + 1
+
+
+async def _slow_client(host, port, request, stop):
+    try:
+        reader, writer = await asyncio.open_connection(host, port)
+    except OSError:
+        return
+    try:
+        for byte in request[:-4]:
+            # Server gave up waiting for the request
+            if reader.at_eof() or writer.transport.is_closing():
+                break
+            writer.write(bytes([byte]))
+            try:
+                await asyncio.wait_for(stop.wait(), timeout=1)
+                break
+            except asyncio.TimeoutError:
+                pass
+    except OSError:
+        pass
+    finally:
+        writer.close()
+
+
+async def run(url, requests, concurrency, slow_clients=0, method='GET', headers=(), body=b''):
+    """Runs load test, returns summary dict"""
+    parts = urlsplit(url)
+    host, port = parts.hostname, parts.port or 80
+    request = _request(url, method, headers, body)
+    stop = asyncio.Event()
+    slow = [asyncio.ensure_future(_slow_client(host, port, request, stop))
+            for _ in range(slow_clients)]
+    await asyncio.sleep(0.5 if slow_clients else 0)
+
+    jobs = list(range(requests))
+    latencies = []
+    statuses = {}
+    start = time.perf_counter()
+    await asyncio.gather(*[_client(host, port, request, jobs, latencies, statuses)
+                           for _ in range(concurrency)])
+    elapsed = time.perf_counter() - start
+    stop.set()
+    if slow:
+        await asyncio.wait(slow)
+
+    latencies.sort()
+
+    def percentile(value):
+        return round(latencies[min(len(latencies) - 1, int(len(latencies) * value))] * 1000, 2)
+
+    return {
+        'requests': len(latencies),
+        'seconds': round(elapsed, 3),
+        'rps': round(len(latencies) / elapsed, 1),
+        'p50_ms': percentile(0.50),
+        'p95_ms': percentile(0.95),
+        'p99_ms': percentile(0.99),
+        'statuses': statuses,
+    }
+
+
+def main():
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description='HTTP load test')
+    parser.add_argument('url')
+    parser.add_argument('-n', '--requests', type=int, default=1000)
+    parser.add_argument('-c', '--concurrency', type=int, default=20)
+    parser.add_argument('-s', '--slow-clients', type=int, default=0,
+                        help='connections dripping request headers during the run')
+    parser.add_argument('-m', '--method', default='GET')
+    parser.add_argument('-H', '--header', action='append', default=[],
+                        help='extra header, e.g. "Authorization: Bearer <token>"')
+    parser.add_argument('-d', '--data', default='', help='request body')
+    args = parser.parse_args()
+    headers = list(args.header)
+    if args.data:
+        headers.append('Content-Type: application/json')
+    summary = asyncio.get_event_loop().run_until_complete(
+        run(args.url, args.requests, args.concurrency, args.slow_clients,
+            args.method, headers, args.data.encode()))
+    for key, value in summary.items():
+        print(f'{key}: {value}')
+
+
+if __name__ == '__main__':
+    main()
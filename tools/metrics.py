@@ -0,0 +1,318 @@
+"""
+Metrics module
+
+Minimal Prometheus-style metrics registry that needs no external service.
+
+Every process keeps its samples in memory and flushes them into its own file
+``<CINEMA_METRICS_DIR>/<pid>-<uuid>.json`` at most once per CINEMA_METRICS_FLUSH_SECONDS, so
+requests do not write files; changes made meanwhile are flushed by a timer. The /metrics view
+sums the samples of all files (so Gunicorn workers, Celery workers and beat are aggregated)
+and renders them in the text exposition format to staff users and to scrapers sending
+CINEMA_METRICS_TOKEN. All samples are additive: counters, histogram buckets and gauges that are
+only changed with inc()/dec(). Files of finished processes are kept, so their counters
+survive restarts; clear the directory on deploy.
+"""
+import atexit
+import hmac
+import json
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseForbidden
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, float('inf'))
+
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    if value == float('-inf'):
+        return '-Inf'
+    return repr(float(value))
+
+
+def _escape(value):
+    return str(value).replace('\\', r'\\').replace('\n', r'\n').replace('"', r'\"')
+
+
+class Registry:
+    """
+    Process-local metrics registry backed by one file per process
+    """
+
+    def __init__(self, directory=None):
+        self._directory = directory
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._families = {}
+        self._samples = {}
+        self._pid = os.getpid()
+        # Reused pids of finished processes must not overwrite their files
+        self._file_name = f'{self._pid}-{uuid.uuid4().hex}.json'
+        self._dirty = False
+        self._flushed_path = None
+        self._flushed_at = float('-inf')
+        self._timer = None
+
+    @property
+    def directory(self):
+        """Directory shared by all processes of the deployment"""
+        return self._directory or settings.CINEMA_METRICS_DIR
+
+    def _check_fork(self):
+        # Forked children (Celery prefork, Gunicorn preload) must not re-export
+        # the samples inherited from their parent
+        pid = os.getpid()
+        if pid != self._pid:
+            self._pid = pid
+            self._file_name = f'{pid}-{uuid.uuid4().hex}.json'
+            self._samples = {}
+            self._dirty = False
+            self._flushed_path = None
+            self._flushed_at = float('-inf')
+            self._timer = None
+
+    def register(self, metric):
+        """Registers metric family description used by the exposition"""
+        self._families[metric.name] = metric
+        return metric
+
+    def counter(self, name, documentation, labels=()):
+        """Creates and registers counter"""
+        return self.register(Counter(self, name, documentation, labels))
+
+    def gauge(self, name, documentation, labels=()):
+        """Creates and registers additive gauge"""
+        return self.register(Gauge(self, name, documentation, labels))
+
+    def histogram(self, name, documentation, labels=(), buckets=DEFAULT_BUCKETS):
+        """Creates and registers histogram"""
+        return self.register(Histogram(self, name, documentation, labels, buckets))
+
+    def add(self, family, sample, labels, amount):
+        """Adds amount to sample value"""
+        key = (family, sample, tuple(sorted(labels.items())))
+        with self._lock:
+            self._check_fork()
+            self._samples[key] = self._samples.get(key, 0.0) + amount
+            self._dirty = True
+
+    def flush(self, force=False):
+        """
+        Writes process samples to its file if they were changed since the last flush
+
+        Unless forced, the file is written at most once per CINEMA_METRICS_FLUSH_SECONDS:
+        samples changed sooner are written by a timer at the end of the interval.
+        """
+        if not force:
+            with self._lock:
+                self._check_fork()
+                wait = self._flushed_at + settings.CINEMA_METRICS_FLUSH_SECONDS - time.monotonic()
+                if wait > 0:
+                    if self._dirty and self._timer is None:
+                        self._timer = threading.Timer(wait, self._flush_later)
+                        self._timer.daemon = True
+                        self._timer.start()
+                    return
+        # Threads of a process share the file, the latest snapshot has to be written last
+        with self._flush_lock:
+            with self._lock:
+                self._check_fork()
+                path = os.path.join(self.directory, self._file_name)
+                self._flushed_at = time.monotonic()
+                if not self._dirty and path == self._flushed_path:
+                    return
+                data = [[family, sample, list(labels), value]
+                        for (family, sample, labels), value in self._samples.items()]
+                self._dirty = False
+                self._flushed_path = path
+            os.makedirs(self.directory, exist_ok=True)
+            tmp_path = f'{path}.tmp'
+            with open(tmp_path, 'w') as file:
+                json.dump(data, file)
+            os.replace(tmp_path, path)
+
+    def _flush_later(self):
+        with self._lock:
+            self._timer = None
+        self.flush(force=True)
+
+    def collect(self):
+        """Returns samples summed over all processes"""
+        self.flush(force=True)
+        result = {}
+        if not os.path.isdir(self.directory):
+            return result
+        for file_name in os.listdir(self.directory):
+            if not file_name.endswith('.json'):
+                continue
+            try:
+                with open(os.path.join(self.directory, file_name)) as file:
+                    data = json.load(file)
+            except (OSError, ValueError):
+                continue
+            for family, sample, labels, value in data:
+                key = (family, sample, tuple(tuple(label) for label in labels))
+                result[key] = result.get(key, 0.0) + value
+        return result
+
+    def render(self):
+        """Renders aggregated samples in the text exposition format"""
+        samples = self.collect()
+        by_family = {}
+        for (family, sample, labels), value in samples.items():
+            by_family.setdefault(family, []).append((sample, labels, value))
+
+        lines = []
+        for family in sorted(set(by_family) | set(self._families)):
+            metric = self._families.get(family)
+            if metric is not None:
+                lines.append(f'# HELP {family} {_escape(metric.documentation)}')
+                lines.append(f'# TYPE {family} {metric.kind}')
+            else:
+                lines.append(f'# TYPE {family} untyped')
+            for sample, labels, value in sorted(by_family.get(family, []), key=_sample_order):
+                if labels:
+                    labels = sorted(labels, key=lambda label: label[0] == 'le')
+                    label_text = ','.join(f'{key}="{_escape(val)}"' for key, val in labels)
+                    lines.append(f'{sample}{{{label_text}}} {_format_value(value)}')
+                else:
+                    lines.append(f'{sample} {_format_value(value)}')
+        return '\n'.join(lines) + '\n'
+
+
+def _sample_order(item):
+    sample, labels, _ = item
+    plain = tuple((key, val) for key, val in labels if key != 'le')
+    bound = [float(val) for key, val in labels if key == 'le']
+    return plain, sample, bound[0] if bound else 0.0
+
+
+class Metric:  # pylint: disable=too-few-public-methods
+    """Base metric family"""
+    kind = 'untyped'
+
+    def __init__(self, registry, name, documentation, labels=()):
+        self.registry = registry
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+
+    def _labels(self, labels):
+        if set(labels) != set(self.labels):
+            raise ValueError(f'Metric {self.name} expects labels {self.labels}, '
+                             f'got {tuple(labels)}')
+        return labels
+
+
+class Counter(Metric):
+    """Monotonic counter"""
+    kind = 'counter'
+
+    def inc(self, amount=1, **labels):
+        """Increments counter"""
+        if amount < 0:
+            raise ValueError('Counter can only be incremented')
+        self.registry.add(self.name, f'{self.name}_total', self._labels(labels), amount)
+
+
+class Gauge(Metric):
+    """Gauge that is summed over processes, so it can be changed only relatively"""
+    kind = 'gauge'
+
+    def inc(self, amount=1, **labels):
+        """Increments gauge"""
+        self.registry.add(self.name, self.name, self._labels(labels), amount)
+
+    def dec(self, amount=1, **labels):
+        """Decrements gauge"""
+        self.inc(-amount, **labels)
+
+
+class Histogram(Metric):
+    """Histogram with cumulative buckets"""
+    kind = 'histogram'
+
+    def __init__(self, registry, name, documentation, labels=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(registry, name, documentation, labels)
+        buckets = tuple(sorted(float(bucket) for bucket in buckets))
+        if buckets[-1] != float('inf'):
+            buckets += (float('inf'),)
+        self.buckets = buckets
+
+    def observe(self, value, **labels):
+        """Observes given value"""
+        labels = self._labels(labels)
+        for bucket in self.buckets:
+            if value <= bucket:
+                self.registry.add(self.name, f'{self.name}_bucket',
+                                  dict(labels, le=_format_value(bucket)), 1)
+        self.registry.add(self.name, f'{self.name}_sum', labels, value)
+        self.registry.add(self.name, f'{self.name}_count', labels, 1)
+
+    @contextmanager
+    def time(self, **labels):
+        """Context manager observes duration of the block in seconds"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+
+REGISTRY = Registry()
+atexit.register(REGISTRY.flush, force=True)
+
+REQUEST_LATENCY = REGISTRY.histogram(
+    'cinema_http_request_duration_seconds',
+    'HTTP request latency by view',
+    labels=('view', 'method'),
+)
+
+CACHE_REQUESTS = REGISTRY.counter(
+    'cinema_cache_requests',
+    'Cache lookups by cache name and result (hit/miss)',
+    labels=('cache', 'result'),
+)
+
+
+def record_cache_lookup(cache, hit):
+    """Counts cache lookup, hit ratio is hit / (hit + miss)"""
+    CACHE_REQUESTS.inc(cache=cache, result='hit' if hit else 'miss')
+
+
+class RequestMetricsMiddleware:  # pylint: disable=too-few-public-methods
+    """
+    Middleware observes request latency per resolved view
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        start = time.perf_counter()
+        response = self.get_response(request)
+        match = getattr(request, 'resolver_match', None)
+        view = (match.url_name or match.view_name) if match else 'unresolved'
+        REQUEST_LATENCY.observe(time.perf_counter() - start, view=view, method=request.method)
+        REGISTRY.flush()
+        return response
+
+
+def metrics_view(request):
+    """
+    Returns metrics of all processes in Prometheus text exposition format to staff users and
+    to scrapers sending 'Authorization: Bearer <CINEMA_METRICS_TOKEN>' header
+    """
+    token = settings.CINEMA_METRICS_TOKEN
+    authorization = request.META.get('HTTP_AUTHORIZATION', '')
+    if not (token and hmac.compare_digest(authorization.encode(), f'Bearer {token}'.encode())) \
+            and not request.user.is_staff:
+        return HttpResponseForbidden()
+    return HttpResponse(REGISTRY.render(), content_type=CONTENT_TYPE)
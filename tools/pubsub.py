@@ -0,0 +1,153 @@
+"""
+Publish-subscribe module
+
+Messages are strings published to named channels. A backend delivers every message to all
+processes (settings.CINEMA_PUBSUB_BACKEND):
+ - BrokerBackend uses a fanout exchange of the Celery broker, so web and Celery processes
+   need no extra service
+ - MemoryBackend delivers messages inside the process, it is the stand-in for tests
+
+Each process listens to the backend once and its Hub fans messages out to asyncio queues of
+its subscribers (e.g. SSE connections served by the ASGI application).
+"""
+import asyncio
+import logging
+import threading
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+_backends = {}
+_backends_lock = threading.Lock()
+
+
+def get_backend():
+    """Returns backend instance of settings.CINEMA_PUBSUB_BACKEND"""
+    path = settings.CINEMA_PUBSUB_BACKEND
+    with _backends_lock:
+        if path not in _backends:
+            _backends[path] = import_string(path)()
+        return _backends[path]
+
+
+def publish(channel, message):
+    """Publishes message to all processes"""
+    get_backend().publish_many([(channel, message)])
+
+
+def publish_many(messages):
+    """Publishes (channel, message) pairs to all processes"""
+    get_backend().publish_many(messages)
+
+
+class MemoryBackend:
+    """In-process backend"""
+
+    def __init__(self):
+        self._listeners = []
+
+    def publish_many(self, messages):
+        """Calls listeners in the publishing thread"""
+        for channel, message in messages:
+            for listener in list(self._listeners):
+                listener(channel, message)
+
+    def listen(self, callback):
+        """Calls callback(channel, message) for every published message"""
+        self._listeners.append(callback)
+
+
+class BrokerBackend:
+    """Backend publishing to the Celery broker fanout exchange, each process has own queue"""
+    exchange_name = 'cinema.pubsub'
+
+    def __init__(self):
+        from kombu import Exchange  # pylint: disable=import-outside-toplevel
+        from cinema.celery import app  # pylint: disable=import-outside-toplevel
+        self.app = app
+        self.exchange = Exchange(self.exchange_name, type='fanout', durable=False)
+
+    def publish_many(self, messages):
+        """Publishes messages with one producer of the Celery app pool"""
+        with self.app.producer_or_acquire() as producer:
+            for channel, message in messages:
+                producer.publish({'channel': channel, 'message': message},
+                                 exchange=self.exchange, routing_key='', declare=[self.exchange],
+                                 serializer='json', retry=True)
+
+    def listen(self, callback):
+        """Consumes messages in a daemon thread, reconnects on connection errors"""
+        thread = threading.Thread(target=self._consume, args=(callback,),
+                                  name='pubsub-consumer', daemon=True)
+        thread.start()
+
+    def _consume(self, callback):
+        from kombu import Queue  # pylint: disable=import-outside-toplevel
+        queue = Queue(exchange=self.exchange, exclusive=True, auto_delete=True, durable=False)
+
+        def on_message(body, message):
+            callback(body['channel'], body['message'])
+            message.ack()
+
+        while True:
+            try:
+                with self.app.connection_for_read() as connection:
+                    connection.ensure_connection(max_retries=None)
+                    with connection.Consumer(queue, callbacks=[on_message], accept=['json']):
+                        while True:
+                            connection.drain_events()
+            except Exception:  # pylint: disable=broad-except
+                logging.getLogger(__name__).exception('Pub/sub consumer failed, reconnecting')
+                time.sleep(1)
+
+
+class Hub:
+    """
+    Process-wide fan-out of backend messages to asyncio queues
+
+    Queues are bounded: when a slow subscriber's queue is full it is cleared and gets None,
+    which means that messages were lost and the subscriber has to resync.
+    """
+
+    def __init__(self, queue_size=100):
+        self.queue_size = queue_size
+        self._subscribers = {}
+        self._lock = threading.Lock()
+        self._listening = None
+
+    def _dispatch(self, channel, message):
+        with self._lock:
+            subscribers = list(self._subscribers.get(channel, ()))
+        for loop, queue in subscribers:
+            loop.call_soon_threadsafe(self._offer, queue, message)
+
+    @staticmethod
+    def _offer(queue, message):
+        if queue.full():
+            while not queue.empty():
+                queue.get_nowait()
+            message = None
+        queue.put_nowait(message)
+
+    @contextmanager
+    def subscribe(self, channel):
+        """Returns asyncio queue receiving channel messages, must be used in event loop"""
+        backend = get_backend()
+        with self._lock:
+            if self._listening is not backend:
+                self._listening = backend
+                backend.listen(self._dispatch)
+            subscriber = (asyncio.get_event_loop(), asyncio.Queue(self.queue_size))
+            self._subscribers.setdefault(channel, set()).add(subscriber)
+        try:
+            yield subscriber[1]
+        finally:
+            with self._lock:
+                self._subscribers[channel].discard(subscriber)
+                if not self._subscribers[channel]:
+                    del self._subscribers[channel]
+
+
+HUB = Hub()
@@ -0,0 +1,116 @@
+"""
+Schema module
+
+OpenAPI schema documents of the API are rendered once, by generate_schema management command
+on build or deploy, into files of settings.CINEMA_SCHEMA_DIR. Schema views serve them from
+memory with ETag, so schema requests skip introspection of views and serializers and
+unchanged documents are revalidated by 304 responses. When the files are missing, documents
+are rendered on first use, once per process.
+
+Documents are rendered without host and schemes, clients use the ones serving the schema.
+"""
+import hashlib
+import os
+import threading
+
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.http import HttpRequest, HttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from drf_yasg.renderers import SwaggerJSONRenderer, SwaggerYAMLRenderer
+from rest_framework.request import Request
+
+# Document file names by format of the schema view renderers ('openapi' is JSON as well)
+FILES = {'.json': 'swagger.json', '.yaml': 'swagger.yaml', 'openapi': 'swagger.json'}
+
+_RENDERERS = {'swagger.json': SwaggerJSONRenderer, 'swagger.yaml': SwaggerYAMLRenderer}
+
+
+class SchemaDocuments:
+    """
+    Rendered documents of the schema of 'generator' (drf_yasg OpenAPISchemaGenerator) by file
+    name
+    """
+
+    def __init__(self, generator, directory=None):
+        self.generator = generator
+        self.directory = directory
+        self._documents = None
+        self._lock = threading.Lock()
+
+    def get_directory(self):
+        """Returns directory of the document files"""
+        return self.directory or settings.CINEMA_SCHEMA_DIR
+
+    def render(self):
+        """Returns documents rendered from the introspected schema of an anonymous user"""
+        http_request = HttpRequest()
+        http_request.method = 'GET'
+        request = Request(http_request)
+        request.user = AnonymousUser()
+        schema = self.generator.get_schema(request, public=True)
+        return {name: renderer().render(schema) for name, renderer in _RENDERERS.items()}
+
+    def write(self):
+        """Renders documents into files, returns paths of the files"""
+        directory = self.get_directory()
+        os.makedirs(directory, exist_ok=True)
+        paths = []
+        for name, content in self.render().items():
+            path = os.path.join(directory, name)
+            # Running processes may read the file meanwhile
+            with open(f'{path}.tmp', 'wb') as file:
+                file.write(content)
+            os.replace(f'{path}.tmp', path)
+            paths.append(path)
+        with self._lock:
+            self._documents = None
+        return paths
+
+    def _read(self):
+        documents = {}
+        for name in _RENDERERS:
+            try:
+                with open(os.path.join(self.get_directory(), name), 'rb') as file:
+                    documents[name] = file.read()
+            except FileNotFoundError:
+                return None
+        return documents
+
+    def get(self, name):
+        """Returns (content, ETag) of the document, documents are read or rendered once"""
+        with self._lock:
+            if self._documents is None:
+                documents = self._read() or self.render()
+                self._documents = {
+                    file_name: (content, f'"{hashlib.md5(content).hexdigest()}"')
+                    for file_name, content in documents.items()
+                }
+            return self._documents[name]
+
+
+def cached_schema_view(schema_view, documents):
+    """
+    Returns subclass of drf_yasg schema view class serving schema documents (SchemaDocuments)
+    instead of introspected schemas. Web UI pages are served as usual, they need no
+    introspection.
+    """
+
+    class CachedSchemaView(schema_view):  # pylint: disable=too-few-public-methods
+        """Schema view serving documents rendered once"""
+
+        def get(self, request, version='', format=None):  # pylint: disable=redefined-builtin
+            renderer = request.accepted_renderer
+            if renderer.format not in FILES:
+                return super().get(request, version, format)
+            content, etag = documents.get(FILES[renderer.format])
+            response = get_conditional_response(request, etag=etag)
+            if response is None:
+                response = HttpResponse(content,
+                                        content_type=f'{renderer.media_type}; charset=utf-8')
+            response['ETag'] = etag
+            # Documents change on deploy only, clients revalidate them by ETag
+            patch_cache_control(response, public=True, no_cache=True)
+            return response
+
+    return CachedSchemaView